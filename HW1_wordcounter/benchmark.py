@@ -0,0 +1,180 @@
+"""Compares execution time and peak memory usage (RSS)
+of wordcounter backends on a scaled-up copy of 'Book.txt'.
+Also compares the accuracy and memory usage of approximate
+top-K mode against the exact counting.
+
+Each measurement runs in a freshly spawned process, so the peak RSS
+of one measurement does not affect the others. Peak RSS is taken
+from resource.getrusage(), hence the script works on Unix only.
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import wordcounter
+
+BACKENDS = {
+    'read': wordcounter.count_words,  # the original implementation
+    'stream': wordcounter.count_words_streaming,
+    'mmap': wordcounter.count_words_mmap,
+}
+
+
+def make_scaled_copy(source: str, scale: int, destination: str,
+                     unique_words=0) -> None:
+    """Writes the source file into the destination 'scale' times.
+    Optionally appends words that occur only once to each copy,
+    which makes the vocabulary grow with the file size.
+
+    :param source: name of the file to copy
+    :param scale: how many times to repeat the content
+    :param destination: name of the file to create
+    :param unique_words: number of unique words to add to each copy
+    """
+    with open(source, 'rb') as f:
+        content = f.read()
+    numbers = itertools.count()
+    with open(destination, 'wb') as f:
+        for _ in range(scale):
+            f.write(content)
+            if unique_words:
+                f.write(' '.join(f'id{next(numbers)}'
+                                 for _ in range(unique_words)).encode())
+                f.write(b'\n')
+
+
+def measure(function: Callable, *args) -> Tuple[Any, float, int]:
+    """Calls the function in a new process.
+
+    :param function: a module-level function (must be picklable)
+    :param args: arguments of the function
+    :return: result of the function, execution time in seconds,
+        peak RSS in KiB
+    """
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(_run_timed, (function, args))
+
+
+def _run_timed(function: Callable, args: tuple) -> Tuple[Any, float, int]:
+    """Calls the function and measures its execution time.
+    Runs in a worker process.
+    """
+    start_time = time.perf_counter()
+    result = function(*args)
+    end_time = time.perf_counter()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result, end_time - start_time, peak_rss
+
+
+def _run_backend(backend: str, filename: str) -> None:
+    """Counts the words using the backend; the result is discarded.
+
+    :param backend: key of BACKENDS
+    :param filename: name of the file to count words in
+    """
+    BACKENDS[backend](filename)
+
+
+def _approximate_top(filename: str, k: int,
+                     capacity: int) -> List[Tuple[str, int, int]]:
+    """Finds k most frequent words in approximate mode.
+
+    :return: list of (word, count, error)
+    """
+    return wordcounter.find_heavy_hitters(filename, capacity).top(k)
+
+
+def _exact_top(filename: str, k: int, words: Sequence[str]
+               ) -> Tuple[List[Tuple[str, int]], Dict[str, int]]:
+    """Finds k most frequent words in exact (streaming) mode.
+    Also returns the true counts of the specified words.
+
+    :return: list of (word, count), {word: true count}
+    """
+    counter = wordcounter.count_words_streaming(filename)
+    return counter.most_common(k), {word: counter[word] for word in words}
+
+
+def compare_backends(corpus: str, backends: Sequence[str]) -> None:
+    """Prints execution time and peak RSS of every backend.
+
+    :param corpus: name of the file to count words in
+    :param backends: keys of BACKENDS
+    """
+    print(f'{"backend":<10} {"time, s":>10} {"peak RSS, MiB":>15}')
+    for name in backends:
+        _, elapsed, peak_rss = measure(_run_backend, name, corpus)
+        print(f'{name:<10} {elapsed:>10.2f} {peak_rss / 1024:>15.1f}')
+
+
+def compare_heavy_hitters(corpus: str, k: int, capacity: int) -> None:
+    """Prints execution time, peak RSS and accuracy
+    of approximate top-k mode compared with the exact mode.
+
+    :param corpus: name of the file to count words in
+    :param k: number of the most frequent words to find
+    :param capacity: number of words to keep track of in approximate mode
+    """
+    approx_top, approx_time, approx_rss = measure(
+        _approximate_top, corpus, k, capacity)
+    (exact_top, true_counts), exact_time, exact_rss = measure(
+        _exact_top, corpus, k, [word for word, _, _ in approx_top])
+    print(f'{"mode":<10} {"time, s":>10} {"peak RSS, MiB":>15}')
+    print(f'{"exact":<10} {exact_time:>10.2f} {exact_rss / 1024:>15.1f}')
+    print(f'{"approx":<10} {approx_time:>10.2f} {approx_rss / 1024:>15.1f}')
+    found = {word for word, _ in exact_top}.intersection(
+        word for word, _, _ in approx_top)
+    errors = [count - true_counts[word] for word, count, _ in approx_top]
+    within_bounds = all(
+        count - error <= true_counts[word] <= count
+        for word, count, error in approx_top)
+    print(f'top {k} recall: {len(found) / max(len(exact_top), 1):.2%}, '
+          f'max overestimation: {max(errors, default=0)}, '
+          f'all counts within bounds: {within_bounds}')
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments.
+
+    :return: parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--scale', type=int, default=1000,
+        help='how many times to repeat Book.txt (default is 1000)')
+    parser.add_argument(
+        '--unique-words', type=int, default=0,
+        help='number of unique words to add to each copy of Book.txt '
+             '(default is 0)')
+    parser.add_argument(
+        '--backends', nargs='*', choices=BACKENDS, default=list(BACKENDS),
+        help='backends to compare (default is all of them)')
+    parser.add_argument(
+        '--top', type=int, default=20,
+        help='number of the most frequent words to find when comparing '
+             'approximate mode with the exact one; 0 to skip '
+             '(default is 20)')
+    parser.add_argument(
+        '--capacity', type=int, default=1000,
+        help='number of words to keep track of in approximate mode '
+             '(default is 1000)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = os.path.join(tmp_dir, 'corpus.txt')
+        make_scaled_copy('Book.txt', args.scale, corpus, args.unique_words)
+        print(f'Book.txt x {args.scale} + {args.unique_words} unique words '
+              f'per copy = {os.path.getsize(corpus) / 2 ** 20:.1f} MiB')
+        if args.backends:
+            compare_backends(corpus, args.backends)
+        if args.top:
+            compare_heavy_hitters(corpus, args.top, args.capacity)
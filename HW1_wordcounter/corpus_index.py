@@ -0,0 +1,156 @@
+"""Keeps word counts of a directory of text files
+in an on-disk SQLite index.
+
+Every file is recorded in the index together with its size and
+modification time. When the directory is processed again, only new
+and changed files are counted; the counts of deleted and changed files
+are subtracted from the totals, which are kept in a separate table.
+Each file is handled in its own transaction, so an interrupted update
+leaves the index consistent and the next run continues from there.
+"""
+
+import fnmatch
+import os
+import sqlite3
+from collections import Counter
+from typing import Callable, Dict, Tuple
+
+INDEX_FILENAME = '.wordcounter_index.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files(
+    path         TEXT     PRIMARY KEY,
+    size         INTEGER,
+    mtime_ns     INTEGER
+);
+CREATE TABLE IF NOT EXISTS file_words(
+    path         TEXT,
+    word         TEXT,
+    count        INTEGER,
+    PRIMARY KEY (path, word)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS totals(
+    word         TEXT     PRIMARY KEY,
+    count        INTEGER
+) WITHOUT ROWID;
+"""
+
+
+class CorpusIndex:
+    """Word counts of the files of a single directory.
+    Can be used as a context manager.
+    """
+
+    def __init__(self, index_filename: str):
+        """Opens the index file or creates a new one.
+
+        :param index_filename: name of the SQLite database file
+        """
+        self.connection = sqlite3.connect(index_filename)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def update(self, directory: str,
+               count_file: Callable[[str], Counter],
+               pattern='*.txt') -> Dict[str, int]:
+        """Brings the index in line with the current
+        content of the directory (including subdirectories).
+
+        :param directory: the directory with text files
+        :param count_file: a function that counts words in a file
+        :param pattern: shell-style pattern for names of the files to count
+            (default is '*.txt')
+        :return: number of new, changed, removed and unchanged files
+        """
+        current = scan_directory(directory, pattern)
+        indexed = {path: (size, mtime_ns) for path, size, mtime_ns
+                   in self.connection.execute('SELECT * FROM files;')}
+        summary = {'new': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+        for path in indexed.keys() - current.keys():
+            with self.connection:
+                self._remove_file(path)
+            summary['removed'] += 1
+        for path, stat in sorted(current.items()):
+            if indexed.get(path) == stat:
+                summary['unchanged'] += 1
+                continue
+            counter = count_file(os.path.join(directory, path))
+            with self.connection:
+                if path in indexed:
+                    self._remove_file(path)
+                self._add_file(path, stat, counter)
+            summary['changed' if path in indexed else 'new'] += 1
+        return summary
+
+    def totals(self) -> Counter:
+        """Returns merged word counts of all indexed files.
+
+        :return: Counter {word: number of occurrences}
+        """
+        return Counter(dict(self.connection.execute(
+            'SELECT word, count FROM totals;')))
+
+    def _remove_file(self, path: str) -> None:
+        """Subtracts the counts of the file from the totals
+        and deletes the file from the index.
+
+        :param path: path to the file relative to the directory
+        """
+        self.connection.executemany(
+            'UPDATE totals SET count = count - ? WHERE word = ?;',
+            self.connection.execute(
+                'SELECT count, word FROM file_words WHERE path = ?;',
+                (path,)).fetchall())
+        self.connection.execute('DELETE FROM totals WHERE count <= 0;')
+        self.connection.execute(
+            'DELETE FROM file_words WHERE path = ?;', (path,))
+        self.connection.execute('DELETE FROM files WHERE path = ?;', (path,))
+
+    def _add_file(self, path: str, stat: Tuple[int, int],
+                  counter: Counter) -> None:
+        """Adds the file with its counts to the index
+        and adds the counts to the totals.
+
+        :param path: path to the file relative to the directory
+        :param stat: size and modification time (ns) of the file
+        :param counter: Counter {word: number of occurrences}
+        """
+        self.connection.execute(
+            'INSERT INTO files VALUES (?,?,?);', (path, *stat))
+        self.connection.executemany(
+            'INSERT INTO file_words VALUES (?,?,?);',
+            ((path, word, count) for word, count in counter.items()))
+        self.connection.executemany(
+            'INSERT INTO totals VALUES (?,?) ON CONFLICT(word) '
+            'DO UPDATE SET count = count + excluded.count;',
+            counter.items())
+
+
+def scan_directory(directory: str,
+                   pattern='*.txt') -> Dict[str, Tuple[int, int]]:
+    """Finds the files to count in the directory and its subdirectories.
+    The index file itself is never included.
+
+    :param directory: the directory to scan
+    :param pattern: shell-style pattern for file names (default is '*.txt')
+    :return: {relative path: (size, modification time in ns)}
+    """
+    files = {}
+    for root, _, filenames in os.walk(directory):
+        for filename in fnmatch.filter(filenames, pattern):
+            if filename.startswith(INDEX_FILENAME):
+                continue
+            abs_filename = os.path.join(root, filename)
+            stat = os.stat(abs_filename)
+            path = os.path.relpath(abs_filename, directory)
+            files[path.replace(os.sep, '/')] = (stat.st_size,
+                                                stat.st_mtime_ns)
+    return files
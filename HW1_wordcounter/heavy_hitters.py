@@ -0,0 +1,102 @@
+"""Approximate counting of the most frequent items in a stream
+using a fixed amount of memory.
+
+Implements the Space-Saving algorithm (Metwally, Agrawal, El Abbadi,
+"Efficient Computation of Frequent and Top-k Elements in Data Streams",
+2005) with weighted updates. At most 'capacity' items are monitored.
+When a new item arrives and there is no room for it, the item with
+the smallest count is replaced and the new one inherits that count
+as its possible overestimation (error). This guarantees that:
+ 1. the true count of a monitored item lies in [count - error, count];
+ 2. any item with the true count greater than total / capacity
+    is monitored.
+"""
+
+import heapq
+from typing import Dict, Hashable, List, Mapping, Tuple
+
+
+class SpaceSaving:
+    """Space-Saving summary of a stream of items."""
+
+    def __init__(self, capacity: int):
+        """
+        :param capacity: maximum number of monitored items
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be a positive integer')
+        self.capacity = capacity
+        self.total = 0
+        self._counts: Dict[Hashable, int] = {}
+        self._errors: Dict[Hashable, int] = {}
+        # (count, item) pairs; outdated pairs are skipped when popped
+        self._heap: List[Tuple[int, Hashable]] = []
+
+    def __len__(self):
+        return len(self._counts)
+
+    def update(self, item: Hashable, weight=1) -> None:
+        """Registers 'weight' occurrences of the item.
+
+        :param item: an item of the stream
+        :param weight: number of occurrences (default is 1)
+        """
+        self.total += weight
+        if item in self._counts:
+            self._counts[item] += weight
+        elif len(self._counts) < self.capacity:
+            self._counts[item] = weight
+            self._errors[item] = 0
+        else:
+            min_count, min_item = self._pop_min()
+            del self._counts[min_item], self._errors[min_item]
+            self._counts[item] = min_count + weight
+            self._errors[item] = min_count
+        self._push(item)
+
+    def update_counts(self, counts: Mapping[Hashable, int]) -> None:
+        """Registers the occurrences of all items from the mapping,
+        e.g. a Counter of a chunk of the stream.
+
+        :param counts: {item: number of occurrences}
+        """
+        for item, weight in counts.items():
+            self.update(item, weight)
+
+    def top(self, k: int) -> List[Tuple[Hashable, int, int]]:
+        """Returns k items with the largest estimated counts.
+
+        :param k: number of items to return
+        :return: list of (item, count, error), largest counts first;
+            the true count of each item lies in [count - error, count]
+        """
+        return [(item, count, self._errors[item]) for item, count
+                in heapq.nlargest(k, self._counts.items(),
+                                  key=lambda pair: pair[1])]
+
+    def max_unmonitored_count(self) -> int:
+        """Returns the upper bound of the true count
+        of any item that is not monitored.
+        """
+        if len(self._counts) < self.capacity:
+            return 0
+        return min(self._counts.values())
+
+    def _push(self, item: Hashable) -> None:
+        """Adds the current count of the item to the heap.
+        Rebuilds the heap if it contains too many outdated pairs.
+        """
+        heapq.heappush(self._heap, (self._counts[item], item))
+        if len(self._heap) > 2 * self.capacity:
+            self._heap = [(count, item)
+                          for item, count in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, Hashable]:
+        """Removes and returns the monitored item
+        with the smallest count from the heap.
+        """
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self._counts.get(item) == count:
+                return count, item
@@ -0,0 +1,150 @@
+"""Counting of n-grams (sequences of n consecutive words)
+in a stream of words.
+
+Words are interned: each distinct word gets an integer id, and an
+n-gram is stored as a single int that packs the ids of its words,
+ID_BITS bits per word. This takes much less memory than tuples of
+strings. The window slides over the whole stream, so n-grams that
+span two chunks of the text are counted too.
+
+Memory can be capped with 'max_ngrams' (together with min_count > 1):
+when the table grows beyond this size, it is pruned down to
+PRUNE_TO * max_ngrams n-grams, so the next pruning is at least that
+many new n-grams away. The n-grams that occurred less than 'min_count'
+times are dropped first; if that is not enough, the threshold is raised
+to the smallest count that is (see 'threshold'). The words that are no
+longer used by any n-gram are forgotten too, so both the table and the
+interned words are capped. The earlier occurrences of dropped n-grams
+are lost, so after pruning the counts are lower bounds: an n-gram may
+be missing or undercounted only if it once had fewer occurrences than
+the threshold of a pruning.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+ID_BITS = 32  # up to 2 ** 32 distinct words
+ID_MASK = (1 << ID_BITS) - 1
+PRUNE_TO = 0.5  # the part of max_ngrams that is left after pruning
+
+
+class NgramCounter:
+    """Counts n-grams of interned words."""
+
+    def __init__(self, n: int, min_count=1,
+                 max_ngrams: Optional[int] = None):
+        """
+        :param n: number of words in an n-gram
+        :param min_count: n-grams that occur less often are not reported
+            (and are dropped when the table is pruned)
+        :param max_ngrams: prune the table when it grows beyond this size
+            (default is None - never prune); requires min_count > 1
+        :raise ValueError: if n < 1, or max_ngrams is given
+            without min_count > 1
+        """
+        if n < 1:
+            raise ValueError('n must be a positive integer')
+        if max_ngrams is not None and min_count < 2:
+            raise ValueError('the limit of n-grams requires '
+                             'the minimal count greater than 1')
+        self.n = n
+        self.min_count = min_count
+        self.max_ngrams = max_ngrams
+        # the highest count an n-gram could have had when it was dropped
+        # (plus 1); it is min_count unless pruning had to raise it
+        self.threshold = min_count
+        self._ids: Dict[str, int] = {}
+        self._counts = Counter()
+        self._tail: List[int] = []  # ids of the last n - 1 words
+
+    def __len__(self):
+        return len(self._counts)
+
+    def update(self, words: Iterable[str]) -> None:
+        """Counts the n-grams in the next part of the stream.
+
+        :param words: consecutive words
+        :raise ValueError: if there are more distinct words than
+            the ids of ID_BITS bits can tell apart
+        """
+        ids = self._ids
+        sequence = self._tail + [ids.setdefault(w, len(ids)) for w in words]
+        if len(ids) > 1 << ID_BITS:
+            raise ValueError(f'more than 2 ** {ID_BITS} distinct words')
+        start = max(0, len(sequence) - self.n + 1)
+        keys = sequence[:start]
+        for shift in range(1, self.n):
+            keys = [key << ID_BITS | word_id
+                    for key, word_id in zip(keys, sequence[shift:])]
+        self._counts.update(keys)
+        self._tail = sequence[start:]
+        if self.max_ngrams is not None and len(self) > self.max_ngrams:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drops the n-grams that occurred less than min_count times,
+        and the rarest of the others if more than PRUNE_TO * max_ngrams
+        are left, then forgets the words of the dropped n-grams.
+        """
+        threshold = self.min_count
+        if self.max_ngrams is not None:
+            target = int(self.max_ngrams * PRUNE_TO)
+            left = len(self._counts)
+            for count, n in sorted(Counter(self._counts.values()).items()):
+                if count < threshold:
+                    left -= n
+                elif left > target:
+                    left -= n
+                    threshold = count + 1
+                else:
+                    break
+        self.threshold = max(self.threshold, threshold)
+        self._counts = Counter({key: count for key, count
+                                in self._counts.items()
+                                if count >= threshold})
+        self._forget_unused_words()
+
+    def _forget_unused_words(self) -> None:
+        """Drops the words that are neither in the n-grams nor in
+        the tail and renumbers the others (keeping their order).
+        """
+        used = set(self._tail)
+        for key in self._counts:
+            used.update(self.decode(key))
+        if len(used) == len(self._ids):
+            return
+        new_ids = {}
+        ids = {}
+        for word, word_id in self._ids.items():
+            if word_id in used:
+                new_ids[word_id] = ids[word] = len(ids)
+        counts = Counter()
+        for key, count in self._counts.items():
+            new_key = 0
+            for word_id in self.decode(key):
+                new_key = new_key << ID_BITS | new_ids[word_id]
+            counts[new_key] = count
+        self._ids = ids
+        self._counts = counts
+        self._tail = [new_ids[word_id] for word_id in self._tail]
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """Yields the n-grams (words separated by spaces) that occurred
+        at least min_count times with their counts.
+        """
+        words = list(self._ids)
+        for key, count in self._counts.items():
+            if count >= self.min_count:
+                yield ' '.join(words[i] for i in self.decode(key)), count
+
+    def decode(self, key: int) -> Tuple[int, ...]:
+        """Unpacks the ids of the words of an n-gram.
+
+        :param key: packed n-gram
+        :return: word ids in the original order
+        """
+        ids = []
+        for _ in range(self.n):
+            ids.append(key & ID_MASK)
+            key >>= ID_BITS
+        return tuple(reversed(ids))
@@ -1,17 +1,529 @@
-"""Counts words in a Unicode text file"""
+"""Counts words in a Unicode text file
 
+By default the whole file is read at once. In streaming mode (--stream)
+the file is read in fixed-size chunks and the counter is updated
+incrementally, so memory is bounded by the vocabulary, not the file size.
+In parallel mode (--workers N) the file is split into byte ranges
+aligned on whitespace, each range is counted in a separate process
+and the partial counters are merged. The mmap backend (--mmap) tokenizes
+the memory-mapped file as bytes and decodes only the distinct tokens;
+files that are not pure ASCII are counted in streaming mode instead.
+In corpus mode (--corpus) the argument is a directory; per-file counts
+are kept in an on-disk index, so a rerun only counts new and changed
+files (see corpus_index module).
+Approximate mode (--approx-top K) reports the K most frequent words
+with error bounds using a fixed amount of memory (see heavy_hitters
+module). Filename '-' stands for the standard input (in the default,
+streaming and approximate modes), so the script can end a pipe.
+Exact counts can be written as text (default), CSV, NDJSON or in
+a compact binary format, sorted alphabetically or by frequency
+(see writers module). N-gram mode (--ngrams N) counts sequences of N
+consecutive words instead of single words (see ngrams module).
+"""
+
+import argparse
+import codecs
+import contextlib
+import locale
+import mmap
+import os
+import re
+import string
+import sys
 from collections import Counter
-from re import findall
-
-try:
-    words = findall(r'\w+', open(input('Filename: ')).read().lower())
-except OSError as e:
-    print(f'Could not open the file. {e.args[1]}.')
-    exit()
-else:
-    for w, c in sorted(Counter(words).items()):
-        print(f'{w:<25} {c} time' + 's' * (c > 1))
-
-# alternative ways to format the output:
-# f'{w:<25} {c} time'
-# '{:<25} {} time'.format(w, c)
+from functools import partial
+from multiprocessing import Pool
+from typing import BinaryIO, Callable, Iterable, Iterator, List, \
+    Optional, TextIO, Tuple
+
+from corpus_index import INDEX_FILENAME, CorpusIndex
+from heavy_hitters import SpaceSaving
+from ngrams import NgramCounter
+from writers import FORMATS, ORDERS, open_output, order_counts, write_counts
+
+WORD = re.compile(r'\w+')
+WORD_BYTES = (string.ascii_letters + string.digits + '_').encode('ascii')
+ASCII_TOKENS = bytes(  # lowercases letters, turns non-word bytes into spaces
+    byte if byte in WORD_BYTES else ord(' ') for byte in range(256)).lower()
+CHUNK_SIZE = 1 << 20  # characters (or bytes) per read in streaming mode
+WHITESPACE_BYTE = re.compile(rb'\s')  # never a part of a multibyte char
+
+
+def count_words(filename: str) -> Counter:
+    """Reads the whole file at once and counts the words in it.
+
+    :param filename: name of the text file ('-' for stdin)
+    :return: Counter {word: number of occurrences}
+    """
+    with open_text(filename) as f:
+        return Counter(WORD.findall(f.read().lower()))
+
+
+def count_words_streaming(filename: str,
+                          chunk_size=CHUNK_SIZE) -> Counter:
+    """Counts the words in the file reading it chunk by chunk.
+    The result is identical to count_words().
+
+    :param filename: name of the text file ('-' for stdin)
+    :param chunk_size: number of characters to read at a time
+    :return: Counter {word: number of occurrences}
+    """
+    counter = Counter()
+    with open_text(filename) as f:
+        for words in iter_word_chunks(iter_chunks(f, chunk_size)):
+            counter.update(words)
+    return counter
+
+
+def find_heavy_hitters(filename: str, capacity: int,
+                       chunk_size=CHUNK_SIZE) -> SpaceSaving:
+    """Reads the file chunk by chunk and feeds the words
+    into a Space-Saving summary of a fixed size.
+
+    :param filename: name of the text file ('-' for stdin)
+    :param capacity: maximum number of words to keep track of
+    :param chunk_size: number of characters to read at a time
+    :return: summary of the most frequent words
+    """
+    summary = SpaceSaving(capacity)
+    with open_text(filename) as f:
+        for words in iter_word_chunks(iter_chunks(f, chunk_size)):
+            summary.update_counts(Counter(words))
+    return summary
+
+
+def count_ngrams(filename: str, n: int, min_count=1,
+                 max_ngrams: Optional[int] = None,
+                 chunk_size=CHUNK_SIZE) -> NgramCounter:
+    """Reads the file chunk by chunk and counts n-grams
+    of the words found by the same tokenizer as in streaming mode.
+
+    :param filename: name of the text file ('-' for stdin)
+    :param n: number of words in an n-gram
+    :param min_count: minimal count of an n-gram to be reported
+    :param max_ngrams: prune rare n-grams when there are more of them
+        (requires min_count > 1)
+    :param chunk_size: number of characters to read at a time
+    :return: counts of n-grams
+    """
+    ngram_counter = NgramCounter(n, min_count, max_ngrams)
+    with open_text(filename) as f:
+        for words in iter_word_chunks(iter_chunks(f, chunk_size)):
+            ngram_counter.update(words)
+    return ngram_counter
+
+
+def open_text(filename: str) -> TextIO:
+    """Opens the file for reading in text mode.
+    Filename '-' stands for the standard input,
+    which is left open after the 'with' block.
+
+    :param filename: name of the text file or '-'
+    :return: file object to be used in a 'with' statement
+    """
+    if filename == '-':
+        return contextlib.nullcontext(sys.stdin)
+    return open(filename)
+
+
+def count_words_parallel(filename: str, workers: int,
+                         chunk_size=CHUNK_SIZE) -> Counter:
+    """Counts the words in the file using several processes
+    (map-reduce). The result is identical to count_words().
+
+    :param filename: name of the text file
+    :param workers: number of worker processes
+    :param chunk_size: number of bytes each worker reads at a time
+    :return: Counter {word: number of occurrences}
+    :raise ValueError: if the file encoding is not ASCII-compatible
+        (e.g. UTF-16), so it cannot be split at whitespace bytes
+    """
+    encoding = locale.getpreferredencoding(False)  # same as open()
+    if not _is_ascii_compatible(encoding):
+        raise ValueError(f"can't split text in '{encoding}' into "
+                         f"byte ranges; use streaming mode instead")
+    tasks = [(filename, start, stop, chunk_size, encoding)
+             for start, stop in split_into_ranges(filename, workers)]
+    counter = Counter()
+    with Pool(workers) as pool:
+        for partial_counter in pool.imap_unordered(_count_range, tasks):
+            counter.update(partial_counter)
+    return counter
+
+
+def count_words_mmap(filename: str, chunk_size=CHUNK_SIZE) -> Counter:
+    """Counts the words in the memory-mapped file without decoding it.
+    The result is identical to count_words().
+
+    Each chunk of bytes is lowercased and has its non-word bytes
+    replaced with spaces in a single bytes.translate() call, and then
+    it is split into tokens. Only the distinct tokens are decoded.
+    This is only correct for ASCII text, so once a non-ASCII byte is
+    found, the file is counted by count_words_streaming() instead.
+
+    :param filename: name of the text file
+    :param chunk_size: number of bytes to tokenize at a time
+    :return: Counter {word: number of occurrences}
+    """
+    encoding = locale.getpreferredencoding(False)  # same as open()
+    if not _is_ascii_compatible(encoding):
+        return count_words_streaming(filename, chunk_size)
+    raw_counter = Counter()
+    with open(filename, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return Counter()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                match = WHITESPACE_BYTE.search(mm, start + chunk_size)
+                stop = match.start() if match else size
+                chunk = mm[start:stop]
+                if not chunk.isascii():
+                    return count_words_streaming(filename, chunk_size)
+                raw_counter.update(chunk.translate(ASCII_TOKENS).split())
+                start = stop
+    return Counter({token.decode('ascii'): count
+                    for token, count in raw_counter.items()})
+
+
+def _is_ascii_compatible(encoding: str) -> bool:
+    """Checks if ASCII characters are encoded
+    as single bytes with the same codes as in ASCII.
+
+    :param encoding: name of the encoding
+    """
+    try:
+        return (string.printable.encode(encoding)
+                == string.printable.encode('ascii'))
+    except UnicodeError:
+        return False
+
+
+def split_into_ranges(filename: str, parts: int) -> List[Tuple[int, int]]:
+    """Splits the file into approximately equal byte ranges.
+    Every range except the first one starts with a whitespace byte,
+    so no word is split between two ranges.
+
+    :param filename: name of the file
+    :param parts: desired number of ranges
+    :return: list of (start, stop) byte offsets; may contain
+        fewer than 'parts' ranges if the file is small
+    """
+    size = os.path.getsize(filename)
+    boundaries = [0]
+    with open(filename, 'rb') as f:
+        for i in range(1, parts):
+            position = max(size * i // parts, boundaries[-1])
+            position = _find_whitespace(f, position, size)
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    if size > boundaries[-1]:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _find_whitespace(f: BinaryIO, position: int, size: int,
+                     block_size=4096) -> int:
+    """Returns the offset of the first whitespace byte at or after
+    the position (or the file size if there are no such bytes).
+
+    :param f: file opened in binary mode
+    :param position: offset to start searching from
+    :param size: size of the file
+    :param block_size: number of bytes to read at a time
+    """
+    f.seek(position)
+    while position < size:
+        block = f.read(block_size)
+        match = WHITESPACE_BYTE.search(block)
+        if match:
+            return position + match.start()
+        position += len(block)
+    return size
+
+
+def _count_range(task: Tuple[str, int, int, int, str]) -> Counter:
+    """Counts the words in a byte range of the file.
+    Runs in a worker process.
+
+    :param task: filename, start and stop offsets, chunk size, encoding
+    :return: Counter {word: number of occurrences}
+    """
+    filename, start, stop, chunk_size, encoding = task
+    counter = Counter()
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        chunks = _iter_decoded_range(f, stop - start, chunk_size, encoding)
+        for words in iter_word_chunks(chunks):
+            counter.update(words)
+    return counter
+
+
+def _iter_decoded_range(f: BinaryIO, length: int,
+                        chunk_size: int, encoding: str) -> Iterator[str]:
+    """Reads 'length' bytes from the current position chunk by chunk
+    and yields them decoded. Multibyte characters split between
+    chunks are handled by an incremental decoder.
+
+    :param f: file opened in binary mode
+    :param length: number of bytes to read
+    :param chunk_size: number of bytes to read at a time
+    :param encoding: encoding of the file
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    while length > 0:
+        data = f.read(min(chunk_size, length))
+        if not data:
+            break
+        length -= len(data)
+        yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+
+def iter_chunks(f: TextIO, chunk_size=CHUNK_SIZE) -> Iterator[str]:
+    """Yields consecutive chunks of the file until it is exhausted.
+
+    :param f: file opened in text mode
+    :param chunk_size: number of characters to read at a time
+    """
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_word_chunks(chunks: Iterable[str]) -> Iterator[List[str]]:
+    """Turns a stream of text chunks into a stream of word lists.
+
+    Each chunk is cut at its last whitespace character and the rest
+    of it is carried over to the next chunk. Thus a word split across
+    chunk boundaries is still counted once, and lowercasing (which is
+    context-sensitive for the final sigma) gives the same result as
+    lowercasing the whole text.
+
+    :param chunks: consecutive pieces of the text
+    :return: lists of lowercase words, one list per chunk
+    """
+    carry = ''
+    for chunk in chunks:
+        head, carry = _split_at_last_space(carry + chunk)
+        if head:
+            yield WORD.findall(head.lower())
+    if carry:
+        yield WORD.findall(carry.lower())
+
+
+def _split_at_last_space(text: str) -> Tuple[str, str]:
+    """Splits the text into a head that ends with whitespace
+    and a tail that contains no whitespace at all.
+
+    :param text: a piece of text
+    :return: head and tail
+    """
+    if not text or text[-1].isspace():
+        return text, ''
+    parts = text.rsplit(None, 1)
+    if len(parts) < 2:
+        return '', text
+    return text[:-len(parts[1])], parts[1]
+
+
+def print_heavy_hitters(summary: SpaceSaving, k: int) -> None:
+    """Prints the approximate top k words with their counts.
+    The count of each word is an upper bound of the true count,
+    the lower bound is shown in brackets.
+
+    :param summary: summary of the most frequent words
+    :param k: number of words to print
+    :return: None
+    """
+    top = summary.top(k)
+    # the words that are not listed are either monitored with
+    # a smaller count than the listed ones, or not monitored at all
+    bound = summary.max_unmonitored_count()
+    if len(top) == k and len(summary) > k:
+        bound = max(bound, top[-1][1])
+    print(f'Top {k} of {summary.total} words (approximate). Words that '
+          f'are not listed occur at most {bound} times.', file=sys.stderr)
+    for w, c, error in top:
+        print(f'{w:<25} {c} time' + 's' * (c > 1)
+              + f' (at least {c - error})')
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments.
+
+    :return: parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        'filename', nargs='?',
+        help='a text file (or a directory in corpus mode) '
+             'to count words in (asked for if omitted)')
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument(
+        '--stream', action='store_true',
+        help='read the file in chunks instead of all at once')
+    backend.add_argument(
+        '--mmap', action='store_true',
+        help='tokenize the memory-mapped file as bytes '
+             '(falls back to --stream if the file is not ASCII)')
+    backend.add_argument(
+        '--workers', type=_positive_int, default=1,
+        help='number of worker processes; more than 1 enables '
+             'parallel mode (default is 1)')
+    parser.add_argument(
+        '--chunk-size', type=_positive_int, default=CHUNK_SIZE,
+        help=f'characters (or bytes) per chunk in all modes '
+             f'except the default one (default is {CHUNK_SIZE})')
+    output = parser.add_argument_group('output')
+    output.add_argument(
+        '--format', choices=FORMATS, default='text',
+        help='output format (default is text)')
+    output.add_argument(
+        '--order', choices=ORDERS, default='alpha',
+        help='alphabetical order or the most frequent words first '
+             '(default is alpha)')
+    output.add_argument(
+        '--top', type=_positive_int, metavar='N',
+        help='output only N most frequent words')
+    output.add_argument(
+        '--output', metavar='FILE',
+        help="write to the file instead of the standard output")
+    ngrams = parser.add_argument_group('n-gram mode')
+    ngrams.add_argument(
+        '--ngrams', type=_positive_int, default=1, metavar='N',
+        help='count sequences of N consecutive words (default is 1)')
+    ngrams.add_argument(
+        '--min-count', type=_positive_int, default=1,
+        help='output only n-grams that occur at least this number '
+             'of times (default is 1)')
+    ngrams.add_argument(
+        '--max-ngrams', type=_positive_int,
+        help='drop n-grams rarer than --min-count (and the rarest of the '
+             'others if needed) whenever there are more distinct n-grams '
+             'than this; requires --min-count > 1 (default is no limit)')
+    approximate = parser.add_argument_group('approximate mode')
+    approximate.add_argument(
+        '--approx-top', type=_positive_int, metavar='K',
+        help='report only K most frequent words using a fixed amount '
+             'of memory; counts may be overestimated')
+    approximate.add_argument(
+        '--capacity', type=_positive_int,
+        help='number of words to keep track of in approximate mode; '
+             'more is slower but more accurate (default is 10 * K)')
+    corpus = parser.add_argument_group('corpus mode')
+    corpus.add_argument(
+        '--corpus', action='store_true',
+        help='count words in all matching files of the directory, '
+             'recounting only new and changed files since the last run')
+    corpus.add_argument(
+        '--pattern', default='*.txt',
+        help="file names to count in corpus mode (default is '*.txt')")
+    corpus.add_argument(
+        '--index',
+        help=f'index file for corpus mode '
+             f'(default is {INDEX_FILENAME} in the directory)')
+    args = parser.parse_args()
+    if args.corpus and args.approx_top:
+        parser.error('--approx-top is not supported in corpus mode')
+    if args.ngrams > 1 and (args.corpus or args.approx_top or args.mmap
+                            or args.workers > 1):
+        parser.error('n-gram mode supports only the default '
+                     'and streaming backends')
+    if args.ngrams == 1 and (args.min_count > 1 or args.max_ngrams):
+        parser.error('--min-count and --max-ngrams require --ngrams > 1')
+    if args.max_ngrams and args.min_count < 2:
+        parser.error('--max-ngrams requires --min-count > 1')
+    if args.approx_top and (args.format != 'text' or args.output):
+        parser.error('approximate mode supports only text output '
+                     'to the standard output')
+    return args
+
+
+def _positive_int(value: str) -> int:
+    """Used for validation of integer command line arguments.
+
+    :param value: argument value
+    :raise ArgumentTypeError: if the value is not a positive integer
+    """
+    if not value.isdigit() or int(value) == 0:
+        raise argparse.ArgumentTypeError(
+            f"'{value}' is not a positive integer")
+    return int(value)
+
+
+def select_backend(args: argparse.Namespace) -> Callable[[str], Counter]:
+    """Returns the function that counts words in a single file
+    according to the command line arguments.
+
+    :param args: parsed arguments
+    :return: a function that takes a filename and returns a Counter
+    """
+    if args.workers > 1:
+        return partial(count_words_parallel, workers=args.workers,
+                       chunk_size=args.chunk_size)
+    elif args.mmap:
+        return partial(count_words_mmap, chunk_size=args.chunk_size)
+    elif args.stream:
+        return partial(count_words_streaming, chunk_size=args.chunk_size)
+    return count_words
+
+
+def count_words_in_corpus(directory: str, args: argparse.Namespace
+                          ) -> Counter:
+    """Updates the index of the directory and returns the totals.
+    A summary of the update is printed to stderr.
+
+    :param directory: the directory with text files
+    :param args: parsed arguments
+    :return: Counter {word: number of occurrences}
+    """
+    if not os.path.isdir(directory):
+        raise NotADirectoryError(
+            0, f"'{directory}' is not a name of an existing directory")
+    index_filename = args.index or os.path.join(directory, INDEX_FILENAME)
+    with CorpusIndex(index_filename) as index:
+        summary = index.update(directory, select_backend(args), args.pattern)
+        print(', '.join(f'{n} {status}' for status, n in summary.items()),
+              'file(s)', file=sys.stderr)
+        return index.totals()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    if args.corpus:
+        directory = args.filename or input('Directory: ')
+    else:
+        filename = args.filename or input('Filename: ')
+    try:
+        if args.corpus:
+            counter = count_words_in_corpus(directory, args)
+        elif args.ngrams > 1:
+            counter = count_ngrams(filename, args.ngrams, args.min_count,
+                                   args.max_ngrams, args.chunk_size)
+            if counter.threshold > args.min_count:
+                print(f'The limit of n-grams was reached: n-grams rarer '
+                      f'than {counter.threshold} may be missing.',
+                      file=sys.stderr)
+        elif args.approx_top:
+            summary = find_heavy_hitters(
+                filename, args.capacity or 10 * args.approx_top,
+                args.chunk_size)
+        else:
+            counter = select_backend(args)(filename)
+    except OSError as e:
+        print(f'Could not open the file. {e.args[1]}.')
+        exit()
+    except ValueError as e:
+        print(f'Could not count the words. {e}.')
+        exit()
+    else:
+        if args.approx_top:
+            print_heavy_hitters(summary, args.approx_top)
+        else:
+            with open_output(args.output, args.format) as out:
+                write_counts(order_counts(counter, args.order, args.top),
+                             args.format, out)
@@ -0,0 +1,186 @@
+"""Bulk writers of word counts in human- and machine-readable formats.
+
+Supported formats:
+ * text   - padded columns, the original output of wordcounter;
+ * csv    - 'word,count' header followed by one row per word;
+ * ndjson - one JSON object per line: {"word": ..., "count": ...};
+ * binary - MAGIC followed by records, each record being
+            the length of the UTF-8 encoded word (varint),
+            the word itself and its count (varint).
+
+Rows are formatted in batches and each batch is written with a single
+call, so the cost of output does not depend on the number of words
+as heavily as with one print() per word.
+"""
+
+import contextlib
+import csv
+import heapq
+import json
+import sys
+from typing import BinaryIO, Callable, Dict, IO, Iterable, Iterator, \
+    Mapping, Optional, TextIO, Tuple
+
+FORMATS = ('text', 'csv', 'ndjson', 'binary')
+ORDERS = ('alpha', 'freq')
+MAGIC = b'WCNT\x01'  # file signature and version of the binary format
+BATCH_SIZE = 10000  # rows per write in text formats
+BUFFER_SIZE = 1 << 16  # bytes per write in binary format
+
+
+def order_counts(counts: Mapping[str, int], order='alpha',
+                 top: Optional[int] = None) -> Iterable[Tuple[str, int]]:
+    """Sorts the words with their counts.
+
+    :param counts: {word: number of occurrences}
+    :param order: 'alpha' - alphabetical order (default),
+        'freq' - the most frequent words first (ties are
+        broken alphabetically)
+    :param top: if specified, only this number of the most frequent
+        words is kept; they are selected with a partial sort
+    :return: sorted (word, count) pairs
+    """
+    def by_frequency(pair):
+        return -pair[1], pair[0]
+
+    if top is not None:
+        items = heapq.nsmallest(top, counts.items(), key=by_frequency)
+        return sorted(items) if order == 'alpha' else items
+    if order == 'freq':
+        return sorted(counts.items(), key=by_frequency)
+    return sorted(counts.items())
+
+
+def write_counts(items: Iterable[Tuple[str, int]], fmt: str,
+                 out: IO) -> None:
+    """Writes the words with their counts in the specified format.
+
+    :param items: (word, count) pairs
+    :param fmt: one of FORMATS
+    :param out: a binary stream for 'binary' format,
+        a text stream for the others
+    """
+    WRITERS[fmt](items, out)
+
+
+def open_output(filename: Optional[str], fmt: str) -> IO:
+    """Opens the file for writing in the mode suitable for the format.
+    If filename is None or '-', the standard output is used
+    (it is left open after the 'with' block).
+
+    :param filename: name of the output file
+    :param fmt: one of FORMATS
+    :return: file object to be used in a 'with' statement
+    """
+    if filename is None or filename == '-':
+        return contextlib.nullcontext(
+            sys.stdout.buffer if fmt == 'binary' else sys.stdout)
+    if fmt == 'binary':
+        return open(filename, 'wb')
+    return open(filename, 'w', encoding='utf-8', newline='')
+
+
+def write_text(items: Iterable[Tuple[str, int]], out: TextIO) -> None:
+    """Writes padded columns: word, count, 'time(s)'."""
+    _write_lines(
+        (f'{w:<25} {c} time' + 's' * (c > 1) + '\n' for w, c in items), out)
+
+# alternative ways to format the output:
+# f'{w:<25} {c} time'
+# '{:<25} {} time'.format(w, c)
+
+
+def write_csv(items: Iterable[Tuple[str, int]], out: TextIO) -> None:
+    """Writes 'word,count' header and a row per word."""
+    writer = csv.writer(out, dialect='excel')
+    writer.writerow(('word', 'count'))
+    writer.writerows(items)
+
+
+def write_ndjson(items: Iterable[Tuple[str, int]], out: TextIO) -> None:
+    """Writes a JSON object per line."""
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    _write_lines(
+        (f'{{"word": {encode(w)}, "count": {c}}}\n' for w, c in items), out)
+
+
+def write_binary(items: Iterable[Tuple[str, int]], out: BinaryIO) -> None:
+    """Writes MAGIC and length-prefixed UTF-8 words with varint counts."""
+    buffer = bytearray(MAGIC)
+    for w, c in items:
+        encoded = w.encode('utf-8')
+        length = len(encoded)
+        if length < 0x80:  # fast path for single-byte varints
+            buffer.append(length)
+        else:
+            buffer += _varint(length)
+        buffer += encoded
+        if c < 0x80:
+            buffer.append(c)
+        else:
+            buffer += _varint(c)
+        if len(buffer) >= BUFFER_SIZE:
+            out.write(buffer)
+            buffer.clear()
+    out.write(buffer)
+
+
+def read_binary(f: BinaryIO) -> Iterator[Tuple[str, int]]:
+    """Reads the words with their counts written by write_binary().
+
+    :param f: file opened in binary mode
+    :return: (word, count) pairs
+    :raise ValueError: if the file is not in the binary format
+    """
+    data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError('not a word count file')
+    position = len(MAGIC)
+    while position < len(data):
+        length, position = _read_varint(data, position)
+        word = data[position:position + length].decode('utf-8')
+        count, position = _read_varint(data, position + length)
+        yield word, count
+
+
+def _write_lines(lines: Iterable[str], out: TextIO) -> None:
+    """Writes the lines in batches of BATCH_SIZE."""
+    lines = iter(lines)
+    while True:
+        batch = ''.join(line for _, line in zip(range(BATCH_SIZE), lines))
+        if not batch:
+            return
+        out.write(batch)
+
+
+def _varint(number: int) -> bytes:
+    """Encodes a non-negative integer as unsigned LEB128."""
+    encoded = bytearray()
+    while number > 0x7f:
+        encoded.append(number & 0x7f | 0x80)
+        number >>= 7
+    encoded.append(number)
+    return bytes(encoded)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """Decodes unsigned LEB128 integer starting at the position.
+
+    :return: the integer and the position after it
+    """
+    number = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, position
+        shift += 7
+
+
+WRITERS: Dict[str, Callable[[Iterable[Tuple[str, int]], IO], None]] = {
+    'text': write_text,
+    'csv': write_csv,
+    'ndjson': write_ndjson,
+    'binary': write_binary,
+}
@@ -0,0 +1,140 @@
+"""Bitboard representation of a tic-tac-toe board.
+
+The board is stored as two 9-bit masks, one per player.
+Bit i of a mask corresponds to the cell with index i
+(i.e. position i + 1):
+    0 1 2
+    3 4 5
+    6 7 8
+A win is detected by a single lookup in a table precomputed for all
+512 masks, and vacant cells are the bitwise complement of both masks.
+
+BitBoard also supports the operations the game uses on a list board
+(indexing, assignment, 'in' and iteration), where a vacant cell
+is represented by its position number and a marked cell by 'x' or 'o'.
+So it can be passed wherever a list board is expected.
+"""
+
+FULL = 0b111111111  # all 9 cells
+
+WIN_MASKS = tuple(sum(1 << index for index in line) for line in (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # horizontal lines
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # vertical lines
+    (0, 4, 8), (2, 4, 6)              # diagonals
+))
+
+SYMMETRIES = (  # cell i of a transformed board is cell s[i] of the original
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # rotation by 90 degrees
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # rotation by 180 degrees
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # rotation by 270 degrees
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # reflection in the vertical axis
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # reflection in the horizontal axis
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # reflection in the main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0)   # reflection in the anti-diagonal
+)
+
+WINNING = tuple(  # WINNING[mask] - does the mask contain three in a row
+    any(mask & line == line for line in WIN_MASKS) for mask in range(512))
+
+
+class BitBoard:
+    """Tic-tac-toe board as two 9-bit masks."""
+
+    __slots__ = ('x', 'o')
+
+    def __init__(self, x=0, o=0):
+        """
+        :param x: int - mask of cells marked by player x
+        :param o: int - mask of cells marked by player o
+        """
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def from_list(cls, board):
+        """Converts a list board into a bitboard.
+        :param board: list
+        :return: BitBoard
+        """
+        x = o = 0
+        for index, cell in enumerate(board):
+            if cell == 'x':
+                x |= 1 << index
+            elif cell == 'o':
+                o |= 1 << index
+        return cls(x, o)
+
+    def to_list(self):
+        """Converts the bitboard into a list board.
+        :return: list
+        """
+        return [self[index] for index in range(9)]
+
+    def masks(self):
+        """
+        :return: tuple (mask of player x, mask of player o)
+        """
+        return self.x, self.o
+
+    def vacant(self):
+        """
+        :return: int - mask of vacant cells
+        """
+        return ~(self.x | self.o) & FULL
+
+    def vacant_positions(self):
+        """
+        :return: list of positions (1-9) of vacant cells
+        """
+        vacant = self.vacant()
+        return [index + 1 for index in range(9) if vacant >> index & 1]
+
+    def won(self, player):
+        """Checks if the player has three in a row.
+        :param player: str
+        :return: boolean
+        """
+        return WINNING[self.x if player == 'x' else self.o]
+
+    def mark(self, position, player):
+        """Marks the cell at the position (1-9).
+        :param position: int
+        :param player: str
+        :return: None
+        """
+        self[position - 1] = player
+
+    def __getitem__(self, index):
+        bit = 1 << index
+        if self.x & bit:
+            return 'x'
+        if self.o & bit:
+            return 'o'
+        return index + 1
+
+    def __setitem__(self, index, player):
+        if player == 'x':
+            self.x |= 1 << index
+        elif player == 'o':
+            self.o |= 1 << index
+        else:
+            raise ValueError(f"a cell can be marked only with 'x' or 'o', "
+                             f"not {player!r}")
+
+    def __contains__(self, item):
+        if item == 'x':
+            return bool(self.x)
+        if item == 'o':
+            return bool(self.o)
+        return (isinstance(item, int) and 1 <= item <= 9
+                and bool(self.vacant() >> (item - 1) & 1))
+
+    def __iter__(self):
+        return (self[index] for index in range(9))
+
+    def __len__(self):
+        return 9
+
+    def __repr__(self):
+        return f'BitBoard(x={self.x:#011b}, o={self.o:#011b})'
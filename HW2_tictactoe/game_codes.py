@@ -0,0 +1,113 @@
+"""Compact encoding of tic-tac-toe games as integers.
+
+A game is packed into a single int:
+    bits 0-35  - up to 9 moves, 4 bits per move: the position (1-9)
+                 of the 1st move in bits 0-3, of the 2nd in bits 4-7
+                 and so on; 0 means that there was no such move;
+    bits 36-37 - the outcome: 1 - player x won, 2 - player o won,
+                 3 - draw (0 - the game is not over).
+Player x always makes the odd moves, so players need not be stored.
+Such codes fit into 8 bytes (see array('Q') in tictactoe.py)
+instead of ~40 bytes of a record like 'x5-o1-x9-o3-x2-o8-x4-o6-x7-Draw!',
+and they are counted in a dict of ints.
+
+Games that are rotations or reflections of each other
+have the same canonical code (see canonical()).
+"""
+
+from bitboard import SYMMETRIES
+
+MOVE_BITS = 4
+MOVES_MASK = (1 << 9 * MOVE_BITS) - 1
+OUTCOME_SHIFT = 9 * MOVE_BITS
+OUTCOMES = (None, 'Player x won!', 'Player o won!', 'Draw!')
+
+
+def _build_byte_table(symmetry):
+    """Precomputes the mapping of positions by the symmetry
+    for every byte (i.e. two moves) of a code.
+    :param symmetry: cell i of a transformed board
+        is cell symmetry[i] of the original
+    :return: list of 256 ints
+    """
+    new_position = [0] + [symmetry.index(cell) + 1 for cell in range(9)]
+    new_position += range(10, 16)  # never occur in valid codes
+    return [new_position[byte & 0xf] | new_position[byte >> 4] << 4
+            for byte in range(256)]
+
+
+_BYTE_TABLES = [_build_byte_table(symmetry) for symmetry in SYMMETRIES[1:]]
+
+
+def encode(moves, outcome):
+    """
+    :param moves: list of positions (1-9) in the order of moves
+    :param outcome: str - one of OUTCOMES, e.g. 'Draw!'
+    :return: int
+    """
+    code = OUTCOMES.index(outcome) << OUTCOME_SHIFT
+    for index, position in enumerate(moves):
+        code |= position << index * MOVE_BITS
+    return code
+
+
+def decode(code):
+    """
+    :param code: int
+    :return: tuple (list of positions, outcome)
+    """
+    outcome = OUTCOMES[code >> OUTCOME_SHIFT]
+    moves = []
+    for _ in range(9):
+        if not code & 0xf:
+            break
+        moves.append(code & 0xf)
+        code >>= MOVE_BITS
+    return moves, outcome
+
+
+def to_record(code):
+    """Converts the code into the format of the log of tictactoe.py.
+    :param code: int
+    :return: str, e.g. 'x5-o1-x9-o3-x2-o8-x4-o6-x7-Draw!'
+    """
+    moves, outcome = decode(code)
+    return ''.join(f"{('x', 'o')[index % 2]}{position}-"
+                   for index, position in enumerate(moves)) + outcome
+
+
+def from_record(record):
+    """Converts a record in the format of the log of tictactoe.py.
+    :param record: str
+    :return: int
+    """
+    *moves, outcome = record.split('-')
+    return encode([int(move[1:]) for move in moves], outcome)
+
+
+def outcome_of(code):
+    """
+    :param code: int
+    :return: str - one of OUTCOMES
+    """
+    return OUTCOMES[code >> OUTCOME_SHIFT]
+
+
+def canonical(code):
+    """Returns the smallest code among the 8 symmetric variants
+    of the game (the outcome is the same for all of them).
+    :param code: int
+    :return: int
+    """
+    outcome = code & ~MOVES_MASK
+    moves = code & MOVES_MASK
+    best = moves
+    for table in _BYTE_TABLES:
+        variant = (table[moves & 0xff]
+                   | table[moves >> 8 & 0xff] << 8
+                   | table[moves >> 16 & 0xff] << 16
+                   | table[moves >> 24 & 0xff] << 24
+                   | table[moves >> 32] << 32)
+        if variant < best:
+            best = variant
+    return best | outcome
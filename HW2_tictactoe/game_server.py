@@ -0,0 +1,220 @@
+"""A TCP server for "human vs bot" games (asyncio, line protocol).
+
+Every connection gets its own Session - a small state machine that
+plays the same game as game() in tictactoe.py, but takes the moves
+from the connection instead of input(). The bot is called in the
+server process; a move takes microseconds, so it does not block
+the event loop. A session keeps just a BitBoard and a few fields,
+so thousands of idle connections need little memory.
+
+Protocol (one command per line, one response line per command):
+    NEW x|o  - start a new game playing x or o
+               -> OK <bot move or ->
+    MOVE n   - mark position n (1-9)
+               -> OK <bot move>  - the game goes on
+               -> END <bot move or -> <result>  - the game is over,
+                  e.g. 'END - Player x won!' or 'END 7 Draw!'
+    BOARD    - -> BOARD <board>, e.g. 'BOARD x---o----'
+    STATS    - -> STATS sessions=.. games=.. commands=.. maxrss_kb=..
+    QUIT     - close the connection
+Invalid commands and impossible moves get 'ERR <reason>'.
+"""
+
+import argparse
+import asyncio
+import re
+import resource
+
+from bitboard import BitBoard
+from tictactoe import RE_MOVE, RE_SIDE, bot, victory
+
+MAX_LINE = 64  # longer lines are not valid commands
+
+
+class Session:
+    """A game between the client and the bot."""
+
+    __slots__ = ('board', 'human', 'move')
+
+    def __init__(self):
+        self.board = None  # None if no game is being played
+        self.human = 'x'
+        self.move = 0
+
+    def handle(self, line):
+        """Executes a command.
+        :param line: str
+        :return: str - the response
+        """
+        command, _, argument = line.strip().partition(' ')
+        command = command.upper()
+        if command == 'NEW':
+            return self.new_game(argument.strip())
+        if command == 'MOVE':
+            return self.human_move(argument.strip())
+        if command == 'BOARD':
+            if self.board is None:
+                return 'ERR no game'
+            return 'BOARD ' + ''.join(cell if cell in ('x', 'o') else '-'
+                                      for cell in self.board)
+        return f'ERR unknown command {command!r}'
+
+    def new_game(self, side):
+        """
+        :param side: str - 'x' or 'o'
+        :return: str
+        """
+        if not re.match(RE_SIDE, side):
+            return 'ERR side must be x or o'
+        self.board = BitBoard()
+        self.human = side
+        self.move = 0
+        if side == 'o':
+            position, _ = self._bot_move()
+            return f'OK {position}'
+        return 'OK -'
+
+    def human_move(self, argument):
+        """Marks the position chosen by the client and replies
+        with the move of the bot.
+        :param argument: str - position
+        :return: str
+        """
+        if self.board is None:
+            return 'ERR no game'
+        if (not re.match(RE_MOVE, argument)
+                or int(argument) not in self.board):
+            return 'ERR impossible move'
+        result = self._mark(int(argument), self.human)
+        if result:
+            return 'END - ' + result
+        position, result = self._bot_move()
+        if result:
+            return f'END {position} {result}'
+        return f'OK {position}'
+
+    def _bot_move(self):
+        """
+        :return: tuple (position, result or '')
+        """
+        player = 'o' if self.human == 'x' else 'x'
+        position = bot(self.board, player)
+        return position, self._mark(position, player)
+
+    def _mark(self, position, player):
+        """Marks the cell and checks if the game is over.
+        :return: str - the result or '' if the game goes on
+        """
+        self.board.mark(position, player)
+        self.move += 1
+        return self._result(player)
+
+    def _result(self, player):
+        """Checks if the last move of the player has ended the game
+        (in the same way as game() in tictactoe.py).
+        :return: str - the result or ''
+        """
+        if victory(self.board, player):
+            result = f'Player {player} won!'
+        elif self.move == 9:
+            result = 'Draw!'
+        else:
+            return ''
+        self.board = None
+        return result
+
+
+class Server:
+    """Accepts connections and runs a session for each of them."""
+
+    def __init__(self, idle_timeout=None):
+        """
+        :param idle_timeout: float - seconds to wait for a command
+            before closing the connection (default is None - forever)
+        """
+        self.idle_timeout = idle_timeout
+        self.sessions = 0  # currently connected
+        self.games = 0  # finished
+        self.commands = 0  # handled
+
+    async def handle_connection(self, reader, writer):
+        """Reads commands and writes responses until the client
+        quits, disconnects or stays idle for too long.
+        """
+        session = Session()
+        self.sessions += 1
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(),
+                                                  self.idle_timeout)
+                except (asyncio.TimeoutError, ValueError):
+                    break  # idle for too long or the line is too long
+                if not line:
+                    break
+                line = line.decode('ascii', 'replace')
+                if line.strip().upper() == 'QUIT':
+                    break
+                if line.strip().upper() == 'STATS':
+                    response = self.stats()
+                else:
+                    response = session.handle(line)
+                    self.commands += 1
+                    self.games += response.startswith('END')
+                writer.write(response.encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    def stats(self):
+        """
+        :return: str - the response to STATS command
+        """
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return (f'STATS sessions={self.sessions} games={self.games} '
+                f'commands={self.commands} maxrss_kb={maxrss}')
+
+
+async def serve(host, port, idle_timeout=None):
+    """Runs the server forever.
+    :param host: str
+    :param port: int
+    :param idle_timeout: float
+    :return: None
+    """
+    bot(BitBoard(), 'x')  # loads the move table
+    server = await asyncio.start_server(
+        Server(idle_timeout).handle_connection, host, port,
+        limit=MAX_LINE, backlog=1024)
+    print(f'Serving on {host}:{port}')
+    async with server:
+        await server.serve_forever()
+
+
+def get_args_from_cmd():
+    """Parses command line arguments.
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument(
+        '--host', default='127.0.0.1',
+        help='address to listen on (default is 127.0.0.1)')
+    parser.add_argument(
+        '--port', type=int, default=7777,
+        help='port to listen on (default is 7777)')
+    parser.add_argument(
+        '--idle-timeout', type=float,
+        help='close connections idle for this number of seconds')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    try:
+        asyncio.run(serve(args.host, args.port, args.idle_timeout))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,133 @@
+"""Load generator for game_server.py.
+
+Opens a number of concurrent connections, each of them playing games
+against the bot with random moves, and measures the time from sending
+a command to receiving the response. Optionally holds extra idle
+connections open to see how much memory the server needs for them
+(reported by the server's STATS command).
+
+Reports moves/sec and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from verify_games import percentile
+
+
+async def play_games(host, port, games, latencies):
+    """Plays the games over a single connection.
+    :param host: str
+    :param port: int
+    :param games: int
+    :param latencies: list - response times (seconds) are appended
+    :return: dict {result: number of games}
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    timer = time.perf_counter
+    results = {}
+
+    async def request(command):
+        start = timer()
+        writer.write(command.encode() + b'\n')
+        response = (await reader.readline()).decode().rstrip('\n')
+        latencies.append(timer() - start)
+        if not response or response.startswith('ERR'):
+            raise RuntimeError(f'{command!r} -> {response!r}')
+        return response
+
+    try:
+        for _ in range(games):
+            vacant = list(range(1, 10))
+            response = await request(f'NEW {random.choice("xo")}')
+            while True:
+                bot_move = response.split(' ', 2)[1]
+                if bot_move != '-':
+                    vacant.remove(int(bot_move))
+                if response.startswith('END'):
+                    result = response.split(' ', 2)[2]
+                    results[result] = results.get(result, 0) + 1
+                    break
+                position = vacant.pop(random.randrange(len(vacant)))
+                response = await request(f'MOVE {position}')
+        writer.write(b'QUIT\n')
+    finally:
+        writer.close()
+    return results
+
+
+async def stats(host, port):
+    """
+    :return: str - the response of the server to STATS command
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'STATS\n')
+    response = (await reader.readline()).decode().strip()
+    writer.close()
+    return response
+
+
+async def run_load(host, port, clients, games, idle):
+    """Runs the clients concurrently.
+    :param host: str
+    :param port: int
+    :param clients: int - number of playing connections
+    :param games: int - games per client
+    :param idle: int - number of idle connections
+    :return: tuple (results, latencies, seconds, server stats)
+    """
+    idle_connections = [await asyncio.open_connection(host, port)
+                        for _ in range(idle)]
+    latencies = []
+    start_time = time.perf_counter()
+    client_results = await asyncio.gather(
+        *(play_games(host, port, games, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start_time
+    server_stats = await stats(host, port)
+    for _, writer in idle_connections:
+        writer.close()
+    results = {}
+    for client_result in client_results:
+        for result, n in client_result.items():
+            results[result] = results.get(result, 0) + n
+    return results, latencies, elapsed, server_stats
+
+
+def get_args_from_cmd():
+    """Parses command line arguments.
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--host', default='127.0.0.1',
+        help='address of the server (default is 127.0.0.1)')
+    parser.add_argument(
+        '--port', type=int, default=7777,
+        help='port of the server (default is 7777)')
+    parser.add_argument(
+        '--clients', type=int, default=100,
+        help='number of concurrent playing connections (default is 100)')
+    parser.add_argument(
+        '--games', type=int, default=100,
+        help='games per client (default is 100)')
+    parser.add_argument(
+        '--idle', type=int, default=0,
+        help='number of extra idle connections (default is 0)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    all_results, all_latencies, total_time, server_stats_line = asyncio.run(
+        run_load(args.host, args.port, args.clients, args.games, args.idle))
+    all_latencies.sort()
+    for outcome, n in sorted(all_results.items()):
+        print(f'{outcome:<15} {n}')
+    print(f'{len(all_latencies)} requests in {total_time:.2f} s, '
+          f'{len(all_latencies) / total_time:.0f} moves/sec')
+    print('latency, ms: ' + ', '.join(
+        f'p{percent} {percentile(all_latencies, percent) * 1000:.2f}'
+        for percent in (50, 90, 99)) + f', max {all_latencies[-1] * 1000:.2f}')
+    print(f'server: {server_stats_line}')
@@ -0,0 +1,130 @@
+"""Headless "bot vs bot" simulation of tic-tac-toe games.
+
+Unlike the 3rd mode of tictactoe.py, it needs no input() and
+runs the games in a pool of worker processes. Each worker seeds its
+own random number generator (derived from a common seed, so a run can
+be reproduced), plays its share of the games on a BitBoard and counts
+the distinct games in its own Counter. The counters are merged when
+all workers are done.
+
+Games are counted as ints (see game_codes), which are cheaper to hash,
+count and send between processes than records like
+'x5-o1-x9-o3-x2-o8-x4-o6-x7-Draw!'. Records are only made for output.
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from bitboard import BitBoard
+from game_codes import canonical, encode, outcome_of, to_record
+from tictactoe import bot
+
+
+def play_bot_game():
+    """Plays a single "bot vs bot" game.
+    :return: int - the code of the game (see game_codes)
+    """
+    board = BitBoard()
+    moves = []
+    for move in range(9):
+        player = ('x', 'o')[move % 2]
+        position = bot(board, player)
+        board.mark(position, player)
+        moves.append(position)
+        if board.won(player):
+            return encode(moves, f'Player {player} won!')
+    return encode(moves, 'Draw!')
+
+
+def simulate(games, workers=None, seed=None):
+    """Plays the games in a pool of worker processes.
+    :param games: int - total number of games
+    :param workers: int - number of processes
+        (default is the number of CPUs)
+    :param seed: int - the seed of all random number generators
+        (default is None - a random seed)
+    :return: tuple
+        Counter {game code: number of games},
+        list of (games, seconds) per worker
+    """
+    workers = workers or os.cpu_count()
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    bot(BitBoard(), 'x')  # loads the move table before the fork
+    tasks = [(games // workers + (index < games % workers),
+              f'{seed}:{index}') for index in range(workers)]
+    records = Counter()
+    timings = []
+    with Pool(workers) as pool:
+        for worker_records, elapsed in pool.imap(_play_games, tasks):
+            records.update(worker_records)
+            timings.append((sum(worker_records.values()), elapsed))
+    return records, timings
+
+
+def _play_games(task):
+    """Plays a part of the games. Runs in a worker process.
+    :param task: tuple (number of games, seed)
+    :return: tuple (Counter {game code: number of games}, seconds)
+    """
+    games, seed = task
+    random.seed(seed)
+    start_time = time.perf_counter()
+    records = Counter(play_bot_game() for _ in range(games))
+    return records, time.perf_counter() - start_time
+
+
+def summarize(records):
+    """Counts the outcomes of the games.
+    :param records: Counter {game code: number of games}
+    :return: dict {outcome: number of games}
+    """
+    outcomes = Counter()
+    for code, count in records.items():
+        outcomes[outcome_of(code)] += count
+    return dict(outcomes)
+
+
+def get_args_from_cmd():
+    """Parses command line arguments.
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        'games', type=int,
+        help='number of games to play')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count(),
+        help='number of worker processes (default is the number of CPUs)')
+    parser.add_argument(
+        '--seed', type=int,
+        help='seed to reproduce the results (default is random)')
+    parser.add_argument(
+        '--show-games', action='store_true',
+        help='print all distinct games with their counts')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    start = time.perf_counter()
+    all_records, worker_timings = simulate(args.games, args.workers,
+                                           args.seed)
+    total_time = time.perf_counter() - start
+    if args.show_games:
+        for game_record, n in sorted((to_record(code), n) for code, n
+                                     in all_records.items()):
+            print(f'{game_record:<40} {n}')
+    for outcome, n in sorted(summarize(all_records).items()):
+        print(f'{outcome:<15} {n}')
+    print(f'{len(all_records)} distinct games, '
+          f'{len(set(map(canonical, all_records)))} symmetry classes')
+    for index, (n, elapsed) in enumerate(worker_timings):
+        print(f'worker {index}: {n} games, '
+              f'{n / elapsed if elapsed else 0:.0f} games/sec')
+    print(f'total: {args.games} games in {total_time:.2f} s, '
+          f'{args.games / total_time:.0f} games/sec')
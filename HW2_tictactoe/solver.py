@@ -0,0 +1,343 @@
+"""A search-based tic-tac-toe bot for m x n boards with k in a row.
+
+Unlike tictactoe_bot, which is hard-wired for 3x3 boards, this bot
+searches the game tree: negamax with alpha-beta pruning, a transposition
+table shared between moves, symmetry reduction and iterative deepening
+within a time budget. Positions are stored as bitboards (one bit per
+cell per player). Small boards are solved completely, so the bot plays
+perfectly; on larger boards the deepest completed iteration decides,
+with a heuristic evaluation of open lines at the horizon.
+
+Symmetry reduction: a position and its rotations/reflections
+(8 for square boards, 4 for the others) share a single entry
+in the transposition table, and symmetric moves at the root
+are searched only once.
+
+Usage with tictactoe.game() (entities may contain bot functions):
+    solver = Solver(rows=4, cols=4, k=4, time_budget=1.0)
+    game({'x': solver.bot, 'o': solver.bot}, GridBoard(4, 4, 4))
+"""
+
+import random
+import time
+
+WIN = 1000000  # value of a win (plus the number of cells left vacant)
+INFINITY = 10 * WIN
+EXACT, LOWER, UPPER = 0, 1, 2  # kinds of values in the table
+LINE_WEIGHTS = (0, 1, 8, 64, 512, 4096, 32768)  # by the number of marks
+
+
+class _TimeIsUp(Exception):
+    """Interrupts an iteration of the search."""
+
+
+class GridBoard(list):
+    """A list board of any size: position numbers for vacant cells,
+    'x' or 'o' for marked ones. Knows its dimensions and the number
+    of marks in a row needed to win, so it can be passed to
+    tictactoe.game() together with a Solver bot.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        """
+        :param rows: int
+        :param cols: int
+        :param k: int - marks in a row needed to win
+        """
+        super().__init__(range(1, rows * cols + 1))
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self._lines = _lines(rows, cols, k)
+
+    def won(self, player):
+        """Checks if the player has k marks in a row.
+        :param player: str
+        :return: boolean
+        """
+        mask = _mask(self, player)
+        return any(mask & line == line for line in self._lines)
+
+
+class Solver:
+    """Searches for the best moves on an m x n board with k in a row."""
+
+    def __init__(self, rows=3, cols=3, k=3, time_budget=1.0,
+                 max_table_size=2000000):
+        """
+        :param rows: int
+        :param cols: int
+        :param k: int - marks in a row needed to win
+        :param time_budget: float - seconds per move
+        :param max_table_size: int - the transposition table is
+            cleared when it grows beyond this number of entries
+        """
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.time_budget = time_budget
+        self.max_table_size = max_table_size
+        self.full = (1 << self.cells) - 1
+        self.lines = _lines(rows, cols, k)
+        self.lines_through = [
+            [line for line in self.lines if line >> cell & 1]
+            for cell in range(self.cells)]
+        self.symmetries = _symmetries(rows, cols)
+        self.inverse = [[perm.index(cell) for cell in range(self.cells)]
+                        for perm in self.symmetries]
+        self._symmetry_tables = [self._build_symmetry_table(perm)
+                                 for perm in self.symmetries]
+        center = ((rows - 1) / 2, (cols - 1) / 2)
+        self.order = sorted(range(self.cells), key=lambda cell: (
+            abs(cell // cols - center[0]) + abs(cell % cols - center[1])))
+        self.table = {}
+        self.nodes = 0
+        self.depth = 0  # depth of the last completed iteration
+        self._deadline = 0.0
+
+    def bot(self, board, player):
+        """Chooses a random move among the best ones.
+        Has the same signature as tictactoe_bot.bot().
+        :param board: list (e.g. GridBoard) or BitBoard
+        :param player: str
+        :return: int - position (1 - rows * cols)
+        """
+        opponent = 'o' if player == 'x' else 'x'
+        moves = self.best_moves(_mask(board, player),
+                                _mask(board, opponent))
+        return random.choice(moves) + 1
+
+    def best_moves(self, me, opp):
+        """Searches with iterative deepening until the position
+        is solved or the time budget is exhausted.
+        :param me: int - mask of the player to move
+        :param opp: int - mask of the opponent
+        :return: list of cell indexes (0-based) of the best moves
+        """
+        self._deadline = time.perf_counter() + self.time_budget
+        if len(self.table) > self.max_table_size:
+            self.table.clear()
+        vacant = self.cells - bin(me | opp).count('1')
+        moves = [cell for cell in self.order if not (me | opp) >> cell & 1]
+        for depth in range(1, vacant + 1):
+            try:
+                values = self._search_root(me, opp, depth)
+            except _TimeIsUp:
+                break
+            best = max(values.values())
+            moves = [cell for cell, value in values.items() if value == best]
+            self.depth = depth
+            if abs(best) >= WIN:  # the outcome is already known
+                break
+        return moves
+
+    def value(self, me, opp):
+        """Returns the exact value of the position for the player to move
+        (positive - win, 0 - draw, negative - loss), ignoring the time
+        budget. Only feasible for small boards.
+        :param me: int
+        :param opp: int
+        :return: int
+        """
+        self._deadline = float('inf')
+        return self._negamax(me, opp, self.cells, -INFINITY, INFINITY)
+
+    def _search_root(self, me, opp, depth):
+        """Searches every move (one per class of symmetric moves).
+        Windows are narrowed so that every move with the best value
+        gets its exact value, while worse moves are cut off early.
+        :return: dict {cell: value}
+        """
+        classes = {}
+        for cell in self._ordered_moves(me, opp, None):
+            child, _ = self._canonical(opp, me | 1 << cell)
+            classes.setdefault(child, []).append(cell)
+        vacant = self.cells - bin(me | opp).count('1')
+        best = -INFINITY
+        values = {}
+        for cells in classes.values():
+            cell = cells[0]
+            if self._wins(me | 1 << cell, cell):
+                value = WIN + vacant - 1
+            else:
+                value = -self._negamax(opp, me | 1 << cell, depth - 1,
+                                       -INFINITY, -(best - 1))
+            best = max(best, value)
+            values.update(dict.fromkeys(cells, value))
+        return values
+
+    def _negamax(self, me, opp, depth, alpha, beta):
+        """Returns the value of the position for the player to move.
+        The value is exact if it lies within (alpha, beta).
+        """
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self._deadline:
+            raise _TimeIsUp
+        occupied = me | opp
+        if occupied == self.full:
+            return 0
+        vacant = self.cells - bin(occupied).count('1')
+        depth = min(depth, vacant)
+        if depth == 0:
+            return self._evaluate(me, opp)
+        key, symmetry = self._canonical(me, opp)
+        entry = self.table.get(key)
+        hint = None
+        if entry is not None:
+            entry_depth, entry_value, kind, canonical_cell = entry
+            if entry_depth >= depth:
+                if kind == EXACT:
+                    return entry_value
+                elif kind == LOWER:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value
+            hint = self.symmetries[symmetry][canonical_cell]
+        original_alpha = alpha
+        best, best_cell = -INFINITY, None
+        for cell in self._ordered_moves(me, opp, hint):
+            moved = me | 1 << cell
+            if self._wins(moved, cell):
+                value = WIN + vacant - 1
+            else:
+                value = -self._negamax(opp, moved, depth - 1, -beta, -alpha)
+            if value > best:
+                best, best_cell = value, cell
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+        kind = (UPPER if best <= original_alpha
+                else LOWER if best >= beta else EXACT)
+        if (best >= WIN and kind != UPPER
+                or best <= -WIN and kind != LOWER):
+            depth = vacant  # a forced win or loss is proven at any depth
+        self.table[key] = (depth, best, kind,
+                           self.inverse[symmetry][best_cell])
+        return best
+
+    def _ordered_moves(self, me, opp, hint):
+        """Vacant cells, the hint (the best move found earlier)
+        first, then from the center outwards.
+        """
+        occupied = me | opp
+        moves = [cell for cell in self.order if not occupied >> cell & 1]
+        if hint is not None and hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+        return moves
+
+    def _wins(self, mask, cell):
+        """Checks the lines through the cell that has just been marked."""
+        return any(mask & line == line for line in self.lines_through[cell])
+
+    def _evaluate(self, me, opp):
+        """Heuristic value: lines that are still open for each player,
+        weighted by the number of marks already in them.
+        """
+        score = 0
+        for line in self.lines:
+            if not line & opp:
+                score += LINE_WEIGHTS[bin(line & me).count('1')]
+            elif not line & me:
+                score -= LINE_WEIGHTS[bin(line & opp).count('1')]
+        return score
+
+    def _canonical(self, me, opp):
+        """Returns the smallest key among the symmetric variants
+        of the position and the index of the symmetry that gives it.
+        """
+        position = me | opp << self.cells
+        best_key, best_symmetry = position, 0
+        for symmetry in range(1, len(self._symmetry_tables)):
+            key, rest = 0, position
+            for chunk_table in self._symmetry_tables[symmetry]:
+                key |= chunk_table[rest & 0xff]
+                rest >>= 8
+            if key < best_key:
+                best_key, best_symmetry = key, symmetry
+        return best_key, best_symmetry
+
+    def _build_symmetry_table(self, perm):
+        """Precomputes the permutation of bits of a position
+        (2 * cells bits) byte by byte.
+        :param perm: cell i of the result is cell perm[i] of the original
+        :return: list of 256-element lists, one per byte
+        """
+        destination = {}
+        for new_cell, old_cell in enumerate(perm):
+            destination[old_cell] = new_cell
+            destination[old_cell + self.cells] = new_cell + self.cells
+        tables = []
+        for start in range(0, 2 * self.cells, 8):
+            chunk_table = []
+            for byte in range(256):
+                bits = 0
+                for offset in range(8):
+                    if byte >> offset & 1 and start + offset in destination:
+                        bits |= 1 << destination[start + offset]
+                chunk_table.append(bits)
+            tables.append(chunk_table)
+        return tables
+
+
+def _mask(board, player):
+    """Converts the marks of the player on a list board
+    (or a BitBoard) into a bit mask.
+    """
+    masks = getattr(board, 'masks', None)
+    if masks is not None:
+        return masks()[player == 'o']
+    mask = 0
+    for index, cell in enumerate(board):
+        if cell == player:
+            mask |= 1 << index
+    return mask
+
+
+def _lines(rows, cols, k):
+    """Returns masks of all segments of k cells in a row
+    (horizontal, vertical and diagonal).
+    """
+    lines = []
+    for row in range(rows):
+        for col in range(cols):
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row = row + d_row * (k - 1)
+                end_col = col + d_col * (k - 1)
+                if 0 <= end_row < rows and 0 <= end_col < cols:
+                    lines.append(sum(
+                        1 << (row + d_row * i) * cols + col + d_col * i
+                        for i in range(k)))
+    return lines
+
+
+def _symmetries(rows, cols):
+    """Returns permutations of cells that map the board onto itself:
+    cell i of a transformed board is cell perm[i] of the original.
+    The identity comes first.
+    """
+    transforms = [
+        lambda r, c: (r, c),
+        lambda r, c: (rows - 1 - r, c),
+        lambda r, c: (r, cols - 1 - c),
+        lambda r, c: (rows - 1 - r, cols - 1 - c)
+    ]
+    if rows == cols:
+        transforms += [
+            lambda r, c: (c, r),
+            lambda r, c: (cols - 1 - c, r),
+            lambda r, c: (c, rows - 1 - r),
+            lambda r, c: (cols - 1 - c, rows - 1 - r)
+        ]
+    symmetries = []
+    for transform in transforms:
+        perm = [0] * (rows * cols)
+        for r in range(rows):
+            for c in range(cols):
+                new_r, new_c = transform(r, c)
+                perm[new_r * cols + new_c] = r * cols + c
+        symmetries.append(tuple(perm))
+    return symmetries
@@ -0,0 +1,132 @@
+"""Checks and benchmarks of the search-based bot (solver module).
+
+3x3: the solver must never lose to tictactoe_bot and, like two
+tictactoe_bot bots, two solvers must always draw.
+Larger boards (4x4 and 5x5 with 4 in a row by default): solver vs
+solver games with the time spent per move, the depth of the deepest
+completed iteration and the number of searched nodes per second.
+
+All games are played through tictactoe.game().
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import tictactoe
+from bitboard import BitBoard
+from solver import GridBoard, Solver
+from tictactoe_bot import bot as rule_bot
+
+
+class _TimedBot:
+    """Wraps a Solver bot and records the statistics of every move."""
+
+    def __init__(self, solver):
+        """
+        :param solver: Solver
+        """
+        self.solver = solver
+        self.times = []
+        self.depths = []
+        self.nodes = 0
+
+    def __call__(self, board, player):
+        nodes = self.solver.nodes
+        start_time = time.perf_counter()
+        position = self.solver.bot(board, player)
+        self.times.append(time.perf_counter() - start_time)
+        self.depths.append(self.solver.depth)
+        self.nodes += self.solver.nodes - nodes
+        return position
+
+
+def play(x_bot, o_bot, new_board, games):
+    """Plays the games without output.
+    :param x_bot: function - bot(board, player)
+    :param o_bot: function
+    :param new_board: function that returns an empty board
+    :param games: int
+    :return: Counter {outcome: number of games}
+    """
+    outcomes = Counter()
+    for _ in range(games):
+        outcomes[tictactoe.game({'x': x_bot, 'o': o_bot}, new_board())] += 1
+    return outcomes
+
+
+def check_3x3(games, time_budget):
+    """Plays the solver against itself and against tictactoe_bot.
+    :param games: int - games per pair of bots
+    :param time_budget: float - seconds per move
+    :return: bool - True if the solver never lost and
+        all solver vs solver games are draws
+    """
+    solver_bot = Solver(time_budget=time_budget).bot
+    pairs = (('tictactoe_bot', rule_bot, 'tictactoe_bot', rule_bot),
+             ('solver', solver_bot, 'solver', solver_bot),
+             ('solver', solver_bot, 'tictactoe_bot', rule_bot),
+             ('tictactoe_bot', rule_bot, 'solver', solver_bot))
+    passed = True
+    for x_name, x_bot, o_name, o_bot in pairs:
+        outcomes = play(x_bot, o_bot, BitBoard, games)
+        print(f'{x_name} (x) vs {o_name} (o): {dict(outcomes)}')
+        if x_name == 'solver' and outcomes['Player o won!'] \
+                or o_name == 'solver' and outcomes['Player x won!'] \
+                or x_bot is o_bot and len(outcomes) > 1:
+            passed = False
+    return passed
+
+
+def benchmark(rows, cols, k, games, time_budget):
+    """Plays solver vs solver games on a larger board.
+    :param rows: int
+    :param cols: int
+    :param k: int - marks in a row needed to win
+    :param games: int
+    :param time_budget: float - seconds per move
+    :return: None
+    """
+    timed_bot = _TimedBot(Solver(rows, cols, k, time_budget))
+    start_time = time.perf_counter()
+    outcomes = play(timed_bot, timed_bot,
+                    lambda: GridBoard(rows, cols, k), games)
+    total_time = time.perf_counter() - start_time
+    times = timed_bot.times
+    search_time = sum(times)
+    print(f'{rows}x{cols}, {k} in a row: {dict(outcomes)}')
+    print(f'  {len(times)} moves in {total_time:.2f} s, '
+          f'mean {search_time / len(times):.3f} s, '
+          f'max {max(times):.3f} s per move')
+    print(f'  depth: min {min(timed_bot.depths)}, '
+          f'max {max(timed_bot.depths)}; '
+          f'{timed_bot.nodes / search_time:.0f} nodes/sec')
+
+
+def get_args_from_cmd():
+    """Parses command line arguments.
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--games', type=int, default=10,
+        help='games per 3x3 pair of bots (default is 10)')
+    parser.add_argument(
+        '--large-games', type=int, default=1,
+        help='games per larger board (default is 1)')
+    parser.add_argument(
+        '--time-budget', type=float, default=1.0,
+        help='seconds per move on larger boards (default is 1.0)')
+    parser.add_argument(
+        '--boards', nargs='*', default=['4x4x4', '5x5x4'],
+        help='larger boards as ROWSxCOLSxK (default is 4x4x4 5x5x4)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    if not check_3x3(args.games, args.time_budget):
+        print('3x3 check FAILED')
+    for board in args.boards:
+        benchmark(*map(int, board.split('x')), args.large_games,
+                  args.time_budget)
@@ -0,0 +1,99 @@
+"""Tests of the move table of tictactoe_bot against the original
+strategy (run from this directory: python -m unittest test_tictactoe_bot).
+"""
+
+import unittest
+
+from bitboard import BitBoard
+from tictactoe_bot import CORNERS, FORKS, LINES, build_move_table, \
+    expand_move_table, load_move_table, _complete_combinations, \
+    _select_true_forks
+
+
+def original_moves(board, player):
+    """Returns every move that the original bot() (before the move
+    table) could return in the position, i.e. the support of its
+    random choice, following the same cases in the same order.
+    """
+    opponent = 'o' if player == 'x' else 'x'
+    true_forks = _select_true_forks(board, FORKS.keys())
+    params = {
+        '1': (board, LINES, player),
+        '2': (board, LINES, opponent),
+        '3': (board, true_forks, player),
+        '4': (board, true_forks, opponent),
+        '6': (board, CORNERS, opponent)
+    }
+    moves = set()  # the moves of the cases that are taken at random
+    for case in '12345678':
+        if case in params:
+            comp_comb = _complete_combinations(*params[case])
+            if case == '4' and len(comp_comb) > 1:
+                comp_comb = _complete_combinations(
+                    board, LINES, player, s=3, warning=comp_comb)
+            if comp_comb:
+                return moves | comp_comb
+        elif case == '5' and 5 in board:
+            if opponent in board:
+                return {5}
+            moves.add(5)  # 20% of the first moves
+        elif case in '78':
+            for cells in ({1, 3, 7, 9}, {2, 4, 6, 8}):
+                vacant = cells.intersection(board)
+                if vacant:
+                    return moves | vacant
+
+
+def positions():
+    """Yields (board, player to move) for every position of a game
+    that is not over, by playing every move from the empty board.
+    """
+    seen = set()
+    stack = [(list(range(1, 10)), 'x')]
+    while stack:
+        board, player = stack.pop()
+        key = tuple(board)
+        if key in seen:
+            continue
+        seen.add(key)
+        if any(len({board[index] for index in line}) == 1
+               for line in LINES):
+            continue  # won
+        vacant = [cell for cell in board if cell not in ('x', 'o')]
+        if not vacant:
+            continue  # draw
+        yield board, player
+        opponent = 'o' if player == 'x' else 'x'
+        for position in vacant:
+            stack.append(([player if cell == position else cell
+                           for cell in board], opponent))
+
+
+class MoveTableTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table = build_move_table()
+        cls.expanded = expand_move_table(cls.table)
+
+    def test_every_position_matches_the_original_bot(self):
+        players = {'x': 0, 'o': 0}
+        for board, player in positions():
+            players[player] += 1
+            moves = self.expanded.get(BitBoard.from_list(board).masks())
+            with self.subTest(board=board, player=player):
+                self.assertIsNotNone(moves)
+                self.assertEqual(len(moves), len(set(moves)))
+                self.assertEqual(set(moves), original_moves(board, player))
+        self.assertEqual(players, {'x': 2423, 'o': 2097})
+
+    def test_no_other_positions(self):
+        self.assertEqual(len(self.expanded),
+                         sum(1 for _ in positions()))
+
+    def test_cached_table(self):
+        self.assertEqual(load_move_table(), self.table)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,11 +10,22 @@ i.e. it can either win or draw. For proper implementation
 of 2nd and 3rd modes, tictactoe_bot module should be imported.
 In case of ImportError, the bot is replaced with a substitute
 that makes random moves.
+
+The board is either a list (position numbers for vacant cells,
+'x' or 'o' for marked ones) or a BitBoard (see bitboard module)
+which supports the same operations. "Bot vs bot" games use BitBoard.
+game() can also be called directly with other bots and boards,
+e.g. solver.Solver bots on an m x n solver.GridBoard.
 """
 
 import random
 import re
 import sys
+from array import array
+from collections import Counter
+
+from bitboard import BitBoard
+from game_codes import canonical, encode, to_record
 
 try:
     from tictactoe_bot import bot  # smart bot (original)
@@ -44,38 +55,52 @@ HINT_MODE = "Please type a single digit from 1 to 3: "
 HINT_SIDE = "Please type a single character (x or o): "
 HINT_MOVE = "Please type a single digit from 1 to 9: "
 HINT_ITER = "Input should be integer. Please try again: "
-log = ''
+log = array('Q')  # "bot vs bot" games encoded as ints (see game_codes)
 
 
 def visualize(board, entities):
     """Prints the current state of game board (for humans).
-    :param board: list
+    :param board: list or BitBoard
     :param entities: dict
     :return: None
     """
     if 'human' not in entities.values():
         return
-    for i in range(3):
+    cols = getattr(board, 'cols', 3)
+    rows = len(board) // cols
+    width = len(str(len(board))) + 2
+    for i in range(rows):
         if i == 0:
-            print('┌───┬───┬───┐')
-        print(f'│ {board[3 * i]} │ {board[3 * i + 1]} │ {board[3 * i + 2]} │')
-        if i <= 1:
-            print('├───┼───┼───┤')
-        if i == 2:
-            print('└───┴───┴───┘')
+            print('┌' + '┬'.join(['─' * width] * cols) + '┐')
+        print('│' + '│'.join(f'{board[cols * i + j]!s:^{width}}'
+                             for j in range(cols)) + '│')
+        if i < rows - 1:
+            print('├' + '┼'.join(['─' * width] * cols) + '┤')
+        if i == rows - 1:
+            print('└' + '┴'.join(['─' * width] * cols) + '┘')
 
 
-def game(entities):
+def game(entities, board=None, moves=None):
     """Implements game process in all 3 modes.
     Returns game result
     :param entities: dict
+        values - 'human', 'bot' or a bot function
+        with the same signature as bot()
+    :param board: list or BitBoard
+        empty board to play on (default is a 3x3 list board)
+    :param moves: list - the marked positions are appended to it
+        in the order of moves (default is None - not recorded)
     :return: str
     """
-    board = [i + 1 for i in range(9)]  # position numbers
+    if board is None:
+        board = [i + 1 for i in range(9)]  # position numbers
     visualize(board, entities)
-    for move in range(9):
+    for move in range(len(board)):
         player = ('x', 'o')[move % 2]
-        board[get_pos(board, player, entities) - 1] = player
+        position = get_pos(board, player, entities)
+        board[position - 1] = player
+        if moves is not None:
+            moves.append(position)
         visualize(board, entities)
         if victory(board, player):
             return f'Player {player} won!'
@@ -84,19 +109,16 @@ def game(entities):
 
 def victory(board, player):
     """Checks if the particular player has won the game.
-    Uses tuples with predefined indexes.
-    :param board: list
+    A plain 3x3 list board is converted into a bitboard,
+    which checks all lines with a single lookup.
+    Other boards (e.g. solver.GridBoard) check themselves.
+    :param board: list, BitBoard or any board with won() method
     :param player: str
     :return: boolean
     """
-    for L in (  # index combinations for board list corresponding to:
-            (0, 1, 2), (3, 4, 5), (6, 7, 8),  # horizontal lines
-            (0, 3, 6), (1, 4, 7), (2, 5, 8),  # vertical lines
-            (0, 4, 8), (2, 4, 6)              # diagonals
-    ):
-        if board[L[0]] == board[L[1]] == board[L[2]] == player:
-            return True
-    return False
+    if not hasattr(board, 'won'):
+        board = BitBoard.from_list(board)
+    return board.won(player)
 
 
 def get_pos(board, player, entities):
@@ -104,7 +126,7 @@ def get_pos(board, player, entities):
     If player is human, the function checks
     if the move is possible.
     :param entities: dict
-    :param board: list
+    :param board: list or BitBoard
     :param player: str
     :return: int
     """
@@ -117,12 +139,10 @@ def get_pos(board, player, entities):
                 continue
             break
     else:
-        position = bot(board, player)
+        player_bot = entities[player] if callable(entities[player]) else bot
+        position = player_bot(board, player)
         if 'human' in entities.values():
             print(f'Player {player} (bot): {position}')
-        else:
-            global log
-            log += f'{player}{position}-'
     return position
 
 
@@ -168,14 +188,19 @@ def print_log():
     :return: None
     """
     print('\n===========All games:===========\n')
-    print(log)
-    all_combinations = sorted(set(log.strip().split('\n')))
+    print(''.join(to_record(code) + '\n' for code in log))
+    game_counts = Counter(log)
+    all_combinations = sorted(to_record(code) for code in game_counts)
     print('========All combinations:=======\n')
     for record in all_combinations:
         print(record)
+    perfect_bots = 'tictactoe_bot' in sys.modules.keys()
     print(f'\n{len(all_combinations)} game combinations '
-          + 'out of 48' * ('tictactoe_bot' in sys.modules.keys()))
-    # 48 == 3 distinct combinations * 4 rotations * 4 reflections
+          + 'out of 48' * perfect_bots)
+    symmetry_classes = {canonical(code) for code in game_counts}
+    print(f'{len(symmetry_classes)} symmetry classes '
+          + 'out of 6' * perfect_bots)
+    # 48 == 6 symmetry classes * 8 symmetries (4 rotations * 2 reflections)
 
 
 def _main():
@@ -184,10 +209,10 @@ def _main():
         print(game(entities))  # print game result
     else:
         iterations = int(validate_input(MSG_ITER, RE_ITER, HINT_ITER))
-        global log
         for i in range(iterations):
-            log_outcome = game(entities)
-            log += log_outcome + '\n'
+            moves = []
+            log_outcome = game(entities, BitBoard(), moves)
+            log.append(encode(moves, log_outcome))
         print_log()
 
 
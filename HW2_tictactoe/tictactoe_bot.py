@@ -4,10 +4,24 @@ i.e. it can either win or draw.
 
 The bot is implemented as function bot().
 The bot is hard-wired, i.e. implemented w/o ML.
+
+The strategy itself is implemented in rule_moves(), which returns
+every move the strategy allows in the position. Since these moves
+depend on nothing but the position, they are precomputed for every
+reachable position (canonicalized under the 8 symmetries of the board)
+and cached in MOVE_TABLE_FILE. So bot() is just a lookup followed by
+a random choice. Run this module to rebuild the cached table and
+verify it against rule_moves() in every reachable position;
+test_tictactoe_bot.py checks it against the cases of the original
+bot(), which chose a random move itself.
 """
 
+import json
+import os
 import random
 
+from bitboard import SYMMETRIES, BitBoard
+
 FORKS = {
     # indexes for board list:
     # 0 1 2
@@ -51,13 +65,47 @@ CORNERS = {  # index combinations for opposite corners
     (0, 8), (2, 6)
 }
 
+MOVE_TABLE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'move_table.json')
+MOVE_TABLE_VERSION = 1  # increment when the strategy changes
+
+_move_table = {}  # (x mask, o mask): moves; filled on the first bot() call
 
-def bot(board, player):  # rename into bot() !!!
+
+def bot(board, player):
     """Implements a strategy of a perfect tic-tac-toe player.
-    :param board: list
+    Picks a random move among those allowed by the strategy
+    (see rule_moves()) using the precomputed move table.
+    :param board: list or BitBoard
     :param player: str
     :return: int
     """
+    return random.choice(bot_moves(board, player))
+
+
+def bot_moves(board, player):
+    """Returns the moves bot() chooses from (with equal probability).
+    :param board: list or BitBoard
+    :param player: str
+    :return: tuple of ints
+    """
+    if not _move_table:
+        _move_table.update(expand_move_table(load_move_table()))
+    if not isinstance(board, BitBoard):
+        board = BitBoard.from_list(board)
+    moves = _move_table.get(board.masks())
+    if moves is None:  # not a reachable position
+        moves = tuple(sorted(rule_moves(board, player)))
+    return moves
+
+
+def rule_moves(board, player):
+    """Implements a strategy of a perfect tic-tac-toe player.
+    Returns all the moves the strategy allows in the position.
+    :param board: list or BitBoard
+    :param player: str
+    :return: set
+    """
     # The strategy is implemented as a sequence of cases
     # that are checked one after another until the right
     # case is found:
@@ -108,6 +156,7 @@ def bot(board, player):  # rename into bot() !!!
         '4': (board, true_forks, opponent),
         '6': (board, CORNERS, opponent)
     }
+    center = set()
     for case in '12345678':
         if case in params.keys():
             comp_comb = _complete_combinations(*params[case])
@@ -115,18 +164,18 @@ def bot(board, player):  # rename into bot() !!!
                 comp_comb = _complete_combinations(
                     board, LINES, player, s=3, warning=comp_comb)
             if comp_comb:
-                return list(comp_comb).pop(
-                    round(random.random() * len(comp_comb)) - 1)
+                return comp_comb
         elif case == '5':
-            if 5 in board and (opponent in board or random.random() <= 0.2):
-                return 5  # player x will start from 5 in 20% of cases
-        elif case in '78':
-            corners, sides = [1, 3, 7, 9], [2, 4, 6, 8]
-            random.shuffle(corners)
-            random.shuffle(sides)
-            for pos in corners + sides:
-                if pos in board:
-                    return pos
+            if 5 in board and opponent in board:
+                return {5}
+            elif 5 in board:  # the first move: center or any corner
+                center = {5}  # i.e. player x starts from 5 in 20% of cases
+        elif case == '7':
+            corners = {1, 3, 7, 9}.intersection(board)
+            if corners:
+                return center | corners
+        elif case == '8':
+            return {2, 4, 6, 8}.intersection(board)
 
 
 def _select_true_forks(board, forks):
@@ -199,3 +248,140 @@ def _handle_warning(marks, warning):
         if mark in warning:
             exclude.update(marks - {mark})
     return marks - exclude
+
+
+def load_move_table(filename=MOVE_TABLE_FILE):
+    """Reads the move table from the file.
+    If the file does not exist or is outdated,
+    builds the table and tries to save it.
+    :param filename: str
+    :return: dict
+    """
+    try:
+        with open(filename, 'rt', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == MOVE_TABLE_VERSION:
+            return cache['table']
+    except (OSError, ValueError):
+        pass
+    table = build_move_table()
+    try:
+        with open(filename, 'wt', encoding='utf-8') as f:
+            json.dump({'version': MOVE_TABLE_VERSION, 'table': table}, f)
+    except OSError:
+        pass  # the table is still usable, it just won't be cached
+    return table
+
+
+def build_move_table():
+    """Applies the strategy to every reachable position
+    in canonical form (see canonicalize()).
+    :return: dict
+        keys - canonical positions, e.g. 'x---o----';
+        values - sorted lists of moves (positions 1-9)
+    """
+    table = {}
+    for board in reachable_positions():
+        key, _ = canonicalize(_board_to_key(board))
+        if key not in table:
+            table[key] = sorted(rule_moves(_key_to_board(key), _turn(key)))
+    return table
+
+
+def expand_move_table(table):
+    """Maps every symmetric variant of each canonical position
+    to its moves, so that bot() needs no canonicalization.
+    :param table: dict (see build_move_table())
+    :return: dict
+        keys - bitboard masks (x, o); values - tuples of moves
+    """
+    expanded = {}
+    for key, moves in table.items():
+        for symmetry in SYMMETRIES:
+            variant = _key_to_board(_transform(key, symmetry))
+            expanded[BitBoard.from_list(variant).masks()] = tuple(
+                symmetry.index(move - 1) + 1 for move in moves)
+    return expanded
+
+
+def canonicalize(key):
+    """Returns the smallest of 8 symmetric variants of the position
+    and the symmetry that transforms the position into it.
+    :param key: str, e.g. 'x---o----'
+    :return: tuple (str, tuple of ints)
+    """
+    return min((_transform(key, symmetry), symmetry)
+               for symmetry in SYMMETRIES)
+
+
+def reachable_positions():
+    """Yields every position that can occur in a game
+    before its end, i.e. where one of the players is to move.
+    :return: generator of lists
+    """
+    visited = set()
+    stack = [list(range(1, 10))]
+    while stack:
+        board = stack.pop()
+        key = _board_to_key(board)
+        if key in visited:
+            continue
+        visited.add(key)
+        bitboard = BitBoard.from_list(board)
+        if not bitboard.vacant() or bitboard.won('x') or bitboard.won('o'):
+            continue
+        yield board
+        player = _turn(key)
+        for position in range(1, 10):
+            if position in board:
+                stack.append([player if cell == position else cell
+                              for cell in board])
+
+
+def verify_move_table(table):
+    """Compares the move table with the strategy
+    in every reachable position.
+    :param table: dict (see build_move_table())
+    :return: list of str
+        positions where the moves differ
+    """
+    expanded = expand_move_table(table)
+    mismatches = []
+    for board in reachable_positions():
+        key = _board_to_key(board)
+        expected = rule_moves(board, _turn(key))
+        masks = BitBoard.from_list(board).masks()
+        if set(expanded.get(masks, ())) != expected:
+            mismatches.append(key)
+    return mismatches
+
+
+def _transform(key, symmetry):
+    return ''.join(key[index] for index in symmetry)
+
+
+def _board_to_key(board):
+    return ''.join(cell if cell in ('x', 'o') else '-' for cell in board)
+
+
+def _key_to_board(key):
+    return [cell if cell != '-' else index + 1
+            for index, cell in enumerate(key)]
+
+
+def _turn(key):
+    """Player x moves if both players have made
+    the same number of moves.
+    :param key: str
+    :return: str
+    """
+    return 'x' if key.count('x') == key.count('o') else 'o'
+
+
+if __name__ == '__main__':
+    move_table = build_move_table()
+    with open(MOVE_TABLE_FILE, 'wt', encoding='utf-8') as f:
+        json.dump({'version': MOVE_TABLE_VERSION, 'table': move_table}, f)
+    errors = verify_move_table(move_table)
+    print(f'{len(move_table)} canonical positions saved to {MOVE_TABLE_FILE}')
+    print(f'{len(errors)} mismatches with the strategy', *errors, sep='\n')
@@ -0,0 +1,177 @@
+"""Exhaustive verification of "bot vs bot" games
+and a benchmark of the bot's decision latency.
+
+Instead of playing many random games and hoping that all of them
+have come up, the whole game tree is enumerated: in every position
+each move that tictactoe_bot.bot() may choose (see bot_moves()) is
+followed. This gives every game the bots can play, with its exact
+probability, and the number of distinct games is compared with the
+one expected by tictactoe.print_log().
+
+The latency of bot() is measured in every position that occurs
+in these games, on a BitBoard (as in "bot vs bot" mode) and on
+a list board (as in "human vs bot" mode).
+
+The report is printed as JSON. The exit status is 1 if the check
+fails or p99 latency exceeds --max-p99-us, so the script can be used
+to catch regressions of the bot automatically.
+"""
+
+import argparse
+import json
+import sys
+import time
+from fractions import Fraction
+
+from bitboard import BitBoard
+from tictactoe_bot import bot, bot_moves
+
+EXPECTED_GAMES = 48  # see print_log() in tictactoe.py
+
+
+def enumerate_games():
+    """Follows every move bot() may choose for both players.
+    :return: dict
+        keys - game records in the format of the log of tictactoe.py,
+        e.g. 'x5-o1-x9-o3-x2-o8-x4-o6-x7-Draw!';
+        values - probabilities of the games (Fraction)
+    """
+    games = {}
+    stack = [(BitBoard(), '', Fraction(1))]
+    while stack:
+        board, record, probability = stack.pop()
+        move = len(record) // 3
+        player = ('x', 'o')[move % 2]
+        moves = bot_moves(board, player)
+        for position in moves:
+            child = BitBoard(*board.masks())
+            child.mark(position, player)
+            child_record = record + f'{player}{position}-'
+            child_probability = probability / len(moves)
+            if child.won(player):
+                outcome = f'Player {player} won!'
+            elif move == 8:
+                outcome = 'Draw!'
+            else:
+                stack.append((child, child_record, child_probability))
+                continue
+            games[child_record + outcome] = (
+                games.get(child_record + outcome, 0) + child_probability)
+    return games
+
+
+def game_positions(games):
+    """Returns the distinct positions in which a bot has to move.
+    :param games: iterable of game records
+    :return: list of tuples (BitBoard, player)
+    """
+    positions = {}
+    for record in games:
+        board = BitBoard()
+        for move in record.split('-')[:-1]:
+            player = move[0]
+            positions[board.masks()] = player
+            board.mark(int(move[1]), player)
+    return [(BitBoard(*masks), player)
+            for masks, player in positions.items()]
+
+
+def measure_latency(positions, repeat, as_list=False):
+    """Times every call of bot() in the positions.
+    :param positions: list of tuples (BitBoard, player)
+    :param repeat: int - calls per position
+    :param as_list: boolean - pass list boards instead of BitBoards
+    :return: dict - statistics in microseconds
+    """
+    bot(BitBoard(), 'x')  # loads the move table
+    timer = time.perf_counter_ns
+    latencies = []
+    for board, player in positions:
+        if as_list:
+            board = board.to_list()
+        for _ in range(repeat):
+            start = timer()
+            bot(board, player)
+            latencies.append(timer() - start)
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'p50_us': percentile(latencies, 50) / 1000,
+        'p99_us': percentile(latencies, 99) / 1000,
+        'max_us': latencies[-1] / 1000,
+        'mean_us': round(sum(latencies) / len(latencies) / 1000, 3)
+    }
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile.
+    :param sorted_values: list
+    :param percent: int
+    :return: value
+    """
+    rank = -(-len(sorted_values) * percent // 100)  # ceiling
+    return sorted_values[max(rank, 1) - 1]
+
+
+def make_report(repeat, max_p99_us=None):
+    """Enumerates the games and measures the latency.
+    :param repeat: int - calls per position
+    :param max_p99_us: float - the limit of p99 latency
+        (default is None - no limit)
+    :return: dict
+    """
+    start_time = time.perf_counter()
+    games = enumerate_games()
+    elapsed = time.perf_counter() - start_time
+    outcomes = {}
+    for record, probability in games.items():
+        outcome = record.rsplit('-', 1)[1]
+        outcomes[outcome] = outcomes.get(outcome, 0) + probability
+    positions = game_positions(games)
+    latency = {
+        'bitboard': measure_latency(positions, repeat),
+        'list': measure_latency(positions, repeat, as_list=True)
+    }
+    passed = len(games) == EXPECTED_GAMES and (max_p99_us is None or all(
+        stats['p99_us'] <= max_p99_us for stats in latency.values()))
+    return {
+        'passed': passed,
+        'games': len(games),
+        'expected_games': EXPECTED_GAMES,
+        'enumeration_seconds': round(elapsed, 4),
+        'outcomes': {outcome: float(probability)
+                     for outcome, probability in sorted(outcomes.items())},
+        'positions': len(positions),
+        'latency': latency,
+        'max_p99_us': max_p99_us,
+        'all_games': {record: float(probability)
+                      for record, probability in sorted(games.items())}
+    }
+
+
+def get_args_from_cmd():
+    """Parses command line arguments.
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--repeat', type=int, default=1000,
+        help='bot() calls per position (default is 1000)')
+    parser.add_argument(
+        '--max-p99-us', type=float,
+        help='fail if p99 latency exceeds this number of microseconds')
+    parser.add_argument(
+        '--output', '-o',
+        help='write the report to this file instead of stdout')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    report = make_report(args.repeat, args.max_p99_us)
+    if args.output:
+        with open(args.output, 'wt', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    sys.exit(0 if report['passed'] else 1)
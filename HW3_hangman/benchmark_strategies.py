@@ -0,0 +1,226 @@
+"""Benchmark of the strategies to guess a letter.
+
+Plays the words with each of the chosen strategies (see strategies
+module) and reports:
+1) for every strategy - mean attempts and misses per word, the longest
+   game, the CPU time per guess of the strategy itself and, with the
+   trees, of the walk down its tree;
+2) for every strategy but the baseline - the comparison with the
+   baseline on the same words: the mean difference of attempts and
+   misses with the paired t-test, and the sign test of attempts (how
+   many words need fewer attempts, how many need more; see significance
+   module).
+
+As in compare_approaches.py, the words to guess are also the dictionary
+the guesses are based on. By default the strategies play with their
+decision trees (built once and cached, see decision_tree module), so
+all 102305 words are played in seconds. The time of such a guess is
+the time to walk the tree, not to run the strategy, so the strategies
+are also timed without the trees on a small random sample of the words
+(--timing-sample) and both times are reported. With --no-trees the
+strategies are called for every guess of every word, which is much
+slower (use --sample).
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import events
+from compare_approaches import play_game
+from decision_tree import load_tree
+from hangman import get_indexed_word_list
+from significance import paired_t_test, sign_test
+from strategies import all_strategies, get_strategy
+from word_index import WordIndex
+
+
+def play_words(name: str, words: Sequence[str], word_list: Sequence[str],
+               index: WordIndex, use_tree=True) -> Dict:
+    """Plays the words with the strategy.
+
+    :param name: the name of the strategy
+    :param words: words to guess
+    :param word_list: the dictionary (words contains only its words)
+    :param index: the index of word_list
+    :param use_tree: play with the decision tree of the strategy
+    :return: {'attempts': per word, 'misses': per word,
+        'cpu_seconds': of the games, 'tree_seconds': to load (or build)
+        the tree}
+    """
+    guess_function = get_strategy(name)
+    start_time = time.perf_counter()
+    tree = load_tree(word_list, guess_function, index) if use_tree else None
+    tree_seconds = time.perf_counter() - start_time
+    attempts, misses = [], []
+    start_time = time.process_time()
+    with events.using(events.EventSink()):
+        for word in words:
+            result = play_game(word, guess_function, word_list, index, tree)
+            attempts.append(sum(result.values()))
+            misses.append(result['unsuccessful'])
+    return {'attempts': attempts, 'misses': misses,
+            'cpu_seconds': time.process_time() - start_time,
+            'tree_seconds': tree_seconds}
+
+
+def benchmark(names: Sequence[str], baseline: str, start=0,
+              stop: Optional[int] = None, sample: Optional[int] = None,
+              seed=0, use_trees=True, timing_sample=100) -> Dict:
+    """Plays the words with the strategies and compares them.
+
+    :param names: the names of the strategies
+    :param baseline: the name of the strategy to compare with
+        (it is played too if it is not in names)
+    :param start: index of the first word of the dictionary
+    :param stop: index after the last word (default is the end)
+    :param sample: number of random words to guess
+        (default is None - every word of the dictionary)
+    :param seed: seed of the random sample
+    :param use_trees: play with the decision trees
+    :param timing_sample: number of random words to play without
+        the trees to time the strategies (only with use_trees)
+    :return: {'words': number of words, 'timing_words': number of
+        words the strategies are timed on, 'strategies': {name: metrics},
+        'comparisons': {name: tests against the baseline}}
+    :raise ValueError: if a strategy is unknown
+    """
+    for name in (baseline, *names):
+        get_strategy(name)
+    names = list(dict.fromkeys((baseline, *names)))
+    word_list, index = get_indexed_word_list(start=start, stop=stop)
+    words = word_list
+    if sample is not None and sample < len(word_list):
+        words = random.Random(seed).sample(word_list, sample)
+    timing_words = random.Random(seed).sample(
+        words, min(timing_sample, len(words))) if use_trees else words
+    results, timings = {}, {}
+    for name in names:
+        print(f'playing {len(words)} words {name}...', file=sys.stderr)
+        results[name] = play_words(name, words, word_list, index, use_trees)
+        if use_trees:
+            print(f'timing {len(timing_words)} words {name} without '
+                  f'the tree...', file=sys.stderr)
+            timings[name] = play_words(name, timing_words, word_list,
+                                       index, use_tree=False)
+        else:
+            timings[name] = results[name]
+    report = {'words': len(words), 'timing_words': len(timing_words),
+              'strategies': {}, 'comparisons': {}}
+    for name, result in results.items():
+        report['strategies'][name] = {
+            'mean_attempts': _mean(result['attempts']),
+            'mean_misses': _mean(result['misses']),
+            'max_attempts': max(result['attempts'], default=0),
+            'cpu_us_per_guess': _us_per_guess(timings[name]),
+            'tree_us_per_guess':
+                _us_per_guess(result) if use_trees else None,
+            'tree_seconds': result['tree_seconds'],
+        }
+    if len(words) < 2:
+        return report
+    for name, result in results.items():
+        if name == baseline:
+            continue
+        base = results[baseline]
+        comparison = {}
+        for metric in ('attempts', 'misses'):
+            difference, t, p = paired_t_test(result[metric], base[metric])
+            comparison[metric] = {'mean_difference': difference,
+                                  't': t, 'p': p}
+        fewer, more, p = sign_test(base['attempts'], result['attempts'])
+        comparison['sign_test'] = {'fewer_attempts': fewer,
+                                   'more_attempts': more, 'p': p}
+        report['comparisons'][name] = comparison
+    return report
+
+
+def print_report(report: Dict, baseline: str) -> None:
+    """Prints the report of benchmark() as tables."""
+    print(f"{report['words']} words (us/guess - the strategy, timed on "
+          f"{report['timing_words']} words without the tree; tree us/guess "
+          f"- the walk down the tree)")
+    print(f"{'strategy':<22}{'attempts':>10}{'misses':>10}{'max':>6}"
+          f"{'us/guess':>10}{'tree us/guess':>15}{'tree, s':>9}")
+    for name, metrics in report['strategies'].items():
+        tree_us = metrics['tree_us_per_guess']
+        print(f"{name:<22}{metrics['mean_attempts']:>10.3f}"
+              f"{metrics['mean_misses']:>10.3f}{metrics['max_attempts']:>6}"
+              f"{metrics['cpu_us_per_guess']:>10.1f}"
+              + (f"{tree_us:>15.1f}" if tree_us is not None else f"{'-':>15}")
+              + f"{metrics['tree_seconds']:>9.2f}")
+    if not report['comparisons']:
+        return
+    print(f'\ncompared with {baseline} (difference per word, '
+          f'paired t-test; sign test of attempts)')
+    for name, comparison in report['comparisons'].items():
+        attempts, misses = comparison['attempts'], comparison['misses']
+        signs = comparison['sign_test']
+        print(f"{name:<22}attempts {attempts['mean_difference']:+.3f} "
+              f"(p={attempts['p']:.3g}), misses "
+              f"{misses['mean_difference']:+.3f} (p={misses['p']:.3g}); "
+              f"fewer for {signs['fewer_attempts']}, more for "
+              f"{signs['more_attempts']} words (p={signs['p']:.3g})")
+
+
+def _us_per_guess(result: Dict) -> float:
+    """Returns the CPU time per guess (microseconds) of play_words()."""
+    guesses = sum(result['attempts'])
+    return result['cpu_seconds'] / guesses * 1e6 if guesses else 0.0
+
+
+def _mean(values: List[int]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--strategies', nargs='+', default=list(all_strategies()),
+        help='names of the strategies (default is all of them: '
+             f'{", ".join(all_strategies())})')
+    parser.add_argument(
+        '--baseline', default='by_word_count',
+        help='the strategy to compare with (default is by_word_count)')
+    parser.add_argument(
+        '--start', type=int, default=0,
+        help='index of the first word of the dictionary (default is 0)')
+    parser.add_argument(
+        '--stop', type=int,
+        help='index after the last word (default is the end)')
+    parser.add_argument(
+        '--sample', type=int,
+        help='number of random words to guess (default is all words)')
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help='seed of the random sample (default is 0)')
+    parser.add_argument(
+        '--no-trees', dest='use_trees', action='store_false',
+        help='call the strategies for every guess instead of the trees')
+    parser.add_argument(
+        '--timing-sample', type=int, default=100,
+        help='number of random words to time the strategies on without '
+             'the trees (default is 100)')
+    parser.add_argument(
+        '--output',
+        help='also write the report to this JSON file')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    try:
+        result_report = benchmark(args.strategies, args.baseline,
+                                  args.start, args.stop, args.sample,
+                                  args.seed, args.use_trees,
+                                  args.timing_sample)
+    except ValueError as e:
+        sys.exit(str(e))
+    print_report(result_report, args.baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result_report, f, indent=2)
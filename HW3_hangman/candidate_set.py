@@ -0,0 +1,175 @@
+"""The words that are still possible, with their letter counts.
+
+Both strategies count the letters of all remaining words before every
+guess, although a guess often eliminates only a few of them. CandidateSet
+keeps the counts between the guesses instead:
+    word_counts - the number of words in which each letter appears
+                  (see guess_letter() from hangman module);
+    letter_counts - the total occurrences of each letter
+                    (see guess_letter_by_letter_count() from
+                    compare_approaches module).
+When the set is restricted, the letters of the eliminated words are
+subtracted from the counts. If a guess eliminates most of the words
+(e.g. the first pattern, which keeps a single word length), it is
+cheaper to count the remaining words from scratch, so the counts are
+dropped and recounted when they are needed next time. Each kind of
+counts is not counted at all until it is needed (e.g. while the letters
+are taken from the decision tree).
+
+The set itself is a bitset of the word index (see word_index module).
+"""
+
+import collections
+import itertools
+from typing import AbstractSet, Callable, Counter, Dict, List, Optional, \
+    Sequence
+
+from strategies import registered_name
+from word_index import WordIndex, count
+
+
+class CandidateSet:
+    """A set of words from the index and their letter counts."""
+
+    def __init__(self, index: WordIndex, bitset: Optional[int] = None):
+        """
+        :param index: the index of the word list
+        :param bitset: the words (default is all words of the index)
+        """
+        self.index = index
+        self.bitset = index.all if bitset is None else bitset
+        self._size = count(self.bitset)
+        # {'word' or 'letter': counts or None if they are not counted}
+        self._counts: Dict[str, Optional[Counter]] = dict.fromkeys(
+            ('word', 'letter'))
+
+    def __len__(self):
+        return self._size
+
+    def words(self) -> List[str]:
+        """Returns the words in the order of the word list."""
+        return self.index.words(self.bitset)
+
+    def restrict(self, bitset: int) -> None:
+        """Keeps only the words that are also in the bitset
+        (e.g. the result of WordIndex.match()) and updates the counts.
+        """
+        eliminated = self.bitset & ~bitset
+        self.bitset &= bitset
+        eliminated_size = count(eliminated)
+        counted = [kind for kind, counts in self._counts.items()
+                   if counts is not None]
+        if counted and eliminated_size:
+            if eliminated_size * 2 > self._size:  # most of the words
+                self._counts = dict.fromkeys(self._counts)
+            else:
+                words = self.index.words(eliminated, lower=True)
+                for kind in counted:
+                    # counted at once, subtracted letter by letter
+                    self._counts[kind].subtract(_count(words, kind))
+        self._size -= eliminated_size
+
+    @property
+    def word_counts(self) -> Counter:
+        """{letter: number of words in which it appears}
+        (letters are lowercase, zero counts may be present)
+        """
+        return self._counted('word')
+
+    @property
+    def letter_counts(self) -> Counter:
+        """{letter: number of occurrences in all words}
+        (letters are lowercase, zero counts may be present)
+        """
+        return self._counted('letter')
+
+    def count_letters(self, disclosed: AbstractSet[str]) -> Counter:
+        """The same as count_letters() from hangman module.
+
+        :param disclosed: letters to ignore (already guessed)
+        :return: Counter {letter: number of words} in alphabetical order
+        """
+        return collections.Counter(dict(sorted(
+            (letter, n) for letter, n in self.word_counts.items()
+            if n > 0 and letter not in disclosed)))
+
+    def guess_by_word_count(self, disclosed: AbstractSet[str]
+                            ) -> Optional[str]:
+        """The same choice as guess_letter() from hangman module
+        (without printing the statistics): the letter that appears
+        in the largest number of words, the first in alphabetical
+        order of the tied ones.
+
+        :param disclosed: letters to ignore (already guessed)
+        :return: a single letter; if there are no words, returns None
+        """
+        letters = self._most_common(self.word_counts, disclosed)
+        if letters:
+            return min(letters)
+
+    def guess_by_letter_count(self, disclosed: AbstractSet[str]
+                              ) -> Optional[str]:
+        """The same choice as guess_letter_by_letter_count()
+        from compare_approaches module: the most frequent letter,
+        the first to occur in the words of the tied ones.
+
+        :param disclosed: letters to ignore (already guessed)
+        :return: a single letter; if there are no words, returns None
+        """
+        letters = self._most_common(self.letter_counts, disclosed)
+        if len(letters) == 1:
+            return letters.pop()
+        for letter in itertools.chain.from_iterable(
+                self.index.words(self.bitset, lower=True)):
+            if letter in letters:
+                return letter
+
+    def guess(self, guess_function: Callable,
+              disclosed: AbstractSet[str]) -> Optional[str]:
+        """Guesses the letter with the counts of the set if the strategy
+        is one of the two above, otherwise calls it with the words.
+
+        :param guess_function: function(word_list, disclosed) -> letter;
+            the two above are recognized as the registered strategies
+            by_word_count and by_letter_count (see strategies module)
+        :param disclosed: letters to ignore (already guessed)
+        :return: a single letter
+        """
+        name = registered_name(guess_function)
+        if name == 'by_word_count':
+            return self.guess_by_word_count(disclosed)
+        if name == 'by_letter_count':
+            return self.guess_by_letter_count(disclosed)
+        return guess_function(self.words(), disclosed)
+
+    def _counted(self, kind: str) -> Counter:
+        """Returns the counts, counts the letters of all words
+        if they are not counted.
+        """
+        if self._counts[kind] is None:
+            self._counts[kind] = _count(
+                self.index.words(self.bitset, lower=True), kind)
+        return self._counts[kind]
+
+    @staticmethod
+    def _most_common(counts: Counter,
+                     disclosed: AbstractSet[str]) -> AbstractSet[str]:
+        """Returns the letters with the largest positive count."""
+        counts = {letter: n for letter, n in counts.items()
+                  if n > 0 and letter not in disclosed}
+        largest = max(counts.values(), default=0)
+        return {letter for letter, n in counts.items() if n == largest}
+
+
+def _count(words: Sequence[str], kind: str) -> Counter:
+    """Counts the letters of the (lowercase) words.
+
+    :param words: lowercase words
+    :param kind: 'word' - the number of words in which each letter
+        appears, 'letter' - the total occurrences of each letter
+    :return: Counter {letter: count}
+    """
+    if kind == 'word':
+        return collections.Counter(
+            itertools.chain.from_iterable(map(set, words)))
+    return collections.Counter(itertools.chain.from_iterable(words))
@@ -37,17 +37,25 @@ Hangman game and creates a csv report with obtained dataset:
     'attempts_by_approach.csv' file in current directory.
 """
 
+import argparse
 import collections
 import itertools
 import csv
 import os
 import datetime
-from typing import AbstractSet, Callable, Dict, Sequence
-from hangman import get_word_list, filter_word_list, \
+import time
+from typing import AbstractSet, Callable, Dict, Optional, Sequence
+from hangman import get_indexed_word_list, \
     disclosed_letters, convert_into_regex_pattern, \
     guess_letter as guess_letter_by_word_count
+import events
+from word_index import WordIndex
+from candidate_set import CandidateSet
+from decision_tree import DecisionTree, load_tree
+from strategies import register, strategy_name
 
 
+@register('by_letter_count')
 def guess_letter_by_letter_count(
         word_list: Sequence[str],
         disclosed: AbstractSet[str]) -> str:
@@ -74,7 +82,9 @@ def guess_letter_by_letter_count(
 
 def play_game(word_to_guess: str,
               guess_letter_function: Callable,
-              word_list: Sequence[str]) -> Dict[str, int]:
+              word_list: Sequence[str],
+              index: Optional[WordIndex] = None,
+              tree: Optional[DecisionTree] = None) -> Dict[str, int]:
     """Implements the game process (i.e. single iteration).
 
     A simplified version of '_main()' from the 'hangman' module.
@@ -83,42 +93,89 @@ def play_game(word_to_guess: str,
     the recalculated probabilities. Check guess_letter.__doc__ and
     convert_into_regex_pattern.__doc__ for more details.
 
+    If the decision tree of guess_letter_function is specified,
+    the letters are taken from the tree instead, and the remaining
+    words are only listed when the game leaves the tree (i.e. when
+    the word is guessed). The attempts are the same.
+    Without the tree, the letters of the remaining words are counted
+    incrementally (see candidate_set module). Either way guess_letter()
+    itself is not called, so the statistics of its games are emitted
+    here (from the same counts) before each guess.
+
+    The log of the game goes to the current event sink
+    (see events module).
+
     :param word_to_guess: a word to guess in this iteration
-    :param guess_letter_function: one of two functions to guess a letter
+    :param guess_letter_function: a function to guess a letter
+        (see strategies module)
     :param word_list: a full list of words (already retrieved)
+    :param index: the index of word_list (built if not specified)
+    :param tree: the decision tree of guess_letter_function for
+        word_list (see decision_tree module)
     :return: number of attempts
     """
+    if index is None:
+        index = WordIndex(word_list)
     word_to_guess = word_to_guess.lower()
-    print(word_to_guess, (
-        "by_word_count", "by_letter_count"
-    )["by_letter_count" in str(guess_letter_function)])
+    strategy = strategy_name(guess_letter_function)
+    if events.sink.level >= events.GAMES:
+        events.sink.emit('game', word=word_to_guess, strategy=strategy)
     dash_pattern = "-" * len(word_to_guess)
     regex_pattern = convert_into_regex_pattern(dash_pattern)
-    word_list = filter_word_list(word_list, regex_pattern)
+    candidates = CandidateSet(index, index.match(regex_pattern))
+    node = tree.root(len(word_to_guess)) if tree is not None else None
     attempts = {'successful': 0, 'unsuccessful': 0}
     while True:
-        letter = guess_letter_function(
-            word_list, disclosed_letters(dash_pattern))
+        timed = events.sink.level >= events.GUESSES
+        if timed:
+            start_time = time.perf_counter()
+            remaining = len(candidates)
+        if (events.sink.level >= events.STATISTICS
+                and guess_letter_function is guess_letter_by_word_count):
+            letters = candidates.count_letters(
+                disclosed_letters(dash_pattern))
+            if letters:
+                events.sink.emit('statistics', word_list=candidates.words(),
+                                 letters=letters)
+        if node is None:
+            letter = candidates.guess(guess_letter_function,
+                                      disclosed_letters(dash_pattern))
+        else:
+            letter = tree.guess(node)
         if letter not in word_to_guess:
             attempts['unsuccessful'] += 1
-            word_list = filter_word_list(word_list, fr'^[^{letter}]+$')
+            candidates.restrict(index.match(fr'^[^{letter}]+$'))
         elif letter in word_to_guess:
             attempts['successful'] += 1
             dash_pattern = "".join([
                 (dash_pattern[i], letter)[word_to_guess[i] == letter]
                 for i in range(len(word_to_guess))])
             regex_pattern = convert_into_regex_pattern(dash_pattern)
-            word_list = filter_word_list(word_list, regex_pattern)
-        print(letter + "? -> " + dash_pattern)
+            candidates.restrict(index.match(regex_pattern))
+        if node is not None:
+            node = tree.next(node, letter, dash_pattern)
+        if timed:
+            events.sink.emit(
+                'guess', strategy=strategy, letter=letter,
+                dash_pattern=dash_pattern,
+                filtered=remaining - len(candidates),
+                remaining=len(candidates),
+                seconds=time.perf_counter() - start_time)
+        if node is not None:
+            continue  # the tree has a node only if the game goes on
+        word_list = candidates.words()
         if (len(word_list) == 1
                 or len(set(word.lower() for word in word_list)) == 1):
-            print("guessed: " + word_list.pop())
-            print()
+            if events.sink.level >= events.GAMES:
+                events.sink.emit('guessed', word=word_list.pop())
             return attempts
 
 
 def try_two_methods(word: str,
-                    word_list: Sequence[str]) -> Dict[str, int]:
+                    word_list: Sequence[str],
+                    index: Optional[WordIndex] = None,
+                    trees: Optional[Dict[Callable, DecisionTree]] = None
+                    ) -> Dict[str, int]:
     """Plays 2 games using two different functions to guess letters
     in the same word. Returns a single entry for the dataset.
     The entry contains the number of attempts to guess the letters
@@ -126,16 +183,26 @@ def try_two_methods(word: str,
 
     :param word: word to guess
     :param word_list: a full list of words (already retrieved)
+    :param index: the index of word_list (built if not specified)
+    :param trees: {guess letter function: its decision tree}
+        (default is None - play without trees)
     :return: entry for the dataset
     """
+    if index is None:
+        index = WordIndex(word_list)
+    trees = trees or {}
     attempts_by_word_count = play_game(
         word_to_guess=word,
         guess_letter_function=guess_letter_by_word_count,
-        word_list=word_list)
+        word_list=word_list,
+        index=index,
+        tree=trees.get(guess_letter_by_word_count))
     attempts_by_letter_count = play_game(
         word_to_guess=word,
         guess_letter_function=guess_letter_by_letter_count,
-        word_list=word_list)
+        word_list=word_list,
+        index=index,
+        tree=trees.get(guess_letter_by_letter_count))
     record = {
         'word': word,
         'word_length': len(word),
@@ -170,8 +237,11 @@ def play_iterated_game(start=0, stop=102305) -> None:
     :param stop: index to stop.
     :return: None - collected data are dumped as csv
     """
-    word_list = get_word_list()[start:stop]
-    first_record = try_two_methods(word_list[0], word_list)
+    word_list, index = get_indexed_word_list(start=start, stop=stop)
+    trees = {function: load_tree(word_list, function, index)
+             for function in (guess_letter_by_word_count,
+                              guess_letter_by_letter_count)}
+    first_record = try_two_methods(word_list[0], word_list, index, trees)
     csv_file = open(create_abs_filename(), 'w',
                     encoding='utf-8', newline='')
     writer = csv.DictWriter(csv_file, dialect='excel',
@@ -180,7 +250,7 @@ def play_iterated_game(start=0, stop=102305) -> None:
     writer.writerow(first_record)
     try:
         for word in word_list[1:]:
-            writer.writerow(try_two_methods(word, word_list))
+            writer.writerow(try_two_methods(word, word_list, index, trees))
     except KeyboardInterrupt:
         pass
     else:
@@ -190,9 +260,27 @@ def play_iterated_game(start=0, stop=102305) -> None:
         print("csv file successfully closed")
 
 
-# If 'print_statistics(word_list, letters)' line
-# in 'hangman' module remain uncommented, the log is printed with
-# additional information which might be unnecessary for this test.
-# However, csv report is not affected by this in any way.
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument(
+        '--log', choices=events.LEVELS, default='statistics',
+        help='what to print: nothing, games, guesses or also the letter\n'
+             'statistics (default); printing is the most of the runtime')
+    parser.add_argument(
+        '--metrics', action='store_true',
+        help='print the metrics of the guesses by strategy at the end')
+    return parser.parse_args()
+
+
+# The log does not affect the csv report in any way.
 if __name__ == "__main__":
-    play_iterated_game()
+    args = get_args_from_cmd()
+    sink = events.PrintSink(events.LEVELS[args.log])
+    if args.metrics:
+        sink = events.Metrics(forward=sink)
+    with events.using(sink):
+        play_iterated_game()
+    if args.metrics:
+        sink.print_summary()
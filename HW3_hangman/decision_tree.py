@@ -0,0 +1,274 @@
+"""Precomputed decision tree of a guessing strategy.
+
+With a fixed word list and a deterministic function to guess a letter,
+the next guess depends only on the letters guessed so far and on where
+they were found (i.e. on the dash pattern and the misses). So the whole
+game can be precomputed: a node of the tree holds the letter to guess,
+and its children are the outcomes of the guess - a bitmask of positions
+where the letter was found in the word (0 means a miss). There is a
+tree per word length (up to MAX_LENGTH, the bits of an outcome; the
+longer words are left out, so their games are played without the tree).
+A node is created only if the remaining words differ not just by letter
+case, i.e. if the game is not over yet.
+
+The tree is built by playing every game at once: the words that share
+the same path through the tree are filtered together (with WordIndex,
+so exactly as in play_game()), and the strategy is called once per
+node instead of once per game. If NumPy is installed, the strategy
+counts the letters of large nodes with LetterMatrix (the same choices).
+
+The tree is saved next to this module as a JSON header line followed
+by flat arrays:
+    letters - index of the letter to guess in the alphabet, per node;
+    first_edge - index of the first outgoing edge, per node
+                 (and the total number of edges at the end);
+    masks, children - the outcome and the child node, per edge.
+The name of the file holds the registered name of the strategy (see
+strategies module, so the functions with the same __name__ do not share
+a file) and a prefix of the SHA-256 of the word list (see
+tree_filename()), so the trees of different word lists (e.g. the slices
+of play_iterated_game() or parallel_report.py) are cached side by side.
+The header holds the whole hash, so a tree is never used for another
+word list.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sys
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from hangman import convert_into_regex_pattern, disclosed_letters
+from strategies import strategy_name
+from word_index import WordIndex
+
+try:
+    from letter_matrix import LetterMatrix  # needs NumPy
+except ImportError:
+    LetterMatrix = None
+
+TREE_VERSION = 1  # increment when the format or the build changes
+MAX_LENGTH = 64  # the masks of the outcomes are 'Q' (64 bits)
+_ARRAYS = (('letters', 'B'), ('first_edge', 'I'),
+           ('masks', 'Q'), ('children', 'I'))
+
+
+class DecisionTree:
+    """The moves of a guessing strategy for every possible game."""
+
+    def __init__(self, header: dict, arrays: Dict[str, array]):
+        """
+        :param header: alphabet, roots {word length: node} and the
+            metadata written to the file
+        :param arrays: letters, first_edge, masks and children
+        """
+        self.header = header
+        self.alphabet: str = header['alphabet']
+        self.roots = {int(length): node
+                      for length, node in header['roots'].items()}
+        self.letters = arrays['letters']
+        self.first_edge = arrays['first_edge']
+        self.masks = arrays['masks']
+        self.children = arrays['children']
+
+    def __len__(self):
+        return len(self.letters)
+
+    def root(self, length: int) -> Optional[int]:
+        """Returns the first node for the words of the length
+        (None if there is nothing to guess).
+        """
+        return self.roots.get(length)
+
+    def guess(self, node: int) -> str:
+        """Returns the letter to guess in the node."""
+        return self.alphabet[self.letters[node]]
+
+    def next(self, node: int, letter: str,
+             dash_pattern: str) -> Optional[int]:
+        """Follows the outcome of the guess.
+
+        :param node: the node where the letter was guessed
+        :param letter: the guessed letter
+        :param dash_pattern: the dash pattern after the guess
+        :return: the next node, or None if the game is over
+            (or if the outcome is impossible for the words of the tree)
+        """
+        mask = 0
+        for position, char in enumerate(dash_pattern):
+            if char == letter:
+                mask |= 1 << position
+        for edge in range(self.first_edge[node], self.first_edge[node + 1]):
+            if self.masks[edge] == mask:
+                return self.children[edge]
+        return None
+
+    def save(self, filename: str) -> None:
+        """Writes the header line and the arrays to the file."""
+        header = dict(self.header, sizes={
+            name: len(getattr(self, name)) for name, _ in _ARRAYS})
+        with open(filename, 'wb') as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode('utf-8'))
+            f.write(b'\n')
+            for name, _ in _ARRAYS:
+                getattr(self, name).tofile(f)
+
+    @classmethod
+    def load(cls, filename: str) -> 'DecisionTree':
+        """Reads the tree written by save().
+
+        :raise OSError: if the file cannot be read
+        :raise ValueError: if the file is not a valid tree
+        """
+        with open(filename, 'rb') as f:
+            header = json.loads(f.readline().decode('utf-8'))
+            arrays = {}
+            for name, typecode in _ARRAYS:
+                arrays[name] = array(typecode)
+                try:
+                    arrays[name].fromfile(f, header['sizes'][name])
+                except (EOFError, KeyError) as e:
+                    raise ValueError(f'truncated tree file: {e}')
+        return cls(header, arrays)
+
+
+def build_tree(word_list: Sequence[str], guess_function: Callable,
+               index: Optional[WordIndex] = None) -> DecisionTree:
+    """Plays every game with the strategy at once.
+
+    :param word_list: a full list of words
+    :param guess_function: function(word_list, disclosed) -> letter
+    :param index: the index of word_list (built if not specified)
+    :return: the tree (without the words longer than MAX_LENGTH)
+    """
+    if index is None:
+        index = WordIndex(word_list)
+    guess = guess_function
+    if LetterMatrix is not None:
+        guess = LetterMatrix(word_list).strategy(guess_function)
+    alphabet = ''.join(sorted(set(''.join(word_list).lower())))
+    letters: List[int] = []
+    edges: List[List[Tuple[int, int]]] = []
+    roots: Dict[int, int] = {}
+    # (parent node, outcome, words, dash pattern), parent is None
+    # for the roots (then the outcome is the length of the words)
+    stack = [(None, length, index.words(index.match(
+        convert_into_regex_pattern('-' * length))), '-' * length)
+        for length in index.by_length if length <= MAX_LENGTH]
+    while stack:
+        parent, outcome, words, dash_pattern = stack.pop()
+        if len(set(word.lower() for word in words)) <= 1:
+            continue  # the word is guessed
+        with contextlib.redirect_stdout(None):  # guess statistics
+            letter = guess(words, disclosed_letters(dash_pattern))
+        node = len(letters)
+        letters.append(alphabet.index(letter))
+        edges.append([])
+        if parent is None:
+            roots[outcome] = node
+        else:
+            edges[parent].append((outcome, node))
+        outcomes = set()
+        for word in words:
+            outcomes.add(_positions(word.lower(), letter))
+        for mask in outcomes:
+            if mask:
+                new_dash_pattern = ''.join(
+                    letter if mask >> position & 1 else char
+                    for position, char in enumerate(dash_pattern))
+                pattern = convert_into_regex_pattern(new_dash_pattern)
+            else:
+                new_dash_pattern = dash_pattern
+                pattern = fr'^[^{letter}]+$'
+            stack.append((node, mask, index.filter(words, pattern),
+                          new_dash_pattern))
+    arrays = {name: array(typecode) for name, typecode in _ARRAYS}
+    for node, node_edges in enumerate(edges):
+        arrays['first_edge'].append(len(arrays['masks']))
+        for mask, child in sorted(node_edges):
+            arrays['masks'].append(mask)
+            arrays['children'].append(child)
+    arrays['first_edge'].append(len(arrays['masks']))
+    arrays['letters'].extend(letters)
+    header = {'version': TREE_VERSION,
+              'strategy': strategy_name(guess_function),
+              'words_sha256': hash_word_list(word_list),
+              'byteorder': sys.byteorder, 'alphabet': alphabet,
+              'roots': roots}
+    return DecisionTree(header, arrays)
+
+
+def load_tree(word_list: Sequence[str], guess_function: Callable,
+              index: Optional[WordIndex] = None,
+              filename: Optional[str] = None,
+              log: Optional[Callable[[str], None]] = None) -> DecisionTree:
+    """Reads the tree of the strategy from the file. If there is no
+    file, or it was built for another word list (or by another version
+    of this module), builds the tree and tries to save it.
+
+    :param word_list: a full list of words
+    :param guess_function: function(word_list, disclosed) -> letter
+    :param index: the index of word_list (built if needed)
+    :param filename: default is tree_filename(guess_function, hash of
+        word_list)
+    :param log: function to tell that the tree is being built, which
+        takes a while (default is None - silently)
+    :return: the tree
+    """
+    words_sha256 = hash_word_list(word_list)
+    strategy = strategy_name(guess_function)
+    filename = filename or tree_filename(guess_function, words_sha256)
+    try:
+        tree = DecisionTree.load(filename)
+        if (tree.header.get('version') == TREE_VERSION
+                and tree.header.get('byteorder') == sys.byteorder
+                and tree.header.get('strategy') == strategy
+                and tree.header.get('words_sha256') == words_sha256):
+            return tree
+    except (OSError, ValueError):
+        pass
+    if log is not None:
+        log(f'Building the decision tree of {strategy} '
+            f'for {len(word_list)} words (it is saved for the next '
+            f'runs)...')
+    tree = build_tree(word_list, guess_function, index)
+    try:
+        tree.save(filename)
+    except OSError:
+        pass  # the tree is still usable, it just won't be cached
+    return tree
+
+
+def tree_filename(guess_function: Callable, words_sha256: str) -> str:
+    """Returns the name of the file with the tree of the strategy.
+
+    :param guess_function: the strategy, named as in the registry
+        (see strategy_name() from strategies module)
+    :param words_sha256: the hash of the word list (see hash_word_list())
+    :return: e.g. '.../decision_tree_by_word_count_0123456789abcdef.bin'
+    """
+    return os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        f'decision_tree_{strategy_name(guess_function)}_'
+        f'{words_sha256[:16]}.bin')
+
+
+def hash_word_list(word_list: Sequence[str]) -> str:
+    """Returns SHA-256 of the words (in hex)."""
+    digest = hashlib.sha256()
+    for word in word_list:
+        digest.update(word.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _positions(word: str, letter: str) -> int:
+    """Returns the bitmask of the positions of the letter in the word."""
+    mask = 0
+    position = word.find(letter)
+    while position >= 0:
+        mask |= 1 << position
+        position = word.find(letter, position + 1)
+    return mask
@@ -0,0 +1,154 @@
+"""Events of the hangman engine and their sinks.
+
+The engine (guess_letter() from hangman module and play_game() from
+compare_approaches module) does not print its log itself, it emits
+events to the current sink:
+    'game'       - a game is started: word, strategy;
+    'guess'      - a letter is guessed: strategy, letter, dash_pattern,
+                   filtered (words eliminated by the guess), remaining
+                   (words left), seconds (to choose the letter and
+                   filter the words);
+    'guessed'    - the game is over: word;
+    'statistics' - the letter counts used by guess_letter() (also in
+                   the games of play_game() with it): word_list, letters.
+Every event has a level, and it is emitted only if the level of the
+sink is not lower. The engine checks the level before making the
+event (e.g. before reading the timer or counting the words), so a
+disabled event costs a single comparison:
+
+    if events.sink.level >= events.GUESSES:
+        events.sink.emit('guess', ...)
+
+The default sink prints everything exactly as the engine used to.
+The interactive game (main() in hangman module) prints its dialog
+directly, so it is not affected by the sinks.
+"""
+
+import collections
+import contextlib
+from typing import Dict, Iterator, Optional
+
+SILENT = 0
+GAMES = 1  # 'game' and 'guessed'
+GUESSES = 2  # 'guess'
+STATISTICS = 3  # 'statistics'
+LEVELS = {'silent': SILENT, 'games': GAMES,
+          'guesses': GUESSES, 'statistics': STATISTICS}
+EVENT_LEVELS = {'game': GAMES, 'guessed': GAMES,
+                'guess': GUESSES, 'statistics': STATISTICS}
+
+
+class EventSink:
+    """Ignores all events (the level is SILENT)."""
+
+    level = SILENT
+
+    def emit(self, event: str, **fields) -> None:
+        """Receives the event (see the module docstring for the fields).
+
+        :param event: name of the event
+        :return: None
+        """
+
+
+class PrintSink(EventSink):
+    """Prints the events in the same format as before the sinks."""
+
+    def __init__(self, level=STATISTICS):
+        """
+        :param level: the highest level to print (default is all)
+        """
+        self.level = level
+
+    def emit(self, event: str, **fields) -> None:
+        if event == 'game':
+            print(fields['word'], fields['strategy'])
+        elif event == 'guess':
+            print(fields['letter'] + "? -> " + fields['dash_pattern'])
+        elif event == 'guessed':
+            print("guessed: " + fields['word'])
+            print()
+        elif event == 'statistics':
+            from hangman import print_statistics  # it imports this module
+            print_statistics(fields['word_list'], fields['letters'])
+
+
+class Metrics(EventSink):
+    """Aggregates the guesses by strategy and passes the events
+    to another sink (if specified).
+    """
+
+    def __init__(self, forward: Optional[EventSink] = None):
+        """
+        :param forward: the sink to pass the events to
+        """
+        self.forward = forward
+        self.level = max(GUESSES, forward.level if forward else SILENT)
+        self.totals: Dict[str, Dict[str, float]] = collections.defaultdict(
+            lambda: dict.fromkeys(('games', 'guesses', 'filtered',
+                                   'remaining', 'seconds', 'max_seconds'),
+                                  0))
+
+    def emit(self, event: str, **fields) -> None:
+        if event == 'game':
+            self.totals[fields['strategy']]['games'] += 1
+        elif event == 'guess':
+            totals = self.totals[fields['strategy']]
+            totals['guesses'] += 1
+            totals['filtered'] += fields['filtered']
+            totals['remaining'] += fields['remaining']
+            totals['seconds'] += fields['seconds']
+            totals['max_seconds'] = max(totals['max_seconds'],
+                                        fields['seconds'])
+        if self.forward and self.forward.level >= EVENT_LEVELS[event]:
+            self.forward.emit(event, **fields)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns the metrics by strategy.
+
+        :return: {strategy: {'games', 'guesses', 'words_filtered' (total),
+            'mean_filtered', 'mean_remaining' (words per guess),
+            'mean_us', 'max_us' (time per guess)}}
+        """
+        summary = {}
+        for strategy, totals in sorted(self.totals.items()):
+            guesses = totals['guesses'] or 1
+            summary[strategy] = {
+                'games': totals['games'],
+                'guesses': totals['guesses'],
+                'words_filtered': totals['filtered'],
+                'mean_filtered': totals['filtered'] / guesses,
+                'mean_remaining': totals['remaining'] / guesses,
+                'mean_us': totals['seconds'] / guesses * 1e6,
+                'max_us': totals['max_seconds'] * 1e6,
+            }
+        return summary
+
+    def print_summary(self) -> None:
+        """Prints the metrics by strategy."""
+        for strategy, metrics in self.summary().items():
+            print(f"{strategy}: {metrics['games']} games, "
+                  f"{metrics['guesses']} guesses, "
+                  f"{metrics['words_filtered']} words filtered "
+                  f"({metrics['mean_filtered']:.1f} per guess), "
+                  f"{metrics['mean_remaining']:.1f} words remaining "
+                  f"per guess, {metrics['mean_us']:.1f} us per guess "
+                  f"(max {metrics['max_us']:.0f} us)")
+
+
+sink: EventSink = PrintSink()  # the current sink
+
+
+@contextlib.contextmanager
+def using(new_sink: EventSink) -> Iterator[EventSink]:
+    """Makes the sink current inside the with block.
+
+    :param new_sink: the sink
+    :return: the sink
+    """
+    global sink
+    previous, sink = sink, new_sink
+    try:
+        yield new_sink
+    finally:
+        sink = previous
@@ -0,0 +1,259 @@
+"""A TCP server for many hangman games at once (asyncio, line protocol).
+
+hangman.main() loads the word list in every process and serves a single
+user through input(). The server loads the word list and the decision
+tree of guess_letter() (see decision_tree module) once, and every
+connection gets its own Session - a small state machine that plays
+the same game as main(), but takes the dash patterns from the connection.
+The first pattern keeps only the words of its length, so the server
+indexes the words of every length separately (see word_index module).
+The indexes and the tree are only read, so all sessions share them;
+a session keeps just the bitset of its candidate words in the index of
+their length (at most a few KB), the dash pattern, the node of the tree
+and a few counters. A guess takes a few bitwise operations on the shared
+bitsets, so it does not block the event loop.
+
+Protocol (one command per line, one response line per command):
+    NEW <dash pattern>  - start a new game, e.g. 'NEW -----'
+    PATTERN <dash pattern> - the pattern after the last guess
+                             (the same pattern if the word does not
+                             contain the letter)
+        -> GUESS <letter> <words>  - the next letter and the number
+                                     of the words that are still possible
+        -> END <successful> <unsuccessful> [<word> [<word>]]
+           - the game is over: the attempts and the word (none if no
+             word matches, two if they differ just by letter case)
+    STATS - -> STATS sessions=.. games=.. guesses=.. session_bytes=..
+             maxrss_kb=..  (session_bytes - the mean size of the state
+             of a connected session)
+    QUIT  - close the connection
+Invalid commands and patterns get 'ERR <reason>' (the hints are the same
+as the ones of get_dash_pattern() from hangman module).
+"""
+
+import argparse
+import asyncio
+import resource
+import sys
+from typing import Dict, Optional, Sequence, Set
+
+from candidate_set import CandidateSet
+from decision_tree import DecisionTree, load_tree
+from hangman import convert_into_regex_pattern, dash_pattern_error, \
+    disclosed_letters, get_indexed_word_list, guess_letter
+from word_index import WordIndex, count
+
+MAX_LINE = 256  # longer lines are not valid commands
+_EMPTY = WordIndex([])  # for the lengths without words
+
+
+class Session:
+    """A game in which the server guesses the word of the client."""
+
+    __slots__ = ('indexes', 'tree', 'index', 'bitset', 'dash_pattern',
+                 'letter', 'node', 'successful', 'unsuccessful')
+
+    def __init__(self, indexes: Dict[int, WordIndex], tree: DecisionTree):
+        """
+        :param indexes: the indexes of the words by length (shared,
+            see index_by_length())
+        :param tree: the decision tree of guess_letter() (shared)
+        """
+        self.indexes = indexes
+        self.tree = tree
+        self.index: Optional[WordIndex] = None  # of the word length
+        self.bitset: Optional[int] = None  # None if no game is played
+        self.dash_pattern = ''
+        self.letter = ''
+        self.node: Optional[int] = None
+        self.successful = 0
+        self.unsuccessful = 0
+
+    def handle(self, line: str) -> str:
+        """Executes a command.
+
+        :param line: the command
+        :return: the response
+        """
+        command, _, argument = line.strip().partition(' ')
+        command = command.upper()
+        if command == 'NEW':
+            dash_pattern = argument.strip().lower()
+            self.index = self.indexes.get(len(dash_pattern), _EMPTY)
+            self.bitset = self.index.all
+            self.dash_pattern, self.letter, self.node = '', '', None
+            self.successful = self.unsuccessful = 0
+            response = self.answer(dash_pattern)
+            if response.startswith('ERR'):
+                self.bitset = None
+            return response
+        if command == 'PATTERN':
+            if self.bitset is None:
+                return 'ERR no game'
+            return self.answer(argument.strip().lower())
+        return f'ERR unknown command {command!r}'
+
+    def answer(self, dash_pattern: str) -> str:
+        """Restricts the candidates to the dash pattern (in the same way
+        as main() from hangman module) and guesses the next letter.
+
+        :param dash_pattern: the pattern after the last guess
+        :return: 'GUESS ...', 'END ...' or 'ERR ...'
+        """
+        error = dash_pattern_error(dash_pattern, self.dash_pattern,
+                                   self.letter) if dash_pattern \
+            else 'Enter the dash pattern.'
+        if error:
+            return 'ERR ' + error
+        if self.dash_pattern == dash_pattern:
+            self.unsuccessful += 1
+            self.bitset &= self.index.match(fr'^[^{self.letter}]+$')
+        else:
+            if self.dash_pattern:
+                self.successful += 1
+            self.bitset &= self.index.match(
+                convert_into_regex_pattern(dash_pattern))
+        if not self.dash_pattern:
+            self.node = self.tree.root(len(dash_pattern))
+        elif self.node is not None:
+            self.node = self.tree.next(self.node, self.letter, dash_pattern)
+        words_left = count(self.bitset)
+        if words_left <= 2:  # the same end of the game as the_end()
+            words = self.index.words(self.bitset)
+            if words_left < 2 or len({word.lower() for word in words}) == 1:
+                self.bitset = None
+                return ' '.join(['END', str(self.successful),
+                                 str(self.unsuccessful), *words])
+        self.dash_pattern = dash_pattern
+        if self.node is None:  # off the tree
+            self.letter = CandidateSet(self.index, self.bitset) \
+                .guess_by_word_count(disclosed_letters(dash_pattern))
+        else:
+            self.letter = self.tree.guess(self.node)
+        return f'GUESS {self.letter} {words_left}'
+
+    def size(self) -> int:
+        """Returns the size of the state of the session in bytes
+        (without the shared indexes and tree).
+        """
+        return (sys.getsizeof(self) + sys.getsizeof(self.bitset)
+                + sys.getsizeof(self.dash_pattern))
+
+
+class Server:
+    """Accepts connections and runs a session for each of them."""
+
+    def __init__(self, indexes: Dict[int, WordIndex], tree: DecisionTree,
+                 idle_timeout: Optional[float] = None):
+        """
+        :param indexes: the indexes of the words by length
+        :param tree: the decision tree of guess_letter()
+        :param idle_timeout: seconds to wait for a command before
+            closing the connection (default is None - forever)
+        """
+        self.indexes = indexes
+        self.tree = tree
+        self.idle_timeout = idle_timeout
+        self.sessions: Set[Session] = set()  # currently connected
+        self.games = 0  # finished
+        self.guesses = 0  # the responses to NEW and PATTERN
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Reads commands and writes responses until the client
+        quits, disconnects or stays idle for too long.
+        """
+        session = Session(self.indexes, self.tree)
+        self.sessions.add(session)
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(),
+                                                  self.idle_timeout)
+                except (asyncio.TimeoutError, ValueError):
+                    break  # idle for too long or the line is too long
+                if not line:
+                    break
+                line = line.decode('utf-8', 'replace')
+                if line.strip().upper() == 'QUIT':
+                    break
+                if line.strip().upper() == 'STATS':
+                    response = self.stats()
+                else:
+                    response = session.handle(line)
+                    self.guesses += not response.startswith('ERR')
+                    self.games += response.startswith('END')
+                writer.write(response.encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    def stats(self) -> str:
+        """Returns the response to STATS command."""
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        session_bytes = sum(session.size() for session in self.sessions) \
+            // max(len(self.sessions), 1)
+        return (f'STATS sessions={len(self.sessions)} games={self.games} '
+                f'guesses={self.guesses} session_bytes={session_bytes} '
+                f'maxrss_kb={maxrss}')
+
+
+def index_by_length(word_list: Sequence[str]) -> Dict[int, WordIndex]:
+    """Returns {length: the index of the words of the length}
+    (in the order of the word list).
+    """
+    by_length: Dict[int, list] = {}
+    for word in word_list:
+        by_length.setdefault(len(word), []).append(word)
+    return {length: WordIndex(words) for length, words in by_length.items()}
+
+
+async def serve(host: str, port: int, idle_timeout: Optional[float] = None,
+                filename='words.txt') -> None:
+    """Loads the word list and runs the server forever.
+
+    :param host: address to listen on
+    :param port: port to listen on
+    :param idle_timeout: see Server
+    :param filename: the word list (default is 'words.txt')
+    """
+    word_list, index = get_indexed_word_list(filename)
+    tree = load_tree(word_list, guess_letter, index, log=print)
+    server = await asyncio.start_server(
+        Server(index_by_length(word_list), tree,
+               idle_timeout).handle_connection,
+        host, port, limit=MAX_LINE, backlog=1024)
+    print(f'Serving {len(word_list)} words on {host}:{port}')
+    async with server:
+        await server.serve_forever()
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument(
+        '--host', default='127.0.0.1',
+        help='address to listen on (default is 127.0.0.1)')
+    parser.add_argument(
+        '--port', type=int, default=7778,
+        help='port to listen on (default is 7778)')
+    parser.add_argument(
+        '--idle-timeout', type=float,
+        help='close connections idle for this number of seconds')
+    parser.add_argument(
+        '--words', default='words.txt',
+        help='the word list (default is words.txt)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    try:
+        asyncio.run(serve(args.host, args.port, args.idle_timeout,
+                          args.words))
+    except KeyboardInterrupt:
+        pass
@@ -1,9 +1,16 @@
 """Hangman game implementation."""
 
 import collections
+import contextlib
 import itertools
 import re
-from typing import AbstractSet, Counter, List, Sequence
+from typing import AbstractSet, Counter, List, Optional, Sequence, Tuple
+
+import events
+from candidate_set import CandidateSet
+from strategies import register
+from word_index import WordIndex
+from word_store import load_store
 
 
 def get_word_list(filename='words.txt') -> List[str]:
@@ -25,6 +32,34 @@ def get_word_list(filename='words.txt') -> List[str]:
         return [word.strip() for word in f.readlines()]
 
 
+def get_indexed_word_list(
+        filename='words.txt',
+        start=0,
+        stop: Optional[int] = None) -> Tuple[List[str], WordIndex]:
+    """Returns the word list (or a part of it) and its index.
+    Both are loaded from the compiled word store (see word_store
+    module), which is much faster than get_word_list() and WordIndex().
+    If the store cannot be compiled, falls back to them.
+
+    :param filename: name of the file with words
+        (default is 'words.txt' from the same directory)
+    :type filename: str
+    :param start: index of the first word (default is 0)
+    :type start: int
+    :param stop: index after the last word (default is the end)
+    :type stop: Optional[int]
+    :return: a list of words and its index
+    :rtype: Tuple[List[str], WordIndex]
+    """
+    try:
+        store = load_store(filename)
+    except OSError:  # no file (get_word_list() explains it) or no access
+        word_list = get_word_list(filename)[start:stop]
+        return word_list, WordIndex(word_list)
+    with contextlib.closing(store):
+        return store.words(start, stop), store.index(start, stop)
+
+
 def filter_word_list(
         word_list: Sequence[str],
         pattern: str) -> List[str]:
@@ -44,6 +79,7 @@ def filter_word_list(
     return list(filter(compiled_pattern.match, word_list))
 
 
+@register('by_word_count')
 def guess_letter(
         word_list: Sequence[str],
         disclosed: AbstractSet[str]) -> str:
@@ -53,6 +89,10 @@ def guess_letter(
     The counter counts the number of words in which the letter appears,
     not the total occurrences of the letter in all words.
     Letters that already have been disclosed are ignored.
+    If several letters appear in the same number of words,
+    the first of them in alphabetical order is returned.
+    The counts are emitted to the current event sink (printed
+    by default, see events module).
 
     :param word_list: a list of words
     :type word_list: Sequence[str]
@@ -62,13 +102,34 @@ def guess_letter(
     :rtype: str
         if the word list is empty, returns None
     """
-    letters = collections.Counter(itertools.chain.from_iterable(
-        (set(word.lower()) - disclosed for word in word_list)))
+    letters = count_letters(word_list, disclosed)
     if letters:
-        print_statistics(word_list, letters)
+        if events.sink.level >= events.STATISTICS:
+            events.sink.emit('statistics', word_list=word_list,
+                             letters=letters)
         return letters.most_common(1)[0][0]
 
 
+def count_letters(
+        word_list: Sequence[str],
+        disclosed: AbstractSet[str]) -> Counter:
+    """Counts the number of words in which each letter appears.
+    Letters are counted in alphabetical order, so the ties in
+    Counter.most_common() are broken alphabetically and do not depend
+    on the order of iteration over sets (i.e. on hash randomization).
+
+    :param word_list: a list of words
+    :type word_list: Sequence[str]
+    :param disclosed: letters to ignore (already guessed)
+    :type disclosed: AbstractSet[str]
+    :return: Counter {letter: number of words}
+    :rtype: Counter
+    """
+    letters = collections.Counter(itertools.chain.from_iterable(
+        (set(word.lower()) - disclosed for word in word_list)))
+    return collections.Counter(dict(sorted(letters.items())))
+
+
 def print_statistics(
         word_list: Sequence[str],
         letters: Counter,
@@ -111,33 +172,53 @@ def get_dash_pattern(
     :rtype: str
     """
     inp_msg = 'Enter the dash pattern: '
-    flags = re.IGNORECASE | re.UNICODE
     while True:
         dash_pattern = input(inp_msg).lower()
-        new_letters = (disclosed_letters(dash_pattern) -
-                       disclosed_letters(prev_dash_pattern))
         if not dash_pattern:
             continue
-        elif not (re.match(r"^[\w'-]+$", dash_pattern, flags=flags)
-                  and re.match(r'^[^\d_]+$', dash_pattern, flags=flags)):
-            inp_msg = 'Input must contain only letters, dashes (-), ' \
-                      "and apostrophes ('). \nPlease try again: "
-            continue
-        elif not consistent(dash_pattern, prev_dash_pattern):
-            inp_msg = 'This dash pattern is not consistent ' \
-                      'with the previous one! \nPlease try again: '
-            continue
-        elif len(new_letters) > 1 - (not prev_dash_pattern):
-            inp_msg = 'You tried to disclose too many ' \
-                      'new letters. \nPlease try again: '
-            continue
-        elif new_letters and letter_to_disclose not in new_letters:
-            inp_msg = 'You tried to disclose the wrong ' \
-                      'letter. \nPlease try again: '
+        error = dash_pattern_error(dash_pattern, prev_dash_pattern,
+                                   letter_to_disclose)
+        if error:
+            inp_msg = f'{error} \nPlease try again: '
             continue
         return dash_pattern
 
 
+def dash_pattern_error(
+        dash_pattern: str,
+        prev_dash_pattern='',
+        letter_to_disclose='') -> str:
+    """Validates the dash pattern entered after the previous one
+    (see get_dash_pattern()).
+
+    :param dash_pattern: a new (lowercase) dash pattern
+    :type dash_pattern: str
+    :param prev_dash_pattern: str
+        (default is '')
+    :type prev_dash_pattern: str
+    :param letter_to_disclose: a letter that may be disclosed
+        (default is '')
+    :type letter_to_disclose: str
+    :return: the hint what is wrong, or '' if the pattern is valid
+    :rtype: str
+    """
+    flags = re.IGNORECASE | re.UNICODE
+    new_letters = (disclosed_letters(dash_pattern) -
+                   disclosed_letters(prev_dash_pattern))
+    if not (re.match(r"^[\w'-]+$", dash_pattern, flags=flags)
+            and re.match(r'^[^\d_]+$', dash_pattern, flags=flags)):
+        return 'Input must contain only letters, dashes (-), ' \
+               "and apostrophes (')."
+    if not consistent(dash_pattern, prev_dash_pattern):
+        return 'This dash pattern is not consistent ' \
+               'with the previous one!'
+    if len(new_letters) > 1 - (not prev_dash_pattern):
+        return 'You tried to disclose too many new letters.'
+    if new_letters and letter_to_disclose not in new_letters:
+        return 'You tried to disclose the wrong letter.'
+    return ''
+
+
 def consistent(
         dash_pattern: str,
         prev_dash_pattern='') -> bool:
@@ -263,9 +344,16 @@ def main():
     both successful and unsuccessful. So each next guess is based on
     the recalculated probabilities. Check guess_letter.__doc__ and
     convert_into_regex_pattern.__doc__ for more details.
+    The patterns are evaluated with the word index (see word_index
+    module), which gives the same result as filter_word_list().
+    The letters are taken from the precomputed decision tree
+    of guess_letter() (see decision_tree module); the letters of the
+    remaining words are still counted to print the statistics
+    (incrementally, see candidate_set module).
 
     :return: None
     """
+    from decision_tree import load_tree  # it imports this module
     print('How to play:'
           '\n 1. Pick the word from words.txt file.'
           '\n 2. Show the number of letters in your word'
@@ -274,7 +362,10 @@ def main():
           '\n    position(s) of this letter (e.g. -ss------).'
           "\n 4. If I didn't guess the letter, just enter"
           '\n    the same pattern again.\n')
-    word_list = get_word_list()
+    word_list, index = get_indexed_word_list()
+    tree = load_tree(word_list, guess_letter, index, log=print)
+    node = None
+    candidates = CandidateSet(index)
     prev_dash_pattern, letter = '', ''
     attempts = {'successful': 0, 'unsuccessful': 0}
     while True:
@@ -282,7 +373,7 @@ def main():
         if prev_dash_pattern == dash_pattern:
             print(f'\nOK, so there is no letter "{letter}" in your word.')
             attempts['unsuccessful'] += 1
-            word_list = filter_word_list(word_list, fr'^[^{letter}]+$')
+            candidates.restrict(index.match(fr'^[^{letter}]+$'))
         else:
             if prev_dash_pattern == '':
                 print(f'\nOK, so your word is '
@@ -291,10 +382,20 @@ def main():
                 print(f'\nOK, so your word contains letter "{letter}".')
                 attempts['successful'] += 1
             regex_pattern = convert_into_regex_pattern(dash_pattern)
-            word_list = filter_word_list(word_list, regex_pattern)
+            candidates.restrict(index.match(regex_pattern))
+        if prev_dash_pattern == '':
+            node = tree.root(len(dash_pattern))
+        elif node is not None:
+            node = tree.next(node, letter, dash_pattern)
+        word_list = candidates.words()
         if the_end(word_list, attempts):
             break
-        letter = guess_letter(word_list, disclosed_letters(dash_pattern))
+        disclosed = disclosed_letters(dash_pattern)
+        print_statistics(word_list, candidates.count_letters(disclosed))
+        if node is None:  # off the tree (e.g. a word not from words.txt)
+            letter = candidates.guess_by_word_count(disclosed)
+        else:
+            letter = tree.guess(node)
         print(f'Does the word contain letter "{letter}"?')
         prev_dash_pattern = dash_pattern
 
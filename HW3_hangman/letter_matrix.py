@@ -0,0 +1,271 @@
+"""NumPy backend for the letter counting strategies.
+
+Every word of the list is lowercased and encoded as a row of uint8 codes
+(the index of the character in the sorted alphabet), and the rows of
+the words of the same length make a matrix. Then a guess is a couple of
+array operations on the rows of the remaining words instead of a Python
+loop over their characters:
+1) by word count (guess_letter() from hangman module) - a boolean
+   "word contains the letter" matrix is filled from the codes and
+   summed column-wise;
+2) by letter count (guess_letter_by_letter_count() from
+   compare_approaches module) - np.bincount() of all codes.
+The disclosed letters are masked out of the counts.
+
+The choice is exactly the same as with the original functions,
+including the ties:
+1) guess_letter() counts the letters in alphabetical order, so the
+   first of the tied letters in the alphabet wins - np.argmax() of the
+   counts ordered by the codes;
+2) guess_letter_by_letter_count() relies on the order of the Counter,
+   so the tied letter that occurs first in the word list wins (the
+   first word, then the first position in it).
+
+Run this module to check that the choices are the same and to compare
+the speed on the word list.
+"""
+
+import argparse
+import collections
+import contextlib
+import itertools
+import random
+import time
+from typing import AbstractSet, Callable, Counter, Dict, List, Optional, \
+    Sequence, Tuple
+
+import numpy as np
+
+from strategies import registered_name
+
+SMALL = 64  # shorter lists are counted by the original functions
+
+
+class LetterMatrix:
+    """The words of the list as uint8 matrices by word length."""
+
+    def __init__(self, word_list: Sequence[str]):
+        """Encodes the words.
+
+        :param word_list: a list of words
+        :raise ValueError: if the words contain more than 256
+            distinct characters (in lower case)
+        """
+        self.alphabet = ''.join(sorted(set(''.join(word_list).lower())))
+        if len(self.alphabet) > 256:
+            raise ValueError('too many distinct characters to encode')
+        self.codes = {char: code for code, char in enumerate(self.alphabet)}
+        table = str.maketrans({char: chr(code)
+                               for char, code in self.codes.items()})
+        by_length: Dict[int, List[str]] = collections.defaultdict(list)
+        for word in word_list:
+            by_length[len(word.lower())].append(word)
+        # the ids number the words bucket by bucket
+        self._ids: Dict[str, int] = {}
+        self._offsets: Dict[int, int] = {}  # length: id of the first row
+        self.matrices: Dict[int, np.ndarray] = {}
+        for length, words in sorted(by_length.items()):
+            self._offsets[length] = len(self._ids)
+            self._ids.update(zip(words, itertools.count(len(self._ids))))
+            data = ''.join(words).lower().translate(table).encode('latin-1')
+            self.matrices[length] = np.frombuffer(
+                data, dtype=np.uint8).reshape(len(words), length)
+        self._lengths = np.repeat(
+            np.array(list(self.matrices), np.intp),
+            [len(matrix) for matrix in self.matrices.values()])
+
+    def select(self, word_list: Sequence[str]
+               ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Returns the codes of the words grouped by length.
+
+        :param word_list: words from the encoded list
+        :return: a list of (codes, positions) - a matrix with a row per
+            word and the indexes of these words in word_list (ascending)
+        :raise KeyError: if a word is not from the encoded list
+        """
+        ids = np.fromiter(map(self._ids.__getitem__, word_list), np.intp,
+                          len(word_list))
+        lengths = self._lengths[ids]
+        selected = []
+        for length in np.unique(lengths).tolist():
+            positions = np.flatnonzero(lengths == length)
+            rows = ids[positions] - self._offsets[length]
+            selected.append((self.matrices[length][rows], positions))
+        return selected
+
+    def word_counts(self, word_list: Sequence[str],
+                    disclosed: AbstractSet[str]) -> np.ndarray:
+        """Returns the number of words in which each letter appears
+        (0 for the disclosed letters), ordered by the codes.
+        """
+        counts = np.zeros(len(self.alphabet), np.int64)
+        for codes, _ in self.select(word_list):
+            # a flat (words x letters) matrix: word contains the letter
+            size = len(codes) * len(self.alphabet)
+            contains = np.zeros(size, bool)
+            contains[(np.arange(0, size, len(self.alphabet))[:, None]
+                      + codes).ravel()] = True
+            counts += contains.reshape(len(codes), -1).sum(axis=0)
+        return self._mask(counts, disclosed)
+
+    def letter_counts(self, word_list: Sequence[str],
+                      disclosed: AbstractSet[str]) -> np.ndarray:
+        """Returns the total occurrences of each letter in all words
+        (0 for the disclosed letters), ordered by the codes.
+        """
+        counts = np.zeros(len(self.alphabet), np.int64)
+        for codes, _ in self.select(word_list):
+            counts += np.bincount(codes.ravel(),
+                                  minlength=len(self.alphabet))
+        return self._mask(counts, disclosed)
+
+    def count_letters(self, word_list: Sequence[str],
+                      disclosed: AbstractSet[str]) -> Counter:
+        """The same as count_letters() from hangman module.
+
+        :param word_list: words from the encoded list
+        :param disclosed: letters to ignore (already guessed)
+        :return: Counter {letter: number of words} in alphabetical order
+        """
+        counts = self.word_counts(word_list, disclosed)
+        return collections.Counter({self.alphabet[code]: int(counts[code])
+                                    for code in np.flatnonzero(counts)})
+
+    def guess_by_word_count(self, word_list: Sequence[str],
+                            disclosed: AbstractSet[str]) -> Optional[str]:
+        """The same choice as guess_letter() from hangman module
+        (without printing the statistics).
+
+        :param word_list: words from the encoded list
+        :param disclosed: letters to ignore (already guessed)
+        :return: a single letter; if the word list is empty, returns None
+        """
+        counts = self.word_counts(word_list, disclosed)
+        code = int(np.argmax(counts))
+        if counts[code]:
+            return self.alphabet[code]
+
+    def guess_by_letter_count(self, word_list: Sequence[str],
+                              disclosed: AbstractSet[str]) -> Optional[str]:
+        """The same choice as guess_letter_by_letter_count()
+        from compare_approaches module.
+
+        :param word_list: words from the encoded list
+        :param disclosed: letters to ignore (already guessed)
+        :return: a single letter; if the word list is empty, returns None
+        """
+        counts = self.letter_counts(word_list, disclosed)
+        if not counts.any():
+            return None
+        tied = np.flatnonzero(counts == counts.max())
+        if len(tied) == 1:
+            return self.alphabet[tied[0]]
+        first: Dict[int, Tuple[int, int]] = {}  # code: (word, position)
+        for codes, positions in self.select(word_list):
+            for code in tied:
+                found = (codes == code).ravel()
+                if found.any():
+                    row, column = divmod(int(np.argmax(found)),
+                                         codes.shape[1])
+                    occurrence = int(positions[row]), column
+                    first[code] = min(first.get(code, occurrence),
+                                      occurrence)
+        return self.alphabet[min(first, key=first.get)]
+
+    def strategy(self, guess_function: Callable) -> Callable:
+        """Returns the vectorized version of the strategy. The lists
+        shorter than SMALL words are still passed to guess_function,
+        since they are counted faster without NumPy.
+
+        :param guess_function: the registered strategy by_word_count
+            or by_letter_count (see strategies module)
+        :return: function(word_list, disclosed) -> letter;
+            guess_function itself if it is not one of them
+        """
+        vectorized = {
+            'by_word_count': self.guess_by_word_count,
+            'by_letter_count': self.guess_by_letter_count,
+        }.get(registered_name(guess_function))
+        if vectorized is None:
+            return guess_function
+
+        def guess(word_list: Sequence[str],
+                  disclosed: AbstractSet[str]) -> Optional[str]:
+            if len(word_list) < SMALL:
+                return guess_function(word_list, disclosed)
+            return vectorized(word_list, disclosed)
+
+        return guess
+
+    def _mask(self, counts: np.ndarray,
+              disclosed: AbstractSet[str]) -> np.ndarray:
+        """Sets the counts of the disclosed letters to 0."""
+        for letter in disclosed:
+            if letter in self.codes:
+                counts[self.codes[letter]] = 0
+        return counts
+
+
+def compare(word_list: Sequence[str], samples: int,
+            seed: int = 0) -> Dict[str, Tuple[int, float, float]]:
+    """Checks that both strategies make the same choice with
+    the matrices as without them, and measures the time.
+
+    The word lists are the length buckets of the list and random
+    subsets of them, with random disclosed letters.
+
+    :param word_list: a full list of words
+    :param samples: number of random subsets
+    :param seed: seed of the random generator
+    :return: {strategy: (number of different choices, seconds of the
+        original function, seconds with the matrices)}
+    """
+    from compare_approaches import guess_letter_by_letter_count
+    from hangman import guess_letter
+    rng = random.Random(seed)
+    matrix = LetterMatrix(word_list)
+    buckets = collections.defaultdict(list)
+    for word in word_list:
+        buckets[len(word)].append(word)
+    cases = [(words, set()) for words in buckets.values()]
+    for _ in range(samples):
+        words = rng.choice(list(buckets.values()))
+        words = rng.sample(words, rng.randint(1, len(words)))
+        cases.append((words, set(rng.sample(matrix.alphabet,
+                                            rng.randint(0, 5)))))
+    report = {}
+    for original, vectorized in (
+            (guess_letter, matrix.guess_by_word_count),
+            (guess_letter_by_letter_count, matrix.guess_by_letter_count)):
+        start_time = time.perf_counter()
+        with contextlib.redirect_stdout(None):  # guess statistics
+            expected = [original(*case) for case in cases]
+        original_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        actual = [vectorized(*case) for case in cases]
+        vectorized_time = time.perf_counter() - start_time
+        report[original.__name__] = (
+            sum(a != e for a, e in zip(actual, expected)),
+            original_time, vectorized_time)
+    return report
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--samples', type=int, default=1000,
+        help='number of random word lists to check (default is 1000)')
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help='seed of the random generator (default is 0)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    from hangman import get_word_list
+    args = get_args_from_cmd()
+    for name, (mismatches, original_seconds, vectorized_seconds) in compare(
+            get_word_list(), args.samples, args.seed).items():
+        print(f'{name}: {mismatches} different choices, '
+              f'{original_seconds:.2f} s -> {vectorized_seconds:.2f} s')
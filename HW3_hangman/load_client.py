@@ -0,0 +1,191 @@
+"""Load generator for game_server.py.
+
+Opens a number of concurrent connections, each of them playing games
+with random words from the word list: it sends the dashes of the word,
+then reveals the positions of every guessed letter, and checks that
+the server ends the game with this word. All connections start their
+first game before the clock starts, so the server's STATS taken at that
+moment show the memory of that many sessions in the middle of a game:
+the mean size of a session state (session_bytes), and the growth of the
+server process (maxrss) per connection, which also includes the buffers
+of the connection.
+
+Reports guesses/sec (responses to NEW and PATTERN) and latency
+percentiles.
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from typing import Dict, List, Sequence
+
+from hangman import get_word_list
+
+
+class ProtocolError(RuntimeError):
+    """The server responded with an error or a wrong word."""
+
+
+async def play_games(host: str, port: int, words: Sequence[str], games: int,
+                     rng: random.Random, started: asyncio.Queue,
+                     go: asyncio.Event, latencies: List[float]
+                     ) -> Dict[str, int]:
+    """Plays the games over a single connection.
+
+    :param host: address of the server
+    :param port: port of the server
+    :param words: the word list to pick the words from
+    :param games: number of games
+    :param rng: random number generator to pick the words
+    :param started: None is put into it when the first game is started
+    :param go: the event to wait for after that
+    :param latencies: response times (seconds) are appended
+    :return: {'games': .., 'successful': .., 'unsuccessful': ..}
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    timer = time.perf_counter
+    results = {'games': 0, 'successful': 0, 'unsuccessful': 0}
+
+    async def request(command: str) -> str:
+        start = timer()
+        writer.write(command.encode('utf-8') + b'\n')
+        response = (await reader.readline()).decode('utf-8').rstrip('\n')
+        latencies.append(timer() - start)
+        if not response or response.startswith('ERR'):
+            raise ProtocolError(f'{command!r} -> {response!r}')
+        return response
+
+    try:
+        for game in range(games):
+            word = rng.choice(words)
+            dash_pattern = '-' * len(word)
+            response = await request(f'NEW {dash_pattern}')
+            if not game:
+                started.put_nowait(None)
+                await go.wait()
+            while response.startswith('GUESS'):
+                letter = response.split(' ')[1]
+                dash_pattern = ''.join(
+                    char if char == letter else dash_char
+                    for char, dash_char in zip(word.lower(), dash_pattern))
+                response = await request(f'PATTERN {dash_pattern}')
+            _, successful, unsuccessful, *guessed_words = response.split(' ')
+            if word not in guessed_words:
+                raise ProtocolError(f'{word!r} -> {response!r}')
+            results['games'] += 1
+            results['successful'] += int(successful)
+            results['unsuccessful'] += int(unsuccessful)
+        writer.write(b'QUIT\n')
+    finally:
+        writer.close()
+    return results
+
+
+async def stats(host: str, port: int) -> Dict[str, int]:
+    """Returns the response of the server to STATS command
+    as {name: value}.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'STATS\n')
+    response = (await reader.readline()).decode().strip()
+    writer.close()
+    return {name: int(value)
+            for name, value in re.findall(r'(\w+)=(\d+)', response)}
+
+
+async def run_load(host: str, port: int, words: Sequence[str], clients: int,
+                   games: int, seed=0) -> Dict:
+    """Runs the clients concurrently.
+
+    :param host: address of the server
+    :param port: port of the server
+    :param words: the word list to pick the words from
+    :param clients: number of concurrent connections
+    :param games: games per client
+    :param seed: seed of the random words
+    :return: {'results': summed results of play_games(),
+        'latencies': of all requests, 'seconds': elapsed,
+        'idle_stats': server STATS before the load,
+        'peak_stats': server STATS with all clients in a game}
+    """
+    idle_stats = await stats(host, port)
+    rng = random.Random(seed)
+    started: asyncio.Queue = asyncio.Queue()
+    go = asyncio.Event()
+    latencies: List[float] = []
+    tasks = [asyncio.ensure_future(play_games(
+        host, port, words, games, random.Random(rng.random()), started, go,
+        latencies)) for _ in range(clients)]
+    waiting = asyncio.ensure_future(asyncio.gather(
+        *(started.get() for _ in range(clients))))
+    await asyncio.wait([waiting, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    if not waiting.done():  # a client has failed
+        waiting.cancel()
+        go.set()
+        await asyncio.gather(*tasks)  # raises the error
+    peak_stats = await stats(host, port)
+    latencies.clear()  # only the requests after the start of the clock
+    start_time = time.perf_counter()
+    go.set()
+    client_results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start_time
+    results = {'games': 0, 'successful': 0, 'unsuccessful': 0}
+    for client_result in client_results:
+        for name, n in client_result.items():
+            results[name] += n
+    return {'results': results, 'latencies': latencies, 'seconds': elapsed,
+            'idle_stats': idle_stats, 'peak_stats': peak_stats}
+
+
+def percentile(sorted_values: Sequence[float], percent: int) -> float:
+    """Nearest-rank percentile."""
+    rank = -(-len(sorted_values) * percent // 100)  # ceiling
+    return sorted_values[max(rank, 1) - 1]
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--host', default='127.0.0.1',
+        help='address of the server (default is 127.0.0.1)')
+    parser.add_argument(
+        '--port', type=int, default=7778,
+        help='port of the server (default is 7778)')
+    parser.add_argument(
+        '--clients', type=int, default=1000,
+        help='number of concurrent sessions (default is 1000)')
+    parser.add_argument(
+        '--games', type=int, default=10,
+        help='games per client (default is 10)')
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help='seed of the random words (default is 0)')
+    parser.add_argument(
+        '--words', default='words.txt',
+        help='the word list of the server (default is words.txt)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    word_list = [word for word in get_word_list(args.words) if word]
+    report = asyncio.run(run_load(args.host, args.port, word_list,
+                                  args.clients, args.games, args.seed))
+    all_results, all_latencies = report['results'], sorted(report['latencies'])
+    total_time = report['seconds']
+    idle, peak = report['idle_stats'], report['peak_stats']
+    print(f"{all_results['games']} games guessed, "
+          f"{all_results['successful'] + all_results['unsuccessful']} "
+          f"attempts ({all_results['unsuccessful']} unsuccessful)")
+    print(f'{len(all_latencies)} requests in {total_time:.2f} s, '
+          f'{len(all_latencies) / total_time:.0f} guesses/sec')
+    print('latency, ms: ' + ', '.join(
+        f'p{percent} {percentile(all_latencies, percent) * 1000:.2f}'
+        for percent in (50, 90, 99)) + f', max {all_latencies[-1] * 1000:.2f}')
+    growth = (peak['maxrss_kb'] - idle['maxrss_kb']) / max(args.clients, 1)
+    print(f"{peak['sessions']} sessions: {peak['session_bytes']} bytes of "
+          f'state per session, server maxrss {idle["maxrss_kb"]} -> '
+          f"{peak['maxrss_kb']} KB ({growth:.1f} KB per connection)")
@@ -0,0 +1,212 @@
+"""Parallel and resumable version of play_iterated_game().
+
+The words are split into shards - one contiguous part of the word list
+per worker process. Each worker plays its words (see try_two_methods())
+and appends the records to its own shard file, flushing it after every
+word. The shards are kept in a directory named after the word list
+hash and the range of words, so if the run is interrupted (Ctrl-C,
+a crash, etc.), the next run with the same parameters skips the words
+that are already recorded and continues from there.
+
+When all shards are complete, they are merged into a single report in
+the same format as the one of play_iterated_game() (the same columns
+and the same order of words), and the shard directory is removed.
+
+Just as in play_iterated_game(), the words to guess are also the
+dictionary the guesses are based on.
+"""
+
+import argparse
+import csv
+import gc
+import os
+import shutil
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import events
+from compare_approaches import create_abs_filename, \
+    guess_letter_by_letter_count, guess_letter_by_word_count, \
+    try_two_methods
+from decision_tree import hash_word_list, load_tree
+from hangman import get_indexed_word_list
+from word_index import WordIndex
+
+FIELDNAMES = (
+    'word', 'word_length',
+    'by_word_count_guessed', 'by_word_count_missed', 'by_word_count_total',
+    'by_letter_count_guessed', 'by_letter_count_missed',
+    'by_letter_count_total'
+)  # the keys of the records made by try_two_methods()
+
+_worker_state = {}  # the word list, its index and trees, per process
+
+
+def shard_directory(word_list: Sequence[str], start: int, stop: int,
+                    shards: int) -> str:
+    """Returns the directory for the shards of the run.
+    Runs with different parameters do not share the shards.
+
+    :param word_list: the words of the run
+    :param start: index of the first word in words.txt
+    :param stop: index after the last word
+    :param shards: number of shards
+    :return: absolute path
+    """
+    digest = hash_word_list(word_list)[:12]
+    return os.path.join(os.getcwd(),
+                        f'shards_{digest}_{start}-{stop}_x{shards}')
+
+
+def split_into_shards(total: int, shards: int) -> List[Tuple[int, int]]:
+    """Splits range(total) into contiguous parts of nearly equal size.
+
+    :param total: number of words
+    :param shards: number of parts
+    :return: (start, stop) per part
+    """
+    bounds = [total * shard // shards for shard in range(shards + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def recorded_words(filename: str) -> int:
+    """Returns the number of words recorded in the shard file.
+    An incomplete last line (if the worker was killed while writing
+    it) is cut off, so the file can be appended to.
+
+    :param filename: shard file
+    :return: number of records (0 if there is no file)
+    """
+    try:
+        with open(filename, 'rb+') as f:
+            data = f.read()
+            complete = data.rfind(b'\n') + 1
+            if complete < len(data):
+                f.truncate(complete)
+    except FileNotFoundError:
+        return 0
+    return max(data.count(b'\n', 0, complete) - 1, 0)  # minus header
+
+
+def play_shard(task: Tuple[int, int, int, str]) -> Tuple[int, int, float]:
+    """Plays the words of the shard that are not recorded yet.
+    Runs in a worker process.
+
+    :param task: shard number, start, stop (indexes in the word list),
+        shard file
+    :return: shard number, number of words played, seconds
+    """
+    shard, start, stop, filename = task
+    word_list = _worker_state['word_list']
+    done = recorded_words(filename)
+    start_time = time.perf_counter()
+    with open(filename, 'a', encoding='utf-8', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, dialect='excel',
+                                fieldnames=FIELDNAMES)
+        if not csv_file.tell():  # a new file
+            writer.writeheader()
+        with events.using(events.EventSink()):  # no log of the games
+            for word in word_list[start + done:stop]:
+                writer.writerow(try_two_methods(
+                    word, word_list, _worker_state['index'],
+                    _worker_state['trees']))
+                csv_file.flush()
+    return shard, stop - start - done, time.perf_counter() - start_time
+
+
+def merge_shards(filenames: Sequence[str], report_filename: str) -> None:
+    """Concatenates the shards (in their order) into the report.
+
+    :param filenames: shard files
+    :param report_filename: the csv report
+    :return: None
+    """
+    with open(report_filename, 'w', encoding='utf-8',
+              newline='') as report:
+        for number, filename in enumerate(filenames):
+            with open(filename, 'r', encoding='utf-8', newline='') as f:
+                header = f.readline()
+                if number == 0:
+                    report.write(header)
+                shutil.copyfileobj(f, report)
+
+
+def _init_worker(word_list: List[str], index: WordIndex,
+                 trees: Dict) -> None:
+    # the word list, the index and the trees are loaded by the parent,
+    # and the forked workers inherit them (copy-on-write) instead of
+    # loading their own copies
+    _worker_state.update(word_list=word_list, index=index, trees=trees)
+
+
+def play_iterated_game_parallel(start=0, stop=102305,
+                                workers: Optional[int] = None
+                                ) -> Optional[str]:
+    """Guesses every word from the word list in worker processes
+    and records the numbers of all attempts in the csv report.
+
+    :param start: index to start
+    :param stop: index to stop
+    :param workers: number of processes (and shards),
+        default is the number of CPUs
+    :return: the name of the report, or None if the run
+        was interrupted (run it again to resume)
+    """
+    workers = workers or os.cpu_count()
+    word_list, index = get_indexed_word_list(start=start, stop=stop)
+    directory = shard_directory(word_list, start, stop, workers)
+    os.makedirs(directory, exist_ok=True)
+    trees = {function: load_tree(word_list, function, index)
+             for function in (guess_letter_by_word_count,
+                              guess_letter_by_letter_count)}
+    tasks = [(shard, shard_start, shard_stop,
+              os.path.join(directory, f'shard_{shard:03d}.csv'))
+             for shard, (shard_start, shard_stop)
+             in enumerate(split_into_shards(len(word_list), workers))]
+    for shard, shard_start, shard_stop, filename in tasks:
+        done = recorded_words(filename)
+        if done:
+            print(f'shard {shard}: resuming after '
+                  f'{done} of {shard_stop - shard_start} words')
+    start_time = time.perf_counter()
+    gc.freeze()  # so the collectors of the workers do not copy them
+    with Pool(workers, initializer=_init_worker,
+              initargs=(word_list, index, trees)) as pool:
+        try:
+            for shard, played, elapsed in pool.imap_unordered(play_shard,
+                                                              tasks):
+                print(f'shard {shard}: {played} words in {elapsed:.1f} s, '
+                      f'{played / elapsed if elapsed else 0:.1f} words/sec')
+        except KeyboardInterrupt:
+            pool.terminate()
+            print(f'Interrupted. The shards are kept in {directory}, '
+                  f'run again to resume.')
+            return None
+    total_time = time.perf_counter() - start_time
+    report_filename = create_abs_filename()
+    merge_shards([task[3] for task in tasks], report_filename)
+    shutil.rmtree(directory)
+    print(f'total: {len(word_list)} words in {total_time:.1f} s')
+    print(f'csv file generated successfully: {report_filename}')
+    return report_filename
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--start', type=int, default=0,
+        help='index of the first word (default is 0)')
+    parser.add_argument(
+        '--stop', type=int, default=102305,
+        help='index after the last word (default is 102305)')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count(),
+        help='number of worker processes (default is the number of CPUs)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    play_iterated_game_parallel(args.start, args.stop, args.workers)
@@ -0,0 +1,364 @@
+"""Streaming statistics of the csv reports of compare_approaches.py.
+
+visualize_report.py used to load the whole report with pandas, which
+does not scale to the reports of many shards (see parallel_report.py)
+with hundreds of millions of rows. ReportStats reads one or more reports
+in chunks of rows and keeps only sufficient statistics of every column
+(but 'word'), for all rows and per word_length:
+    count, mean and variance (merged chunk by chunk with the parallel
+    algorithm of Chan et al.), minimum and maximum;
+    a quantile sketch - a histogram of at most max_bins (value, count)
+    bins. The numbers of attempts are small integers, so the histogram
+    holds every distinct value and the quantiles are exact; otherwise the
+    closest values are merged into weighted bins (the error of a quantile
+    is about 1 / max_bins in rank).
+So the memory does not depend on the number of rows. The means are
+compared with Welch's t-test (see significance module), and the box
+plots are drawn from the sketches (see visualize_report.py).
+"""
+
+import argparse
+import collections
+import csv
+import math
+import sys
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from significance import welch_t_test
+
+CHUNK_SIZE = 100000  # rows
+MAX_BINS = 1000
+LENGTH_COLUMN = 'word_length'
+
+
+class ColumnStats:
+    """Online mean, variance and quantile sketch of a column."""
+
+    def __init__(self, max_bins=MAX_BINS):
+        """:param max_bins: the maximum size of the histogram"""
+        self.max_bins = max_bins
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # the sum of the squared deviations from the mean
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.bins: Dict[float, int] = {}  # {value: count}
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (with n - 1 in the denominator)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def add_counts(self, counts: Dict[float, int]) -> None:
+        """Adds the values of a chunk.
+
+        :param counts: {value: how many times it occurs}
+        """
+        count = sum(counts.values())
+        if not count:
+            return
+        mean = math.fsum(value * n for value, n in counts.items()) / count
+        m2 = math.fsum(n * (value - mean) ** 2 for value, n in counts.items())
+        self._merge_moments(count, mean, m2)
+        self.minimum = min(self.minimum, *counts)
+        self.maximum = max(self.maximum, *counts)
+        for value, n in counts.items():
+            self.bins[value] = self.bins.get(value, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._compact()
+
+    def merge(self, other: 'ColumnStats') -> None:
+        """Adds the values of the other statistics (e.g. of another shard).
+        """
+        if not other.count:
+            return
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        for value, n in other.bins.items():
+            self.bins[value] = self.bins.get(value, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._compact()
+
+    def _merge_moments(self, count: int, mean: float, m2: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def _compact(self) -> None:
+        """Merges the neighbouring bins into at most max_bins bins of about
+        the same count (a value that is more frequent stays alone).
+        """
+        target = self.count / self.max_bins
+        bins: Dict[float, int] = {}
+        group: List[Tuple[float, int]] = []
+        group_count = 0
+        for value in sorted(self.bins):
+            group.append((value, self.bins[value]))
+            group_count += self.bins[value]
+            if group_count >= target:
+                bins[self._centroid(group, group_count)] = group_count
+                group, group_count = [], 0
+        if group:
+            bins[self._centroid(group, group_count)] = group_count
+        self.bins = bins
+
+    @staticmethod
+    def _centroid(group: List[Tuple[float, int]], count: int) -> float:
+        if len(group) == 1:
+            return group[0][0]
+        return math.fsum(value * n for value, n in group) / count
+
+    def quantile(self, q: float) -> float:
+        """Returns the q-quantile (linear interpolation between the ranks,
+        as numpy.quantile() and pandas do by default).
+
+        :param q: from 0 to 1
+        :raise ValueError: if there are no values
+        """
+        if not self.count:
+            raise ValueError('no values')
+        position = (self.count - 1) * q
+        rank = math.floor(position)
+        below = self._value_at(rank)
+        if rank + 1 >= self.count:
+            return below
+        return below + (position - rank) * (self._value_at(rank + 1) - below)
+
+    def _value_at(self, rank: int) -> float:
+        """Returns the value at the rank (from 0) in the sorted values."""
+        for value in sorted(self.bins):
+            rank -= self.bins[value]
+            if rank < 0:
+                return value
+        return self.maximum
+
+    def box_stats(self, label='', whis=1.5) -> Dict:
+        """Returns the statistics of a box plot as matplotlib Axes.bxp()
+        accepts them: the quartiles, the whiskers at the most extreme
+        values within whis * IQR of the box, and the fliers beyond them
+        (each distinct value once).
+
+        :param label: the label of the box
+        :param whis: the length of the whiskers in IQRs
+        :raise ValueError: if there are no values
+        """
+        q1, median, q3 = (self.quantile(q) for q in (0.25, 0.5, 0.75))
+        low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+        values = sorted(self.bins)
+        inside = [value for value in values if low <= value <= high]
+        return {'label': label, 'mean': self.mean, 'med': median,
+                'q1': q1, 'q3': q3,
+                'whislo': min(inside, default=q1),
+                'whishi': max(inside, default=q3),
+                'fliers': [value for value in values
+                           if not low <= value <= high]}
+
+
+class ReportStats:
+    """Statistics of the columns of csv reports, for all rows and per
+    word length.
+    """
+
+    def __init__(self, max_bins=MAX_BINS):
+        """:param max_bins: the maximum size of the histograms"""
+        self.max_bins = max_bins
+        self.header: Optional[List[str]] = None
+        self._at: Dict[str, int] = {}  # {column: index in the header}
+        self.columns: Dict[str, ColumnStats] = {}
+        self.by_length: Dict[int, Dict[str, ColumnStats]] = {}
+
+    def add_file(self, filename: str, chunk_size=CHUNK_SIZE) -> None:
+        """Reads the report in chunks of rows.
+
+        :param filename: the csv report
+        :param chunk_size: the number of rows in memory at once
+        :raise OSError: if the file cannot be read
+        :raise ValueError: if the header differs from the one of the
+            first report or a value is not a number
+        """
+        with open(filename, encoding='utf-8', newline='') as csv_file:
+            reader = csv.reader(csv_file, dialect='excel')
+            header = next(reader, None)
+            if header is None:
+                return
+            if self.header is None:
+                self._set_header(header)
+            elif header != self.header:
+                raise ValueError(f'{filename}: the columns differ from the '
+                                 'ones of the first report')
+            while True:
+                rows = list(islice(reader, chunk_size))
+                if not rows:
+                    break
+                self.add_rows(rows)
+
+    def _set_header(self, header: List[str]) -> None:
+        self.header = header
+        self._at = {name: at for at, name in enumerate(header)
+                    if name != 'word'}
+        self.columns = {name: ColumnStats(self.max_bins)
+                        for name in self._at}
+
+    def add_rows(self, rows: Sequence[Sequence[str]]) -> None:
+        """Adds a chunk of rows of the report (without the header)."""
+        if LENGTH_COLUMN in self._at:
+            lengths: Iterable = map(itemgetter(self._at[LENGTH_COLUMN]), rows)
+            lengths = list(lengths)
+        else:
+            lengths = [None] * len(rows)
+        for name, at in self._at.items():
+            groups: Dict[Optional[str], Dict[float, int]] = \
+                collections.defaultdict(dict)
+            pairs = collections.Counter(zip(lengths, map(itemgetter(at), rows)))
+            for (length, text), n in pairs.items():
+                value = _number(text)
+                counts = groups[length]
+                counts[value] = counts.get(value, 0) + n
+            total: Dict[float, int] = {}
+            for length, counts in groups.items():
+                for value, n in counts.items():
+                    total[value] = total.get(value, 0) + n
+                if length is not None:
+                    self.length_stats(int(length), name).add_counts(counts)
+            self.columns[name].add_counts(total)
+
+    def length_stats(self, length: int, name: str) -> ColumnStats:
+        """Returns the statistics of the column for the word length."""
+        columns = self.by_length.setdefault(length, {})
+        if name not in columns:
+            columns[name] = ColumnStats(self.max_bins)
+        return columns[name]
+
+    def stats(self, name: str, length: Optional[int] = None) -> ColumnStats:
+        """Returns the statistics of the column.
+
+        :param name: the name of the column
+        :param length: word length (default is None - all rows)
+        :raise ValueError: if there is no such column or length
+        """
+        columns = self.columns if length is None else \
+            self.by_length.get(length, {})
+        if name not in columns:
+            raise ValueError(f'no column {name!r}' + (
+                '' if length is None else f' for word length {length}'))
+        return columns[name]
+
+    def compare(self, name: str, other: str,
+                length: Optional[int] = None) -> Tuple[float, float, float]:
+        """Compares the means of the columns with Welch's t-test.
+
+        :param name: the name of the column
+        :param other: the name of the column to compare with
+        :param length: word length (default is None - all rows)
+        :return: difference of the means, t statistic, two-sided p-value
+        :raise ValueError: if there is no such column or less than 2 rows
+        """
+        a, b = self.stats(name, length), self.stats(other, length)
+        return welch_t_test(a.mean, a.variance, a.count,
+                            b.mean, b.variance, b.count)
+
+
+def _number(text: str) -> float:
+    """Converts a value of the report (an int if possible)."""
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f'not a number: {text!r}') from None
+
+
+def print_summary(report_stats: ReportStats,
+                  names: Optional[Sequence[str]] = None,
+                  length: Optional[int] = None) -> None:
+    """Prints a table of the statistics of the columns.
+
+    :param report_stats: the statistics
+    :param names: the columns (default is all of them)
+    :param length: word length (default is None - all rows)
+    """
+    print(f"{'column':<26}{'count':>11}{'mean':>9}{'std':>9}{'min':>7}"
+          f"{'25%':>7}{'50%':>7}{'75%':>7}{'max':>7}")
+    for name in names or report_stats.columns:
+        stats = report_stats.stats(name, length)
+        if not stats.count:
+            continue
+        quartiles = ''.join(f'{stats.quantile(q):>7.4g}'
+                            for q in (0.25, 0.5, 0.75))
+        print(f'{name:<26}{stats.count:>11}{stats.mean:>9.4f}'
+              f'{stats.std:>9.4f}{stats.minimum:>7.4g}{quartiles}'
+              f'{stats.maximum:>7.4g}')
+
+
+def print_comparison(report_stats: ReportStats, name: str, other: str,
+                     by_length=False) -> None:
+    """Prints Welch's t-test of the means of two columns.
+
+    :param report_stats: the statistics
+    :param name: the name of the column
+    :param other: the name of the column to compare with
+    :param by_length: also compare them for every word length
+    """
+    print(f"Welch's t-test: {name} - {other}")
+    lengths: List[Optional[int]] = [None]
+    if by_length:
+        lengths += sorted(report_stats.by_length)
+    for length in lengths:
+        try:
+            difference, t, p = report_stats.compare(name, other, length)
+        except ValueError as e:  # e.g. a single word of the length
+            result = str(e)
+        else:
+            result = f'difference {difference:+.4f}, t={t:.4f}, p={p:.4g}'
+        print(f"{'all' if length is None else length:>5}  {result}")
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        'filenames', nargs='+',
+        help='csv reports (e.g. the shards of parallel_report.py)')
+    parser.add_argument(
+        '--compare', nargs=2, metavar=('COLUMN', 'OTHER'),
+        default=['by_word_count_total', 'by_letter_count_total'],
+        help='columns to compare with Welch\'s t-test '
+             '(default is by_word_count_total by_letter_count_total)')
+    parser.add_argument(
+        '--by-length', action='store_true',
+        help='also print the statistics and the tests per word length')
+    parser.add_argument(
+        '--chunk-size', type=int, default=CHUNK_SIZE,
+        help=f'rows to read at once (default is {CHUNK_SIZE})')
+    parser.add_argument(
+        '--bins', type=int, default=MAX_BINS,
+        help=f'the maximum size of the histograms (default is {MAX_BINS})')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    result_stats = ReportStats(args.bins)
+    try:
+        for report_filename in args.filenames:
+            result_stats.add_file(report_filename, args.chunk_size)
+        print_summary(result_stats)
+        if args.by_length:
+            for word_length in sorted(result_stats.by_length):
+                print(f'\n{LENGTH_COLUMN} = {word_length}')
+                print_summary(result_stats, args.compare, word_length)
+        print()
+        print_comparison(result_stats, *args.compare, args.by_length)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
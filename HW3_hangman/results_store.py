@@ -0,0 +1,288 @@
+"""Persistent store of the results of compare_approaches.py (SQLite).
+
+play_iterated_game() plays every word again on every run. The result of
+a game, however, depends only on the words of the same length (the first
+dash pattern leaves only them, and the strategies never see the others),
+and on their order (it breaks the ties of by_letter_count). So the
+results are stored per (strategy, word), and every word length bucket is
+tagged with a fingerprint - SHA-256 of its words in their order. When
+the word list changes, only the buckets whose fingerprints differ are
+played again; the buckets of the lengths that are gone are deleted.
+For the same reason a bucket is played with the index and the decision
+tree of its own words (see decision_tree module), so a change costs
+only the games of the changed buckets, not a tree of the dictionary.
+Every bucket is committed as soon as it is played, so an interrupted
+update goes on from the next bucket when it is run again.
+
+The report is exported from the store on demand, in the same format as
+the one of play_iterated_game() (for the default strategies).
+
+Tables (the names are fixed, only the values are query parameters):
+    meta(key, value) - the version of the store;
+    words(position, word) - the current word list;
+    buckets(strategy, length, fingerprint) - the buckets that are played;
+    results(strategy, word, length, guessed, missed).
+"""
+
+import argparse
+import csv
+import hashlib
+import sqlite3
+import sys
+from typing import Callable, Dict, List, Optional, Sequence
+
+import events
+from compare_approaches import create_abs_filename, play_game
+from decision_tree import build_tree
+from hangman import get_word_list
+from strategies import get_strategy
+from word_index import WordIndex
+
+RESULTS_VERSION = '1'  # change to drop the results of older versions
+DEFAULT_STRATEGIES = ('by_word_count', 'by_letter_count')
+
+
+class ResultsStore:
+    """The results of the games in an SQLite database."""
+
+    def __init__(self, filename='results.db'):
+        """Opens the database and creates the tables if needed.
+        The results of another version of the store are deleted.
+
+        :param filename: the database (default is 'results.db')
+        """
+        self.connection = sqlite3.connect(filename)
+        self.connection.executescript("""
+        CREATE TABLE IF NOT EXISTS meta(
+            key          TEXT     PRIMARY KEY,
+            value        TEXT
+        );
+        CREATE TABLE IF NOT EXISTS words(
+            position     INTEGER  PRIMARY KEY,
+            word         TEXT     NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS buckets(
+            strategy     TEXT,
+            length       INTEGER,
+            fingerprint  TEXT     NOT NULL,
+            PRIMARY KEY (strategy, length)
+        );
+        CREATE TABLE IF NOT EXISTS results(
+            strategy     TEXT,
+            word         TEXT,
+            length       INTEGER  NOT NULL,
+            guessed      INTEGER  NOT NULL,
+            missed       INTEGER  NOT NULL,
+            PRIMARY KEY (strategy, word)
+        );""")
+        version = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'version';").fetchone()
+        if version != (RESULTS_VERSION,):
+            self.clear()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def clear(self) -> None:
+        """Deletes all results."""
+        with self.connection:
+            self.connection.executescript("""
+            DELETE FROM words;
+            DELETE FROM buckets;
+            DELETE FROM results;""")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('version', ?);",
+                (RESULTS_VERSION,))
+
+    def fingerprints(self, strategy: str) -> Dict[int, str]:
+        """Returns {length: fingerprint} of the stored buckets."""
+        return dict(self.connection.execute(
+            "SELECT length, fingerprint FROM buckets WHERE strategy = ?;",
+            (strategy,)))
+
+    def save_words(self, word_list: Sequence[str]) -> None:
+        """Replaces the stored word list (the order of the report)."""
+        with self.connection:
+            self.connection.execute("DELETE FROM words;")
+            self.connection.executemany(
+                "INSERT INTO words VALUES (?, ?);", enumerate(word_list))
+
+    def save_bucket(self, strategy: str, length: int, fingerprint: str,
+                    results: Dict[str, Dict[str, int]]) -> None:
+        """Replaces the results of the bucket (in a single transaction).
+
+        :param strategy: the name of the strategy
+        :param length: word length
+        :param fingerprint: see bucket_fingerprints()
+        :param results: {word: attempts (as returned by play_game())}
+        """
+        with self.connection:
+            self._delete_bucket(strategy, length)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?);",
+                ((strategy, word, length, attempts['successful'],
+                  attempts['unsuccessful'])
+                 for word, attempts in results.items()))
+            self.connection.execute(
+                "INSERT INTO buckets VALUES (?, ?, ?);",
+                (strategy, length, fingerprint))
+
+    def delete_bucket(self, strategy: str, length: int) -> None:
+        """Deletes the results of the bucket."""
+        with self.connection:
+            self._delete_bucket(strategy, length)
+
+    def _delete_bucket(self, strategy: str, length: int) -> None:
+        """Deletes the results of the bucket (in the current transaction).
+        """
+        self.connection.execute(
+            "DELETE FROM results WHERE strategy = ? AND length = ?;",
+            (strategy, length))
+        self.connection.execute(
+            "DELETE FROM buckets WHERE strategy = ? AND length = ?;",
+            (strategy, length))
+
+    def report_rows(self, strategies: Sequence[str]) -> Optional[List]:
+        """Returns the rows of the report in the order of the word list:
+        word, word_length, then guessed, missed and total attempts
+        per strategy.
+
+        :param strategies: the names of the strategies
+        :return: rows, or None if some words have no results
+        """
+        joins = ''.join(
+            f' JOIN results AS r{number} ON r{number}.word = words.word'
+            f' AND r{number}.strategy = ?'
+            for number in range(len(strategies)))
+        columns = ''.join(
+            f', r{number}.guessed, r{number}.missed,'
+            f' r{number}.guessed + r{number}.missed'
+            for number in range(len(strategies)))
+        rows = self.connection.execute(
+            f'SELECT words.word, length(words.word){columns} FROM words'
+            f'{joins} ORDER BY words.position;', tuple(strategies)).fetchall()
+        total, = self.connection.execute(
+            'SELECT count(*) FROM words;').fetchone()
+        return rows if len(rows) == total else None
+
+    def export_csv(self, filename: str, strategies: Sequence[str]) -> bool:
+        """Writes the report in the format of play_iterated_game().
+
+        :param filename: the csv report
+        :param strategies: the names of the strategies
+        :return: False if some words have no results (nothing is written)
+        """
+        rows = self.report_rows(strategies)
+        if rows is None:
+            return False
+        fieldnames = ['word', 'word_length']
+        for strategy in strategies:
+            fieldnames += [f'{strategy}_guessed', f'{strategy}_missed',
+                           f'{strategy}_total']
+        with open(filename, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file, dialect='excel')
+            writer.writerow(fieldnames)
+            writer.writerows(rows)
+        return True
+
+
+def bucket_fingerprints(word_list: Sequence[str]) -> Dict[int, str]:
+    """Returns {length: SHA-256 of the words of the length in order}."""
+    digests = {}
+    for word in word_list:
+        digest = digests.setdefault(len(word), hashlib.sha256())
+        digest.update(word.encode('utf-8'))
+        digest.update(b'\n')
+    return {length: digest.hexdigest() for length, digest in digests.items()}
+
+
+def update(store: ResultsStore, word_list: Sequence[str],
+           strategies: Sequence[str],
+           log: Callable[[str], None] = print) -> Dict[str, List[int]]:
+    """Plays the words of the buckets that are not stored or changed.
+
+    :param store: the results store
+    :param word_list: the full word list (the dictionary)
+    :param strategies: the names of the strategies
+    :param log: function to report the progress
+    :return: {strategy: lengths of the buckets played}
+    :raise ValueError: if a strategy is unknown
+    """
+    guess_functions = {name: get_strategy(name) for name in strategies}
+    store.save_words(word_list)
+    fingerprints = bucket_fingerprints(word_list)
+    by_length: Dict[int, List[str]] = {}
+    for word in word_list:
+        by_length.setdefault(len(word), []).append(word)
+    played = {}
+    for name, guess_function in guess_functions.items():
+        stored = store.fingerprints(name)
+        for length in stored.keys() - fingerprints.keys():
+            store.delete_bucket(name, length)
+        played[name] = sorted(
+            length for length, fingerprint in fingerprints.items()
+            if stored.get(length) != fingerprint)
+        if not played[name]:
+            log(f'{name}: all {len(fingerprints)} buckets are up to date')
+            continue
+        for length in played[name]:
+            # the games see only the bucket, so it gets its own tree
+            # instead of the tree of the whole dictionary
+            bucket = by_length[length]
+            bucket_index = WordIndex(bucket)
+            tree = build_tree(bucket, guess_function, bucket_index)
+            with events.using(events.EventSink()):
+                results = {word: play_game(word, guess_function, bucket,
+                                           bucket_index, tree)
+                           for word in bucket}
+            store.save_bucket(name, length, fingerprints[length], results)
+            log(f'{name}: played {len(results)} words of length {length}')
+    return played
+
+
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--database', default='results.db',
+        help='the results store (default is results.db)')
+    parser.add_argument(
+        '--words', default='words.txt',
+        help='the word list (default is words.txt)')
+    parser.add_argument(
+        '--strategies', nargs='+', default=list(DEFAULT_STRATEGIES),
+        help='names of the strategies (default is '
+             f'{" ".join(DEFAULT_STRATEGIES)})')
+    parser.add_argument(
+        '--rebuild', action='store_true',
+        help='delete all results first (e.g. when a strategy is changed)')
+    parser.add_argument(
+        '--no-update', dest='update', action='store_false',
+        help='do not play the changed buckets, just export')
+    parser.add_argument(
+        '--export', nargs='?', const='',
+        help='export the csv report (default name is timestamped '
+             'as in compare_approaches.py)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args_from_cmd()
+    results_store = ResultsStore(args.database)
+    try:
+        if args.rebuild:
+            results_store.clear()
+        if args.update:
+            try:
+                update(results_store, get_word_list(args.words),
+                       args.strategies)
+            except ValueError as e:
+                sys.exit(str(e))
+        if args.export is not None:
+            report_filename = args.export or create_abs_filename()
+            if results_store.export_csv(report_filename, args.strategies):
+                print(f'csv file generated successfully: {report_filename}')
+            else:
+                sys.exit('Some words have no results, run the update first.')
+    finally:
+        results_store.close()
@@ -0,0 +1,145 @@
+"""Significance tests for comparing the strategies (without SciPy).
+
+paired_t_test() - Student's t-test of the mean difference between
+                  two paired samples (e.g. attempts for the same words);
+sign_test() - the two-sided sign test of the same pairs: how often one
+              sample is greater than the other, regardless of by how much;
+welch_t_test() - Welch's t-test of the difference between the means of
+                 two independent samples, from their counts, means and
+                 variances only (e.g. kept by report_stats module).
+The p-values of the t-tests come from the t distribution, computed with
+the regularized incomplete beta function.
+"""
+
+import math
+from typing import Sequence, Tuple
+
+
+def paired_t_test(sample: Sequence[float],
+                  baseline: Sequence[float]) -> Tuple[float, float, float]:
+    """Tests whether the mean of sample - baseline differs from 0.
+
+    :param sample: values
+    :param baseline: values paired with the sample (the same length)
+    :return: mean difference, t statistic, two-sided p-value
+    :raise ValueError: if the samples have different lengths
+        or less than 2 pairs
+    """
+    if len(sample) != len(baseline):
+        raise ValueError('the samples must be paired')
+    if len(sample) < 2:
+        raise ValueError('at least 2 pairs are needed')
+    differences = [a - b for a, b in zip(sample, baseline)]
+    n = len(differences)
+    mean = math.fsum(differences) / n
+    variance = math.fsum((d - mean) ** 2 for d in differences) / (n - 1)
+    if variance == 0:  # all differences are the same
+        return mean, math.copysign(math.inf, mean) if mean else 0.0, \
+            float(mean == 0)
+    t = mean / math.sqrt(variance / n)
+    return mean, t, t_test_p_value(t, n - 1)
+
+
+def sign_test(sample: Sequence[float],
+              baseline: Sequence[float]) -> Tuple[int, int, float]:
+    """Tests whether sample > baseline is as likely as sample < baseline
+    (the ties are ignored).
+
+    :param sample: values
+    :param baseline: values paired with the sample (the same length)
+    :return: number of pairs where sample is greater, where it is less,
+        two-sided p-value (exact up to 1000 pairs, then the normal
+        approximation)
+    :raise ValueError: if the samples have different lengths
+    """
+    if len(sample) != len(baseline):
+        raise ValueError('the samples must be paired')
+    greater = sum(a > b for a, b in zip(sample, baseline))
+    less = sum(a < b for a, b in zip(sample, baseline))
+    n, k = greater + less, min(greater, less)
+    if n == 0:
+        return greater, less, 1.0
+    if n <= 1000:
+        p = 2 * sum(math.comb(n, i) for i in range(k + 1)) / 2 ** n
+    else:
+        z = (n / 2 - k - 0.5) / math.sqrt(n / 4)  # continuity correction
+        p = math.erfc(z / math.sqrt(2))
+    return greater, less, min(p, 1.0)
+
+
+def welch_t_test(mean: float, variance: float, count: int,
+                 baseline_mean: float, baseline_variance: float,
+                 baseline_count: int) -> Tuple[float, float, float]:
+    """Tests whether the means of two samples differ (the variances may
+    differ too; the degrees of freedom are approximated with
+    the Welch-Satterthwaite equation).
+
+    :param mean: mean of the sample
+    :param variance: sample variance (with n - 1 in the denominator)
+    :param count: size of the sample
+    :param baseline_mean: mean of the other sample
+    :param baseline_variance: its sample variance
+    :param baseline_count: its size
+    :return: difference of the means, t statistic, two-sided p-value
+    :raise ValueError: if a sample has less than 2 values
+    """
+    if count < 2 or baseline_count < 2:
+        raise ValueError('at least 2 values in each sample are needed')
+    difference = mean - baseline_mean
+    error = variance / count
+    baseline_error = baseline_variance / baseline_count
+    if error + baseline_error == 0:  # both samples are constant
+        return difference, math.copysign(math.inf, difference) \
+            if difference else 0.0, float(difference == 0)
+    t = difference / math.sqrt(error + baseline_error)
+    df = (error + baseline_error) ** 2 / (
+        error ** 2 / (count - 1) + baseline_error ** 2 / (baseline_count - 1))
+    return difference, t, t_test_p_value(t, df)
+
+
+def t_test_p_value(t: float, df: float) -> float:
+    """Returns the two-sided p-value of the t statistic.
+
+    :param t: t statistic
+    :param df: degrees of freedom (> 0)
+    :return: P(|T| >= |t|)
+    """
+    return regularized_beta(df / (df + t * t), df / 2, 0.5)
+
+
+def regularized_beta(x: float, a: float, b: float) -> float:
+    """Returns the regularized incomplete beta function I_x(a, b)
+    (continued fraction, see Numerical Recipes, 6.4).
+    """
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_fraction(x, a, b) / a
+    return 1 - front * _beta_fraction(1 - x, b, a) / b
+
+
+def _beta_fraction(x: float, a: float, b: float,
+                   iterations=300, epsilon=1e-15) -> float:
+    """Evaluates the continued fraction of regularized_beta()
+    (modified Lentz's method).
+    """
+    tiny = 1e-300
+    c, d = 1.0, 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, iterations + 1):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x
+                          / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1) < epsilon:
+            break
+    return result
@@ -0,0 +1,131 @@
+"""Registry of the strategies to guess a letter.
+
+A strategy is a function(word_list, disclosed) -> letter, which must be
+deterministic (the same letter for the same words and disclosed letters)
+to be precomputed as a decision tree (see decision_tree module).
+It is registered under a short name that is used in the reports:
+
+    @register('by_word_count')
+    def guess_letter(word_list, disclosed):
+        ...
+
+The built-in strategies:
+    by_word_count - guess_letter() from hangman module;
+    by_letter_count - guess_letter_by_letter_count() from
+                      compare_approaches module;
+    by_information_gain - guess_letter_by_information_gain() below.
+"""
+
+import collections
+import math
+from typing import AbstractSet, Callable, Dict, List, Optional, Sequence
+
+STRATEGIES: Dict[str, Callable] = {}  # {name: function}
+
+
+def register(name: str) -> Callable[[Callable], Callable]:
+    """Returns a decorator that registers the strategy under the name.
+
+    :param name: the name of the strategy
+    :return: decorator
+    :raise ValueError: if another strategy has the same name
+    """
+    def decorator(guess_function: Callable) -> Callable:
+        if STRATEGIES.get(name, guess_function) is not guess_function:
+            raise ValueError(f'strategy {name!r} is already registered')
+        STRATEGIES[name] = guess_function
+        return guess_function
+    return decorator
+
+
+def get_strategy(name: str) -> Callable:
+    """Returns the registered strategy.
+
+    :param name: the name of the strategy
+    :return: function(word_list, disclosed) -> letter
+    :raise ValueError: if there is no such strategy
+    """
+    try:
+        return all_strategies()[name]
+    except KeyError:
+        raise ValueError(f'unknown strategy {name!r}, the strategies are: '
+                         f'{", ".join(all_strategies())}') from None
+
+
+def all_strategies() -> Dict[str, Callable]:
+    """Returns all registered strategies (including the built-in ones
+    from the modules that may not have been imported yet).
+    """
+    import compare_approaches  # noqa: F401 (it imports hangman too)
+    return dict(STRATEGIES)
+
+
+def strategy_name(guess_function: Callable) -> str:
+    """Returns the name of the registered strategy
+    (or the name of the function if it is not registered).
+    """
+    return registered_name(guess_function) or guess_function.__name__
+
+
+def registered_name(guess_function: Callable) -> Optional[str]:
+    """Returns the name under which the function is registered
+    (None if it is not registered).
+    """
+    for name, function in STRATEGIES.items():
+        if function is guess_function:
+            return name
+    return None
+
+
+@register('by_information_gain')
+def guess_letter_by_information_gain(
+        word_list: Sequence[str],
+        disclosed: AbstractSet[str]) -> Optional[str]:
+    """Returns the letter whose guess is expected to tell the most
+    about the word.
+
+    A guess of a letter splits the words into groups by the dash pattern
+    it would reveal, i.e. by the positions of the letter in the word
+    (no positions for a miss). The expected information of the guess is
+    the entropy of this partition: log2(n) - sum(k * log2(k)) / n for
+    groups of k words out of n. Unlike the letter counts, it prefers
+    the letters that split the words evenly, e.g. a letter found in half
+    of the words, or at different positions in them.
+    Letters that already have been disclosed are ignored. If several
+    letters give the same information, the first of them in alphabetical
+    order is returned.
+
+    :param word_list: a list of words
+    :param disclosed: letters to ignore (already guessed)
+    :return: a single letter; if the word list is empty, returns None
+    """
+    partitions: Dict[str, List[int]] = collections.defaultdict(list)
+    found = collections.Counter()  # {(letter, positions): words}
+    for word in word_list:
+        positions: Dict[str, int] = {}
+        for position, letter in enumerate(word.lower()):
+            positions[letter] = positions.get(letter, 0) | 1 << position
+        found.update(positions.items())
+    for (letter, _), words in found.items():
+        if letter not in disclosed:
+            partitions[letter].append(words)
+    best_letter, best_information = None, -1.0
+    for letter in sorted(partitions):
+        groups = partitions[letter]
+        missed = len(word_list) - sum(groups)
+        if missed:
+            groups.append(missed)
+        information = _entropy(groups)
+        if information > best_information:
+            best_letter, best_information = letter, information
+    return best_letter
+
+
+def _entropy(groups: List[int]) -> float:
+    """Returns the entropy (in bits) of the partition into groups of
+    the sizes. The groups are sorted, so the same partition always gives
+    exactly the same number (it is compared to break the ties).
+    """
+    total = sum(groups)
+    return math.log2(total) - sum(
+        size * math.log2(size) for size in sorted(groups)) / total
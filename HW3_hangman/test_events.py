@@ -0,0 +1,86 @@
+"""Tests of the events of play_game() (run from this directory:
+python -m unittest test_events).
+"""
+
+import unittest
+
+import events
+from compare_approaches import guess_letter_by_letter_count, play_game
+from decision_tree import build_tree
+from hangman import count_letters, disclosed_letters, guess_letter
+from word_index import WordIndex
+
+WORDS = ['element', 'torch', 'today', 'especially', 'touch', 'teach',
+         'reach', 'beach', 'peach', 'poach']
+
+
+class RecordingSink(events.EventSink):
+    """Records the events up to the level."""
+
+    def __init__(self, level=events.STATISTICS):
+        self.level = level
+        self.events = []
+
+    def emit(self, event, **fields):
+        self.events.append((event, fields))
+
+    def names(self):
+        return [event for event, _ in self.events]
+
+
+class PlayGameEventsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = WordIndex(WORDS)
+
+    def play(self, guess_function, level=events.STATISTICS, tree=None):
+        with events.using(RecordingSink(level)) as sink:
+            play_game('peach', guess_function, WORDS, self.index, tree)
+        return sink
+
+    def test_statistics_before_every_guess(self):
+        sink = self.play(guess_letter)
+        names = sink.names()
+        self.assertEqual(names[0], 'game')
+        self.assertEqual(names[-1], 'guessed')
+        self.assertIn('statistics', names)
+        for i, name in enumerate(names):
+            if name == 'guess':
+                self.assertEqual(names[i - 1], 'statistics')
+
+    def test_statistics_of_the_guessed_letter(self):
+        sink = self.play(guess_letter)
+        dash_pattern, statistics = '-----', None
+        for event, fields in sink.events:
+            if event == 'statistics':
+                statistics = fields
+            elif event == 'guess':
+                disclosed = disclosed_letters(dash_pattern)
+                self.assertEqual(statistics['letters'],
+                                 count_letters(statistics['word_list'],
+                                               disclosed))
+                with events.using(events.EventSink()):
+                    self.assertEqual(
+                        guess_letter(statistics['word_list'], disclosed),
+                        fields['letter'])
+                dash_pattern = fields['dash_pattern']
+
+    def test_statistics_on_the_tree(self):
+        tree = build_tree(WORDS, guess_letter, self.index)
+        on_tree = self.play(guess_letter, tree=tree).events
+        off_tree = self.play(guess_letter).events
+        self.assertEqual(
+            [(event, fields.get('letters')) for event, fields in on_tree],
+            [(event, fields.get('letters')) for event, fields in off_tree])
+
+    def test_no_statistics_below_the_level(self):
+        self.assertNotIn('statistics',
+                         self.play(guess_letter, events.GUESSES).names())
+
+    def test_no_statistics_of_letter_count(self):
+        self.assertNotIn('statistics',
+                         self.play(guess_letter_by_letter_count).names())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
+import argparse
 import os
-import pandas as pd
+import sys
+
 import matplotlib.pyplot as plt
-from scipy.stats import ttest_ind
+
+from report_stats import LENGTH_COLUMN, ReportStats, print_comparison, \
+    print_summary
 
 
 def enter_and_validate_filename():
@@ -21,14 +25,44 @@ def enter_and_validate_filename():
         return file_name
 
 
+def get_args_from_cmd() -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Compares the strategies in csv reports (read in "
+                    "chunks, see report_stats.py) and draws box plots.")
+    parser.add_argument(
+        "filenames", nargs="*",
+        help="csv reports, e.g. the shards of parallel_report.py "
+             "(default is to ask for one)")
+    parser.add_argument(
+        "--by-length", metavar="COLUMN",
+        help="draw the boxes of the column per word length")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    filename = enter_and_validate_filename()
-    df = pd.read_csv(filename, encoding="utf-8", index_col="word")
-    df_avgs = df.mean(axis=0)
-    print(df_avgs)
-    print(ttest_ind(df["by_word_count_total"],
-                    df["by_letter_count_total"]))
-    df.plot(kind="box")
+    args = get_args_from_cmd()
+    stats = ReportStats()
+    try:
+        for filename in args.filenames or [enter_and_validate_filename()]:
+            stats.add_file(filename)
+        print_summary(stats)
+        print_comparison(stats, "by_word_count_total",
+                         "by_letter_count_total")
+        if args.by_length:
+            boxes = [stats.stats(args.by_length, length).box_stats(length)
+                     for length in sorted(stats.by_length)]
+        else:
+            boxes = [stats.stats(name).box_stats(name)
+                     for name in stats.columns]
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+    plt.gca().bxp(boxes)
+    if args.by_length:
+        plt.xlabel(LENGTH_COLUMN)
+    else:
+        plt.xticks(rotation=90)
     plt.title("Compare the number of attempts")
     plt.ylabel("Number of attempts to guess a letter")
+    plt.tight_layout()
     plt.show()
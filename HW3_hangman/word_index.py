@@ -0,0 +1,250 @@
+"""Positional bitset index of the word list.
+
+A set of words is represented by a bitset - an int where bit i
+is set if the i-th word of the list is in the set. The index keeps:
+1) bitsets of words by length;
+2) bitsets of words by (position, character);
+3) bitsets of words that contain a character at any position.
+So instead of matching a regex against every word, a pattern made by
+convert_into_regex_pattern() (or '^[^x]+$' for a missed letter) is
+evaluated with a few bitwise operations on these bitsets, and the
+result is intersected with the bitset of the remaining words.
+
+The result is exactly the same as with filter_word_list(): every
+position of such a pattern is a single-character regex (a letter,
+an apostrophe or a class like [\\w'] or [^abc]), and the index tests
+it with the same regex flags against every distinct character of the
+word list. So the case-insensitive matching and the apostrophes are
+handled by the regex engine itself, just once per character instead
+of once per word.
+"""
+
+import itertools
+import re
+from typing import AbstractSet, Dict, List, Optional, Sequence, Tuple
+
+FLAGS = re.IGNORECASE | re.UNICODE  # the same as in filter_word_list()
+SPARSE = 32  # a bitset is sparse if it has < 1/SPARSE of all words
+_BIT_VALUES = bytes.maketrans(b'01', b'\x00\x01')
+_BIT_OFFSETS = [tuple(bit for bit in range(8) if byte >> bit & 1)
+                for byte in range(256)]
+_NONZERO_BYTE = re.compile(rb'[^\x00]')
+
+
+class WordIndex:
+    """Bitsets of words by length, (position, character) and character."""
+
+    def __init__(self, word_list: Sequence[str],
+                 at: Optional[Dict[Tuple[int, str], int]] = None,
+                 by_length: Optional[Dict[int, int]] = None,
+                 lower_words: Optional[Sequence[str]] = None):
+        """Builds the index, or takes the bitsets of an index that was
+        built before (e.g. loaded from the word store, see word_store
+        module).
+
+        :param word_list: a list of words
+        :type word_list: Sequence[str]
+        :param at: bitsets by (position, character) of word_list
+            (default is None - build all bitsets)
+        :type at: Optional[Dict[Tuple[int, str], int]]
+        :param by_length: bitsets by length (required with at)
+        :type by_length: Optional[Dict[int, int]]
+        :param lower_words: the words in lower case
+            (default is None - lowercase word_list)
+        :type lower_words: Optional[Sequence[str]]
+        :raise ValueError: if the words contain more than 255
+            distinct characters
+        """
+        self._words = list(word_list)
+        self.lower_words = ([word.lower() for word in self._words]
+                            if lower_words is None else list(lower_words))
+        self.all = (1 << len(self._words)) - 1
+        self._allowed_cache: Dict[str, AbstractSet[str]] = {}
+        if at is not None:
+            self.alphabet = sorted(set(char for _, char in at))
+            self.at = dict(at)
+            self.containing = dict.fromkeys(self.alphabet, 0)
+            for (_, char), bitset in self.at.items():
+                self.containing[char] |= bitset
+            self.by_length = dict(by_length)
+            return
+        self.alphabet = sorted(set(itertools.chain.from_iterable(
+            self._words)))
+        if len(self.alphabet) > 255:
+            raise ValueError('too many distinct characters to index')
+        self.at: Dict[Tuple[int, str], int] = {}
+        self.containing: Dict[str, int] = dict.fromkeys(self.alphabet, 0)
+        self.by_length: Dict[int, int] = {}
+        self._build()
+
+    def _build(self) -> None:
+        """Fills the bitsets.
+
+        Every word is encoded as bytes (one code per character, 0 for
+        padding up to the maximum length), so that a column of the
+        resulting matrix holds the characters at one position in all
+        words, and a bitset is made from a column with bytes.translate()
+        and int(..., 2) instead of setting the bits one by one.
+        """
+        codes = {char: chr(code)
+                 for code, char in enumerate(self.alphabet, start=1)}
+        table = str.maketrans(codes)
+        width = max(map(len, self._words), default=0)
+        matrix = b''.join(
+            word.translate(table).encode('latin-1').ljust(width, b'\0')
+            for word in self._words)
+        longer = [self.all]  # longer[p] - words with more than p chars
+        for position in range(width):
+            column = matrix[position::width]
+            for code in set(column) - {0}:
+                char = self.alphabet[code - 1]
+                bitset = _column_bitset(column, code)
+                self.at[position, char] = bitset
+                self.containing[char] |= bitset
+            longer.append(self.all & ~_column_bitset(column, 0))
+        longer.append(0)
+        for length in range(width + 1):
+            bitset = longer[length] & ~longer[length + 1]
+            if bitset:
+                self.by_length[length] = bitset
+
+    def match(self, pattern: str) -> int:
+        """Returns the words that match the regular expression
+        (with re.IGNORECASE and re.UNICODE flags, as in
+        filter_word_list()).
+
+        Supported patterns:
+        1) '^' + single-character regexes + '$' - made by
+           convert_into_regex_pattern(), e.g. "^[^a]a[^a]$";
+        2) '^' + a single-character regex + '+$', e.g. '^[^e]+$'.
+
+        :param pattern: regular expression
+        :type pattern: str
+        :return: bitset of matching words
+        :rtype: int
+        :raise ValueError: if the pattern is not supported
+        """
+        atoms, repeated = _split_pattern(pattern)
+        if repeated:
+            excluded = 0
+            for char in self._rejected(atoms[0]):
+                excluded |= self.containing[char]
+            return self.all & ~self.by_length.get(0, 0) & ~excluded
+        result = self.by_length.get(len(atoms), 0)
+        excluded = 0
+        for position, atom in enumerate(atoms):
+            if not result:
+                break
+            allowed = self._allowed(atom)
+            if len(allowed) < len(self.alphabet) - len(allowed):
+                included = 0
+                for char in allowed:
+                    included |= self.at.get((position, char), 0)
+                result &= included
+            else:
+                for char in self._rejected(atom):
+                    excluded |= self.at.get((position, char), 0)
+        return result & ~excluded
+
+    def filter(self, word_list: Sequence[str], pattern: str) -> List[str]:
+        """Filters the words with the pattern (see match()) using
+        the characters allowed at each position. This is faster than
+        match() for short lists, since it does not touch the bitsets.
+
+        :param word_list: words from the indexed list
+        :type word_list: Sequence[str]
+        :param pattern: regular expression
+        :type pattern: str
+        :return: a list of words that match the pattern
+        :rtype: List[str]
+        :raise ValueError: if the pattern is not supported
+        """
+        atoms, repeated = _split_pattern(pattern)
+        if repeated:
+            allowed = self._allowed(atoms[0])
+            return [word for word in word_list
+                    if word and allowed.issuperset(word)]
+        allowed_at = [self._allowed(atom) for atom in atoms]
+        return [word for word in word_list if len(word) == len(atoms)
+                and all(char in allowed
+                        for char, allowed in zip(word, allowed_at))]
+
+    def words(self, bitset: int, lower=False) -> List[str]:
+        """Returns the words of the bitset in the original order.
+
+        :param bitset: a set of words (see match())
+        :type bitset: int
+        :param lower: return the words in lower case (default is False)
+        :type lower: bool
+        :return: a list of words
+        :rtype: List[str]
+        """
+        words = self.lower_words if lower else self._words
+        if count(bitset) * SPARSE < len(words):
+            # only the non-zero bytes are looked at
+            data = bitset.to_bytes((bitset.bit_length() + 7) // 8, 'little')
+            return [words[match.start() * 8 + offset]
+                    for match in _NONZERO_BYTE.finditer(data)
+                    for offset in _BIT_OFFSETS[data[match.start()]]]
+        selectors = format(bitset, 'b')[::-1].encode('ascii')
+        return list(itertools.compress(
+            words, selectors.translate(_BIT_VALUES)))
+
+    def _allowed(self, atom: str) -> AbstractSet[str]:
+        """Returns the characters of the alphabet
+        that match the single-character regex.
+        """
+        allowed = self._allowed_cache.get(atom)
+        if allowed is None:
+            compiled = re.compile(atom, flags=FLAGS)
+            allowed = frozenset(filter(compiled.fullmatch, self.alphabet))
+            self._allowed_cache[atom] = allowed
+        return allowed
+
+    def _rejected(self, atom: str) -> AbstractSet[str]:
+        """Returns the characters of the alphabet
+        that do not match the single-character regex.
+        """
+        return set(self.alphabet) - self._allowed(atom)
+
+
+def count(bitset: int) -> int:
+    """Returns the number of words in the bitset.
+
+    :param bitset: a set of words
+    :type bitset: int
+    :return: number of words
+    :rtype: int
+    """
+    return _bit_count(bitset)
+
+
+_bit_count = getattr(int, 'bit_count', lambda bitset: bin(bitset).count('1'))
+
+
+def _column_bitset(column: bytes, code: int) -> int:
+    """Returns the bitset of rows where the column has the code."""
+    table = bytes(48 + (byte == code) for byte in range(256))  # b'0'/b'1'
+    return int(column.translate(table)[::-1], 2) if column else 0
+
+
+def _split_pattern(pattern: str) -> Tuple[List[str], bool]:
+    """Splits the pattern into single-character regexes.
+
+    :param pattern: regular expression (see WordIndex.match())
+    :type pattern: str
+    :return: single-character regexes and whether the last
+        of them is followed by '+'
+    :rtype: Tuple[List[str], bool]
+    :raise ValueError: if the pattern is not supported
+    """
+    if not (pattern.startswith('^') and pattern.endswith('$')):
+        raise ValueError(f'unsupported pattern: {pattern!r}')
+    body = pattern[1:-1]
+    repeated = body.endswith('+')
+    if repeated:
+        body = body[:-1]
+    atoms = re.findall(r"\[\^?[^\]]+\]|[^\[\]\\.^$*+?{}()|]", body)
+    if ''.join(atoms) != body or repeated and len(atoms) != 1:
+        raise ValueError(f'unsupported pattern: {pattern!r}')
+    return atoms, repeated
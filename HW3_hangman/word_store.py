@@ -0,0 +1,249 @@
+"""Compiled binary store of the word list.
+
+On every start, get_word_list() reads and strips words.txt, and then
+WordIndex builds its bitsets, which takes the most of the startup time.
+compile_store() does it once and writes the result next to the word
+list (see store_filename()) as a JSON header line followed by sections
+(each of them starts at a multiple of 8 bytes):
+    words, lower_words - the words and the same words in lower case,
+                         in UTF-8, each one followed by a newline;
+    offsets, lower_offsets - 'I' arrays, the byte offset of each word
+                             in its section (and the size at the end);
+    by_length - 'I' array of the indexes of the words grouped by length
+                (the ranges of the groups are in the header);
+    bitsets - the bitsets of WordIndex, (number of words + 7) // 8 bytes
+              each, little-endian: by (position, character) in the order
+              of the header 'at', then by length in the order of the
+              header 'lengths'.
+The header holds the SHA-256 of the source file, so the store is
+compiled again automatically when words.txt changes.
+
+The file is mapped into memory (mmap), so a word can be read without
+reading the others. Loading the words and the index from it takes
+milliseconds, but it is only the loading that is fast: words() and
+index() copy the bytes out of the mapping into the usual Python strings
+and ints, so every process that loads the store holds its own copy of
+them - about 30 MB for words.txt. That is why parallel_report.py loads
+them once, before its workers are forked, and the workers share the
+pages of the parent instead (copy-on-write).
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+from word_index import WordIndex
+
+STORE_VERSION = 1  # increment when the format changes
+_ALIGN = 8
+
+
+class WordStore:
+    """A compiled word list mapped into memory."""
+
+    def __init__(self, filename: str):
+        """Maps the file written by compile_store().
+
+        :param filename: the store
+        :raise OSError: if the file cannot be read
+        :raise ValueError: if the file is not a valid store
+        """
+        with open(filename, 'rb') as f:
+            header_line = f.readline()
+            try:
+                self.header = json.loads(header_line.decode('utf-8'))
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # also an empty file for mmap
+                raise ValueError(f'invalid word store: {e}')
+        self._data = _aligned(len(header_line))
+        try:
+            self.count: int = self.header['count']
+            sections = self.header['sections']
+            if self.header['byteorder'] != sys.byteorder:
+                raise ValueError('the byte order of the store differs')
+            if any(self._data + offset + size > len(self._map)
+                   for offset, size in sections.values()):
+                raise ValueError('truncated word store')
+        except (KeyError, TypeError, ValueError) as e:
+            self.close()
+            raise ValueError(f'invalid word store: {e}')
+
+    def __len__(self):
+        return self.count
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._map.close()
+
+    def section(self, name: str) -> memoryview:
+        """Returns the bytes of the section (without copying them)."""
+        offset, size = self.header['sections'][name]
+        start = self._data + offset
+        return memoryview(self._map)[start:start + size]
+
+    def words(self, start=0, stop: Optional[int] = None,
+              lower=False) -> List[str]:
+        """Returns the words from start to stop (as slicing does).
+
+        :param start: index of the first word
+        :param stop: index after the last word (default is the end)
+        :param lower: return the words in lower case (default is False)
+        :return: a list of words
+        """
+        start, stop, _ = slice(start, stop).indices(self.count)
+        if start >= stop:
+            return []
+        prefix = 'lower_' if lower else ''
+        offsets = self.section(prefix + 'offsets').cast('I')
+        data = self.section(prefix + 'words')[offsets[start]:offsets[stop]]
+        return bytes(data).decode('utf-8').split('\n')[:-1]
+
+    def word(self, number: int, lower=False) -> str:
+        """Returns a single word by its index (from 0 to len - 1).
+
+        :raise IndexError: if there is no such word
+        """
+        if not 0 <= number < self.count:
+            raise IndexError('word index out of range')
+        return self.words(number, number + 1, lower)[0]
+
+    def groups(self) -> Dict[int, List[int]]:
+        """Returns the indexes of the words grouped by length."""
+        by_length = self.section('by_length').cast('I')
+        return {int(length): by_length[first:last].tolist()
+                for length, (first, last) in self.header['lengths'].items()}
+
+    def index(self, start=0, stop: Optional[int] = None) -> WordIndex:
+        """Returns the index of words(start, stop) made from the stored
+        bitsets (the same as WordIndex(words(start, stop))). The bitsets
+        and the words are copied, so the index does not need the store
+        to stay open.
+
+        :param start: index of the first word
+        :param stop: index after the last word (default is the end)
+        :return: the index
+        """
+        start, stop, _ = slice(start, stop).indices(self.count)
+        stop = max(start, stop)
+        mask = (1 << stop - start) - 1
+        size = (self.count + 7) // 8
+        bitsets = self.section('bitsets')
+
+        def bitset(number: int) -> int:
+            data = bitsets[number * size:(number + 1) * size]
+            return int.from_bytes(data, 'little') >> start & mask
+
+        at = {}
+        for number, (position, char) in enumerate(self.header['at']):
+            at[position, char] = bitset(number)
+        by_length = {}
+        for number, length in enumerate(self.header['lengths'],
+                                        start=len(at)):
+            by_length[int(length)] = bitset(number)
+        return WordIndex(self.words(start, stop),
+                         {key: value for key, value in at.items() if value},
+                         {key: value for key, value in by_length.items()
+                          if value},
+                         self.words(start, stop, lower=True))
+
+
+def compile_store(source: str, filename: str) -> None:
+    """Reads the word list (in the same way as get_word_list() from
+    hangman module) and writes the store.
+
+    :param source: the word list, one word per line
+    :param filename: the store
+    :raise OSError: if the source cannot be read or the store
+        cannot be written
+    """
+    with open(source, 'rb') as f:
+        data = f.read()
+    lines = io.StringIO(data.decode('utf-8'), newline=None).readlines()
+    words = [word.strip() for word in lines]
+    index = WordIndex(words)
+    sections: Dict[str, bytes] = {}
+    for prefix, word_list in (('', words), ('lower_', index.lower_words)):
+        encoded = [(word + '\n').encode('utf-8') for word in word_list]
+        offsets = array('I', [0])
+        for word in encoded:
+            offsets.append(offsets[-1] + len(word))
+        sections[prefix + 'words'] = b''.join(encoded)
+        sections[prefix + 'offsets'] = offsets.tobytes()
+    by_length = sorted(range(len(words)), key=lambda number:
+                       len(words[number]))
+    lengths: Dict[int, List[int]] = {}
+    for position, number in enumerate(by_length):
+        lengths.setdefault(len(words[number]), [position, position])
+        lengths[len(words[number])][1] = position + 1
+    sections['by_length'] = array('I', by_length).tobytes()
+    size = (len(words) + 7) // 8
+    bitsets = [*index.at.values(), *(index.by_length[length]
+                                     for length in lengths)]
+    sections['bitsets'] = b''.join(bitset.to_bytes(size, 'little')
+                                   for bitset in bitsets)
+    offset, layout = 0, {}
+    for name, section in sections.items():
+        layout[name] = [offset, len(section)]
+        offset = _aligned(offset + len(section))
+    header = {'version': STORE_VERSION, 'source': os.path.basename(source),
+              'source_sha256': hashlib.sha256(data).hexdigest(),
+              'byteorder': sys.byteorder, 'count': len(words),
+              'sections': layout, 'lengths': lengths,
+              'at': [list(key) for key in index.at]}
+    header_line = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    header_line += b'\n'
+    temporary = f'{filename}.{os.getpid()}.tmp'
+    try:
+        with open(temporary, 'wb') as f:
+            f.write(header_line.ljust(_aligned(len(header_line)), b'\0'))
+            for name, section in sections.items():
+                f.write(section.ljust(_aligned(len(section)), b'\0'))
+        os.replace(temporary, filename)  # the readers see a whole file
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load_store(source='words.txt',
+               filename: Optional[str] = None) -> WordStore:
+    """Maps the store of the word list. If there is no store, or it was
+    compiled from another version of the source (or by another version
+    of this module), compiles it first.
+
+    :param source: the word list (default is 'words.txt')
+    :param filename: default is store_filename(source)
+    :return: the store
+    :raise OSError: if the source cannot be read or the store
+        cannot be written
+    """
+    filename = filename or store_filename(source)
+    with open(source, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    try:
+        store = WordStore(filename)
+    except (OSError, ValueError):
+        pass
+    else:
+        if (store.header.get('version') == STORE_VERSION
+                and store.header.get('source_sha256') == digest):
+            return store
+        store.close()
+    compile_store(source, filename)
+    return WordStore(filename)
+
+
+def store_filename(source: str) -> str:
+    """Returns the name of the store of the word list
+    (e.g. 'words.store' for 'words.txt').
+    """
+    return os.path.splitext(source)[0] + '.store'
+
+
+def _aligned(offset: int) -> int:
+    """Rounds the offset up to a multiple of _ALIGN."""
+    return -(-offset // _ALIGN) * _ALIGN